@@ -0,0 +1,241 @@
+"""Per-node index of allocations for finding free ports quickly."""
+import bisect
+import threading
+from array import array
+
+from pydactyl.exceptions import BadRequestError
+
+
+class _IpAllocations(object):
+    """Allocations of one IP on a node."""
+
+    __slots__ = ('free', 'ids')
+
+    def __init__(self):
+        # Sorted unassigned ports, and the allocation id of every port.
+        self.free = array('H')
+        self.ids = {}
+
+
+class AllocationIndex(object):
+    """Free ports of each node, kept in sorted arrays per IP.
+
+    A node is loaded once from its allocations, after that finding free
+    ports in a range is a binary search instead of paging through
+    list_node_allocations().  Allocations marked as assigned, e.g. by
+    reserve(), stop being offered until they are marked free again.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._nodes = {}
+        self._by_id = {}
+
+    def __contains__(self, node_id):
+        return node_id in self._nodes
+
+    def __repr__(self):
+        return '<AllocationIndex nodes={} allocations={}>'.format(
+            len(self._nodes), len(self._by_id))
+
+    def load(self, node_id, allocations):
+        """Replace the allocations of a node.
+
+        Args:
+            node_id(int): Pterodactyl Node ID.
+            allocations(iter): Allocation attributes, as listed by
+                    list_node_allocations().
+        """
+        ips = {}
+        for allocation in allocations:
+            if isinstance(allocation, dict) and 'attributes' in allocation:
+                allocation = allocation['attributes']
+            ip = ips.get(allocation['ip'])
+            if ip is None:
+                ip = ips[allocation['ip']] = _IpAllocations()
+            ip.ids[allocation['port']] = allocation['id']
+            if not allocation.get('assigned'):
+                ip.free.append(allocation['port'])
+        for ip in ips.values():
+            ip.free = array('H', sorted(ip.free))
+        with self._lock:
+            self._forget(node_id)
+            self._nodes[node_id] = ips
+            for address, ip in ips.items():
+                for port, allocation_id in ip.ids.items():
+                    self._by_id[allocation_id] = (node_id, address, port)
+
+    def invalidate(self, node_id=None):
+        """Forget a node's allocations, or every node's if None."""
+        with self._lock:
+            if node_id is None:
+                self._nodes.clear()
+                self._by_id.clear()
+            else:
+                self._forget(node_id)
+
+    def _forget(self, node_id):
+        ips = self._nodes.pop(node_id, {})
+        for ip in ips.values():
+            for allocation_id in ip.ids.values():
+                self._by_id.pop(allocation_id, None)
+
+    def _candidates(self, node_id, port_range, ip):
+        """Yield (ip, allocations, free ports in range) for each node IP."""
+        ips = self._nodes.get(node_id)
+        if ips is None:
+            raise KeyError('Allocations of node {} are not loaded'.format(
+                node_id))
+        low, high = port_range or (0, 65535)
+        for address in sorted(ips) if ip is None else [ip]:
+            allocations = ips.get(address)
+            if allocations is None:
+                continue
+            free = allocations.free
+            start = bisect.bisect_left(free, low)
+            end = bisect.bisect_right(free, high, start)
+            if start < end:
+                yield address, allocations, free[start:end]
+
+    def find_free(self, node_id, count=1, port_range=None, ip=None):
+        """Find unassigned allocations on a node.
+
+        Args:
+            node_id(int): Pterodactyl Node ID.
+            count(int): Maximum number of allocations to return.
+            port_range(tuple): Lowest and highest port, inclusive.
+            ip(str): Only allocations on this IP.
+
+        Returns:
+            list: Up to count dicts with the id, ip and port of each
+                    allocation, ordered by IP then port.
+
+        Raises:
+            KeyError: If the node hasn't been loaded.
+        """
+        with self._lock:
+            return self._find(node_id, count, port_range, ip)
+
+    def _find(self, node_id, count, port_range, ip):
+        found = []
+        for address, allocations, ports in self._candidates(
+                node_id, port_range, ip):
+            for port in ports[:count - len(found)]:
+                found.append({'id': allocations.ids[port], 'ip': address,
+                              'port': port})
+            if len(found) >= count:
+                break
+        return found
+
+    def free_count(self, node_id, port_range=None, ip=None):
+        """Number of unassigned allocations, see find_free()."""
+        with self._lock:
+            return sum(len(ports) for _, _, ports in self._candidates(
+                node_id, port_range, ip))
+
+    def reserve(self, node_id, count=1, port_range=None, ip=None):
+        """Find unassigned allocations and mark them as assigned.
+
+        Threads reserving from the same index never get the same allocation.
+        Nothing is reserved unless count allocations are free.
+
+        Returns:
+            list: count allocations as returned by find_free(), or an empty
+                    list if there aren't enough.
+        """
+        with self._lock:
+            found = self._find(node_id, count, port_range, ip)
+            if len(found) < count:
+                return []
+            self._set_assigned([a['id'] for a in found], True)
+        return found
+
+    def mark_assigned(self, allocation_ids):
+        """Stop offering allocations, e.g. once a server uses them."""
+        with self._lock:
+            self._set_assigned(allocation_ids, True)
+
+    def mark_free(self, allocation_ids):
+        """Offer allocations again, e.g. after their server is deleted."""
+        with self._lock:
+            self._set_assigned(allocation_ids, False)
+
+    def remove(self, allocation_ids):
+        """Drop deleted allocations."""
+        with self._lock:
+            self._set_assigned(allocation_ids, True)
+            for allocation_id in allocation_ids:
+                location = self._by_id.pop(allocation_id, None)
+                if location is not None:
+                    node_id, address, port = location
+                    del self._nodes[node_id][address].ids[port]
+
+    def _set_assigned(self, allocation_ids, assigned):
+        for allocation_id in allocation_ids:
+            location = self._by_id.get(allocation_id)
+            if location is None:
+                continue
+            node_id, address, port = location
+            free = self._nodes[node_id][address].free
+            i = bisect.bisect_left(free, port)
+            is_free = i < len(free) and free[i] == port
+            if assigned and is_free:
+                del free[i]
+            elif not assigned and not is_free:
+                free.insert(i, port)
+
+
+def parse_port_ranges(port_ranges):
+    """Parse ports in the format used by create_allocations().
+
+    Args:
+        port_ranges(iter): Ports and ranges, e.g. ['4000', '4003-4005'],
+                ints or (low, high) tuples.
+
+    Returns:
+        list: (low, high) inclusive tuples.
+
+    Raises:
+        BadRequestError: If a range can't be parsed.
+    """
+    ranges = []
+    for port_range in port_ranges:
+        try:
+            if isinstance(port_range, (tuple, list)):
+                low, high = port_range
+            elif isinstance(port_range, int):
+                low = high = port_range
+            elif '-' in port_range:
+                low, high = port_range.split('-', 1)
+            else:
+                low = high = port_range
+            low, high = int(low), int(high)
+        except (TypeError, ValueError):
+            raise BadRequestError(
+                'Invalid port range {!r}'.format(port_range))
+        if not 0 < low <= high <= 65535:
+            raise BadRequestError(
+                'Invalid port range {!r}'.format(port_range))
+        ranges.append((low, high))
+    return ranges
+
+
+def select_allocations(allocations, port_ranges, ip=None):
+    """Split allocations in any of the ranges into deletable and assigned.
+
+    Returns:
+        tuple: (ids of unassigned allocations, {id: port} of assigned ones)
+    """
+    free, assigned = [], {}
+    for allocation in allocations:
+        if isinstance(allocation, dict) and 'attributes' in allocation:
+            allocation = allocation['attributes']
+        if ip is not None and allocation['ip'] != ip:
+            continue
+        port = allocation['port']
+        if any(low <= port <= high for low, high in port_ranges):
+            if allocation.get('assigned'):
+                assigned[allocation['id']] = port
+            else:
+                free.append(allocation['id'])
+    return free, assigned
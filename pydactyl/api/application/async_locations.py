@@ -16,7 +16,8 @@ class AsyncLocations(AsyncPterodactylAPI):
         endpoint = 'application/locations'
         response = await self._api_request(endpoint=endpoint, includes=includes,
                                            params=params)
-        return PaginatedResponse(self, endpoint, response)
+        return PaginatedResponse(self, endpoint, response, params=params,
+                                 includes=includes)
 
     async def get_location_info(self, location_id, includes=None, params=None):
         """Get detailed info for the specified location.
@@ -15,7 +15,8 @@ class AsyncNests(AsyncPterodactylAPI):
         endpoint = 'application/nests'
         response = await self._api_request(endpoint=endpoint, includes=includes,
                                            params=params)
-        return PaginatedResponse(self, endpoint, response)
+        return PaginatedResponse(self, endpoint, response, params=params,
+                                 includes=includes)
 
     async def get_nest_info(self, nest_id, includes=None, params=None):
         """Get detailed info for the specified nest.
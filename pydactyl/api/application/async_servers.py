@@ -1,5 +1,9 @@
+import asyncio
+import functools
+
 from pydactyl.api import base
 from pydactyl.api.async_base import AsyncPterodactylAPI
+from pydactyl.api.cache import EggCache
 from pydactyl.exceptions import BadRequestError
 from pydactyl.responses import PaginatedResponse
 
@@ -7,6 +11,10 @@ from pydactyl.responses import PaginatedResponse
 class AsyncServers(AsyncPterodactylAPI):
     """Class for interacting with the Pterdactyl Servers API asynchronously."""
 
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.egg_cache = EggCache()
+
     async def list_servers(self, includes=None, params=None):
         """List all servers.
 
@@ -19,7 +27,8 @@ class AsyncServers(AsyncPterodactylAPI):
             await self._api_request(endpoint=endpoint, includes=includes,
                                     params=params),
             detail=True)
-        return PaginatedResponse(self, endpoint, response)
+        return PaginatedResponse(self, endpoint, response, params=params,
+                                 includes=includes)
 
     async def get_server_info(self, server_id=None, external_id=None, detail=False,
                         includes=None, params=None):
@@ -48,6 +57,34 @@ class AsyncServers(AsyncPterodactylAPI):
                                            params=params)
         return base.parse_response(response, detail)
 
+    async def resolve_external_ids(self, external_ids, inventory=None,
+                                   concurrency=10):
+        """Look up many servers by external_id.
+
+        Ids are answered from inventory when it has synced servers,
+        otherwise from one paginated scan of every server.  Only ids the
+        inventory doesn't know, or that a scan of a large panel wasn't worth
+        it for, are looked up one request at a time.
+
+        Example:
+            bulk = await api.servers.resolve_external_ids(
+                ['whmcs-12', 'whmcs-13'])
+            bulk.results['whmcs-12']['id']
+
+        Args:
+            external_ids(iter): IDs from an external system like WHMCS
+            inventory(Inventory): Loaded inventory to answer from.
+            concurrency(int): Maximum number of single lookups sent at once.
+
+        Returns:
+            BulkResponse: Server attributes keyed by external id.  Ids
+                    with no server are in errors.
+        """
+        return await self._resolve_external_ids(
+            'servers', external_ids, self.list_servers,
+            functools.partial(self.get_server_info, detail=False),
+            inventory=inventory, concurrency=concurrency)
+
     async def suspend_server(self, server_id):
         """Suspend the server with the specified internal ID.
 
@@ -108,6 +145,9 @@ class AsyncServers(AsyncPterodactylAPI):
             endpoint += '/force'
 
         response = await self._api_request(endpoint=endpoint, mode='DELETE')
+        # The panel doesn't say which allocations the server had.
+        if self._allocation_index is not None:
+            self._allocation_index.invalidate()
         return response
 
     async def list_server_databases(self, server_id, includes=None, params=None):
@@ -121,7 +161,8 @@ class AsyncServers(AsyncPterodactylAPI):
         endpoint = 'application/servers/{}/databases'.format(server_id)
         response = await self._api_request(endpoint=endpoint, includes=includes,
                                            params=params)
-        return PaginatedResponse(self, endpoint, response)
+        return PaginatedResponse(self, endpoint, response, params=params,
+                                 includes=includes)
 
     async def get_server_database_info(self, server_id, database_id, detail=False,
                                  includes=None, params=None):
@@ -246,10 +287,7 @@ class AsyncServers(AsyncPterodactylAPI):
                                   'location_ids')
 
         # Fetch the Egg variables which are required to create the server.
-        egg_info_response = await self._api_request(
-            endpoint='application/nests/{}/eggs/{}'.format(
-                nest_id, egg_id), params={'include': 'variables'})
-        egg_info = egg_info_response['attributes']
+        egg_info = await self._get_egg(nest_id, egg_id)
         egg_vars = egg_info['relationships']['variables']['data']
 
         # Build a dict of environment variables.  Prefer values passed in the
@@ -305,8 +343,59 @@ class AsyncServers(AsyncPterodactylAPI):
 
         response = await self._api_request(endpoint='application/servers',
                                            mode='POST', data=data, json=False)
+        self._track_allocations(default_allocation, additional_allocations)
         return response
 
+    def _track_allocations(self, default_allocation, additional_allocations):
+        """Update the shared allocation index after creating a server."""
+        if self._allocation_index is None:
+            return
+        if default_allocation is None:
+            # The deployment service doesn't say which allocations it used.
+            self._allocation_index.invalidate()
+        else:
+            self._allocation_index.mark_assigned(
+                [default_allocation] + list(additional_allocations or ()))
+
+    async def create_servers_bulk(self, specs, concurrency=4):
+        """Create many servers, continuing past individual failures.
+
+        Each distinct egg is looked up once before any server is created,
+        then up to concurrency create_server() calls are awaited at once.
+        All requests go through the client's rate limiter and retries, so
+        429 responses slow the batch down instead of failing it.
+
+        Example:
+            bulk = await api.servers.create_servers_bulk([
+                {'name': 'one', 'user_id': 1, 'nest_id': 1, 'egg_id': 3,
+                 'memory_limit': 1024, 'swap_limit': 0, 'disk_limit': 0,
+                 'location_ids': [1]},
+                ...], concurrency=8)
+            for index, error in bulk.errors.items(): ...
+
+        Args:
+            specs(iter): Dicts of keyword arguments for create_server().
+            concurrency(int): Maximum number of servers created at once.
+
+        Returns:
+            BulkResponse: create_server() responses and errors keyed by the
+                    index of each spec.
+        """
+        specs = list(specs)
+        eggs = await self._run_bulk(
+            [(egg, functools.partial(self._get_egg, *egg))
+             for egg in self._unique_eggs(specs)], concurrency)
+        bulk = await self._run_bulk(
+            [(index, functools.partial(self.create_server, **spec))
+             for index, spec in enumerate(specs)
+             if self._egg_key(spec) not in eggs.errors], concurrency)
+        for index, spec in enumerate(specs):
+            if self._egg_key(spec) in eggs.errors:
+                bulk.errors[index] = eggs.errors[self._egg_key(spec)]
+        bulk.errors = {i: bulk.errors[i] for i in sorted(bulk.errors)}
+        bulk.elapsed += eggs.elapsed
+        return bulk
+
     async def update_server_details(self, server_id, name, user_id, external_id=None, description=None):
         """Updates the details of an existing server.
 
@@ -450,10 +539,7 @@ class AsyncServers(AsyncPterodactylAPI):
         merged_env = {}
         if egg_id is not None and egg_id != current_egg:
             nest_id = server_info['nest']
-            egg_info_response = await self._api_request(
-                endpoint='application/nests/{}/eggs/{}'.format(nest_id, egg_id),
-                params={'include': 'variables'})
-            egg_info = egg_info_response['attributes']
+            egg_info = await self._get_egg(nest_id, egg_id)
             egg_vars = egg_info['relationships']['variables']['data']
 
             # Build a dict of environment variables. Prefer values passed in
@@ -498,3 +584,71 @@ class AsyncServers(AsyncPterodactylAPI):
             endpoint='application/servers/{}/startup'.format(server_id),
             mode='PATCH', data=data, json=False)
         return response
+
+    async def _get_egg(self, nest_id, egg_id):
+        """Get an egg and its variables, using the egg cache if possible."""
+        egg_info = self.egg_cache.get(nest_id, egg_id)
+        if egg_info is None:
+            egg_info_response = await self._api_request(
+                endpoint='application/nests/{}/eggs/{}'.format(
+                    nest_id, egg_id), params={'include': 'variables'})
+            egg_info = egg_info_response['attributes']
+            self.egg_cache.set(nest_id, egg_id, egg_info)
+        return egg_info
+
+    @staticmethod
+    def _egg_key(spec):
+        return spec.get('nest_id'), spec.get('egg_id')
+
+    def _unique_eggs(self, specs):
+        """Distinct (nest_id, egg_id) pairs used by create_server specs."""
+        eggs = []
+        for spec in specs:
+            egg = self._egg_key(spec)
+            if None not in egg and egg not in eggs:
+                eggs.append(egg)
+        return eggs
+
+    async def prefetch_eggs(self):
+        """Load every egg and its variables into the egg cache.
+
+        Makes one request per page of nests, then requests the eggs of each
+        nest concurrently.
+
+        Returns:
+            int: Number of eggs loaded.
+        """
+        endpoint = 'application/nests'
+        params = {'per_page': 100}
+        nests = PaginatedResponse(
+            self, endpoint, await self._api_request(endpoint=endpoint,
+                                                    params=params),
+            params=params)
+        nest_ids = [nest['id'] async for nest in nests.aiter_items()]
+
+        async def load_eggs(nest_id):
+            endpoint = 'application/nests/{}/eggs'.format(nest_id)
+            params = {'per_page': 100}
+            eggs = PaginatedResponse(
+                self, endpoint,
+                await self._api_request(endpoint=endpoint, params=params,
+                                        includes=('variables',)),
+                params=params, includes=('variables',))
+            count = 0
+            async for egg in eggs.aiter_items():
+                self.egg_cache.set(nest_id, egg['id'], egg)
+                count += 1
+            return count
+
+        counts = await asyncio.gather(*[load_eggs(nest_id)
+                                        for nest_id in nest_ids])
+        return sum(counts)
+
+    def invalidate_eggs(self, nest_id=None, egg_id=None):
+        """Drop cached eggs so they are fetched again on next use.
+
+        Args:
+            nest_id(int): Only drop eggs in this nest.  Drops all if None.
+            egg_id(int): Only drop this egg, requires nest_id.
+        """
+        self.egg_cache.invalidate(nest_id, egg_id)
@@ -1,3 +1,5 @@
+import functools
+
 from pydactyl.api import base
 from pydactyl.api.async_base import AsyncPterodactylAPI
 from pydactyl.exceptions import BadRequestError
@@ -37,7 +39,8 @@ class AsyncUser(AsyncPterodactylAPI):
         endpoint = 'application/users'
         response = await self._api_request(endpoint=endpoint,
                                            includes=includes, params=filters)
-        return PaginatedResponse(self, endpoint, response)
+        return PaginatedResponse(self, endpoint, response, params=filters,
+                                 includes=includes)
 
     async def get_user_info(self, user_id=None, external_id=None, detail=True,
                       includes=None, params=None):
@@ -65,6 +68,34 @@ class AsyncUser(AsyncPterodactylAPI):
                                            params=params)
         return base.parse_response(response, detail=detail)
 
+    async def resolve_external_ids(self, external_ids, inventory=None,
+                                   concurrency=10):
+        """Look up many users by external_id.
+
+        Ids are answered from inventory when it has synced users,
+        otherwise from one paginated scan of every user.  Only ids the
+        inventory doesn't know, or that a scan of a large panel wasn't worth
+        it for, are looked up one request at a time.
+
+        Example:
+            bulk = await api.user.resolve_external_ids(
+                ['whmcs-12', 'whmcs-13'])
+            bulk.results['whmcs-12']['id']
+
+        Args:
+            external_ids(iter): IDs from an external system like WHMCS
+            inventory(Inventory): Loaded inventory to answer from.
+            concurrency(int): Maximum number of single lookups sent at once.
+
+        Returns:
+            BulkResponse: User attributes keyed by external id.  Ids
+                    with no user are in errors.
+        """
+        return await self._resolve_external_ids(
+            'users', external_ids, self.list_users,
+            functools.partial(self.get_user_info, detail=False),
+            inventory=inventory, concurrency=concurrency)
+
     async def create_user(self, username, email, first_name, last_name,
                     external_id=None, password=None, root_admin=False,
                     language='en'):
@@ -1,15 +1,250 @@
+import asyncio
+import email.utils
+import functools
+import random
+import time
+import warnings
+
 import aiohttp
 from pydactyl.api import base
 from pydactyl.exceptions import BadRequestError, PterodactylApiError
+from pydactyl.api.codec import STDLIB_CODEC, get_codec
 from pydactyl.constants import REQUEST_TYPES
+from pydactyl.responses import BulkResponse
+
+
+class AsyncSessionManager(object):
+    """Owns a long-lived aiohttp session shared by async API classes.
+
+    The session and its TCPConnector are created on first use inside the
+    running event loop and reused until closed, so every request shares the
+    same keepalive connections and DNS cache.
+    """
+
+    def __init__(self, limit=100, limit_per_host=0, keepalive_timeout=15,
+                 ttl_dns_cache=300):
+        """Initialize the session manager.
+
+        Args:
+            limit(int): Total number of simultaneous connections, 0 for no
+                    limit.
+            limit_per_host(int): Simultaneous connections to a single host,
+                    0 for no limit.
+            keepalive_timeout(float): Seconds to keep idle connections open.
+            ttl_dns_cache(int): Seconds to cache DNS lookups, None to cache
+                    forever.
+        """
+        self._connector_args = {
+            'limit': limit,
+            'limit_per_host': limit_per_host,
+            'keepalive_timeout': keepalive_timeout,
+            'ttl_dns_cache': ttl_dns_cache,
+        }
+        self._session = None
+        self._loop = None
+
+    @property
+    def session(self):
+        """The current session, or None if one hasn't been opened yet."""
+        return self._session
+
+    async def get_session(self):
+        """Get the shared session, creating it if required.
+
+        A new session is created if the previous one was closed or belongs to
+        a different event loop.
+        """
+        loop = asyncio.get_running_loop()
+        if (self._session is None or self._session.closed
+                or self._loop is not loop):
+            connector = aiohttp.TCPConnector(**self._connector_args)
+            self._session = aiohttp.ClientSession(connector=connector)
+            self._loop = loop
+        return self._session
+
+    async def close(self):
+        """Close the shared session and its connector."""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+        self._loop = None
+
+
+class AsyncRetry(object):
+    """Retry policy for async requests.
+
+    Mirrors the urllib3 Retry used by the sync client's HTTP adapter: the
+    first retry is immediate, later ones back off exponentially with some
+    random jitter.  A Retry-After header from the panel takes precedence
+    over the computed backoff.
+    """
+
+    def __init__(self, total=3, backoff_factor=1, status_forcelist=(429,),
+                 backoff_max=120):
+        """Initialize the retry policy.
+
+        Args:
+            total(int): Maximum number of retries per request.
+            backoff_factor(float): Base delay in seconds, doubled on each
+                    consecutive retry.
+            status_forcelist(iter): HTTP status codes that will be retried.
+            backoff_max(float): Maximum delay in seconds between retries.
+        """
+        self.total = total
+        self.backoff_factor = backoff_factor
+        self.status_forcelist = frozenset(status_forcelist)
+        self.backoff_max = backoff_max
+
+    def is_retryable(self, status):
+        """Whether a response with the given status should be retried."""
+        return status in self.status_forcelist
+
+    def get_backoff(self, attempt, retry_after=None):
+        """Get the number of seconds to wait before retrying.
+
+        Args:
+            attempt(int): Number of attempts made so far, starting at 1.
+            retry_after(str): Value of the response's Retry-After header.
+        """
+        if retry_after is not None:
+            seconds = self.parse_retry_after(retry_after)
+            if seconds is not None:
+                return min(seconds, self.backoff_max)
+
+        if attempt <= 1:
+            return 0
+        backoff = min(self.backoff_max,
+                      self.backoff_factor * (2 ** (attempt - 1)))
+        return random.uniform(backoff / 2, backoff)
+
+    @staticmethod
+    def parse_retry_after(retry_after):
+        """Parse a Retry-After header in seconds or HTTP-date format.
+
+        Returns:
+            float: Seconds to wait, or None if the header is invalid.
+        """
+        retry_after = retry_after.strip()
+        if retry_after.isdigit():
+            return float(retry_after)
+        retry_date = email.utils.parsedate_tz(retry_after)
+        if retry_date is None:
+            return None
+        return max(0.0, email.utils.mktime_tz(retry_date) - time.time())
+
 
 class AsyncPterodactylAPI(object):
     """Async Pterodactyl API client."""
 
-    def __init__(self, url, api_key, session=None):
+    def __init__(self, url, api_key, session=None, session_manager=None,
+                 retry=None, rate_limiter=None, cache=None, json_codec=None,
+                 allocation_index=None):
         self._api_key = api_key
         self._url = url
         self._session = session
+        self._session_manager = session_manager
+        self._retry = retry
+        self._rate_limiter = rate_limiter
+        self._cache = cache
+        self._json_codec = get_codec(json_codec)
+        self._allocation_index = allocation_index
+
+    def _build_api(self, api_class):
+        """Create another API class sharing this one's session."""
+        return api_class(self._url, self._api_key, self._session,
+                         session_manager=self._session_manager,
+                         retry=self._retry, rate_limiter=self._rate_limiter,
+                         cache=self._cache, json_codec=self._json_codec,
+                         allocation_index=self._allocation_index)
+
+    async def _get_session(self):
+        """Get the session to use for requests.
+
+        Returns:
+            aiohttp.ClientSession: An open session, or None if neither a
+                    session nor a session manager is available.
+        """
+        if self._session is not None and not self._session.closed:
+            return self._session
+        if self._session_manager is not None:
+            return await self._session_manager.get_session()
+        return None
+
+    async def _run_bulk(self, calls, concurrency=None, stagger=0):
+        """Run many calls, collecting each result or error.
+
+        Args:
+            calls(iter): (key, coroutine function) pairs, each function takes
+                    no arguments.
+            concurrency(int): Maximum number of calls awaited at once.  Calls
+                    run one after another if not set.
+            stagger(float): Minimum seconds between the start of consecutive
+                    calls.
+
+        Returns:
+            BulkResponse: Results and errors keyed by each call's key.
+        """
+        semaphore = asyncio.Semaphore(
+            concurrency if concurrency and concurrency > 1 else 1)
+        start = time.monotonic()
+
+        async def run(index, key, func):
+            async with semaphore:
+                delay = start + index * stagger - time.monotonic()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                call_start = time.monotonic()
+                try:
+                    outcome = True, await func()
+                except Exception as e:
+                    outcome = False, e
+                return (key, time.monotonic() - call_start) + outcome
+
+        outcomes = await asyncio.gather(
+            *[run(index, key, func)
+              for index, (key, func) in enumerate(calls)])
+        return BulkResponse.from_outcomes(outcomes,
+                                          time.monotonic() - start)
+
+    async def _resolve_external_ids(self, resource, external_ids, list_func,
+                                    get_func, inventory=None, concurrency=10,
+                                    per_page=100):
+        """Resolve many external ids with as few requests as possible.
+
+        See PterodactylAPI._resolve_external_ids(), list_func and get_func
+        are coroutine functions here.
+        """
+        start = time.monotonic()
+        external_ids = list(external_ids)
+        pending = {str(external_id): external_id
+                   for external_id in external_ids}
+        found = {}
+        missing = {}
+        if inventory is not None and resource in inventory.synced:
+            for key in list(pending):
+                record = inventory.get(resource, key, 'external_id')
+                if record is not None:
+                    found[pending.pop(key)] = record
+        elif pending:
+            response = await list_func(params={'per_page': per_page})
+            pages = response.meta.get('pagination', {}).get('total_pages', 1)
+            base.match_external_ids(response.data, pending, found)
+            if pending and pages - 1 < len(pending):
+                async for item in response.aiter_items():
+                    base.match_external_ids((item,), pending, found)
+                    if not pending:
+                        break
+                missing = base.not_found_errors(resource, pending)
+                pending = {}
+
+        bulk = await self._run_bulk(
+            [(external_id, functools.partial(get_func,
+                                             external_id=external_id))
+             for external_id in pending.values()], concurrency)
+        bulk.results.update(found)
+        bulk.errors.update(missing)
+        bulk.elapsed = time.monotonic() - start
+        return bulk.reorder(external_ids)
 
     def _get_headers(self):
         """Headers to use for API calls."""
@@ -33,6 +268,8 @@ class AsyncPterodactylAPI(object):
             headers.update(override_headers)
 
         if includes:
+            # Copy params so the caller's dict isn't modified.
+            params = dict(params or {})
             include_str = ','.join(includes)
             if params and params.get('include'):
                 params['include'] += ',' + include_str
@@ -41,43 +278,103 @@ class AsyncPterodactylAPI(object):
             else:
                 params = {'include': include_str}
 
-        # Create a session if one wasn't provided or if it's closed
-        local_session = False
-        if self._session is None or self._session.closed:
-            self._session = aiohttp.ClientSession()
-            local_session = True
+        if mode not in REQUEST_TYPES:
+            raise BadRequestError(
+                'Invalid request type specified(%s).  Must be one of %r.' % (
+                    mode, REQUEST_TYPES))
+
+        cache_key = cache_entry = None
+        cache_ttl = 0
+        if self._cache is not None:
+            if mode != 'GET':
+                self._cache.invalidate(url)
+            elif json is not False:
+                cache_ttl = self._cache.get_ttl(endpoint)
+            if cache_ttl:
+                cache_key = self._cache.make_key(url, params,
+                                                 self._api_key)
+                cache_entry = self._cache.lookup(cache_key)
+            if cache_entry is not None:
+                if cache_entry.fresh:
+                    return self._cache.get_data(cache_entry)
+                headers.update(cache_entry.validators())
+
+        # Fall back to a temporary session if no shared one is available.
+        # This pays for a new connection on every request.
+        session = await self._get_session()
+        local_session = session is None
+        if local_session:
+            warnings.warn(
+                'Creating a temporary aiohttp session for this request.  Use '
+                'AsyncPterodactylClient or "async with" to reuse connections.',
+                RuntimeWarning, stacklevel=2)
+            session = aiohttp.ClientSession()
 
         try:
-            if mode == 'GET':
-                async with self._session.get(url, params=params, headers=headers) as response:
-                    return await self._handle_response(response, json)
-            elif mode == 'POST':
-                if data_as_json:
-                    async with self._session.post(url, params=params, headers=headers, json=data) as response:
-                        return await self._handle_response(response, json)
-                else:
-                    async with self._session.post(url, params=params, headers=headers, data=data) as response:
-                        return await self._handle_response(response, json)
-            elif mode == 'PATCH':
-                async with self._session.patch(url, params=params, headers=headers, json=data) as response:
-                    return await self._handle_response(response, json)
-            elif mode == 'DELETE':
-                async with self._session.delete(url, params=params, headers=headers, json=data) as response:
-                    return await self._handle_response(response, json)
-            elif mode == 'PUT':
-                async with self._session.put(url, params=params, headers=headers, json=data) as response:
-                    return await self._handle_response(response, json)
-            else:
-                raise BadRequestError(
-                    'Invalid request type specified(%s).  Must be one of %r.' % (
-                        mode, REQUEST_TYPES))
+            attempt = 0
+            while True:
+                attempt += 1
+                can_retry = (self._retry is not None
+                             and attempt <= self._retry.total)
+                if self._rate_limiter is not None:
+                    await self._rate_limiter.acquire_async()
+                try:
+                    async with self._send_request(
+                            session, mode, url, params, headers, data,
+                            data_as_json) as response:
+                        if self._rate_limiter is not None:
+                            self._rate_limiter.update(response.headers)
+                        if cache_entry is not None and response.status == 304:
+                            self._cache.revalidated(cache_entry, cache_ttl)
+                            return self._cache.get_data(cache_entry)
+                        if not (can_retry and self._retry.is_retryable(
+                                response.status)):
+                            result = await self._handle_response(response,
+                                                                 json)
+                            if (cache_key is not None
+                                    and isinstance(result, dict) and result):
+                                self._cache.store(cache_key, result,
+                                                  response.headers, cache_ttl)
+                            return result
+                        delay = self._retry.get_backoff(
+                            attempt, response.headers.get('Retry-After'))
+                except (aiohttp.ClientConnectionError,
+                        asyncio.TimeoutError):
+                    if not can_retry:
+                        raise
+                    delay = self._retry.get_backoff(attempt)
+                await asyncio.sleep(delay)
         finally:
             if local_session:
-                await self._session.close()
+                await session.close()
+
+    @staticmethod
+    def _send_request(session, mode, url, params, headers, data,
+                      data_as_json):
+        """Start the request, returning the aiohttp response context."""
+        if mode == 'GET':
+            return session.get(url, params=params, headers=headers)
+        elif mode == 'POST':
+            if data_as_json:
+                return session.post(url, params=params, headers=headers,
+                                    json=data)
+            return session.post(url, params=params, headers=headers,
+                                data=data)
+        elif mode == 'PATCH':
+            return session.patch(url, params=params, headers=headers,
+                                 json=data)
+        elif mode == 'DELETE':
+            return session.delete(url, params=params, headers=headers,
+                                  json=data)
+        elif mode == 'PUT':
+            return session.put(url, params=params, headers=headers, json=data)
 
     async def _handle_response(self, response, json_output):
         try:
-            response_json = await response.json()
+            if self._json_codec is STDLIB_CODEC:
+                response_json = await response.json()
+            else:
+                response_json = self._json_codec.loads(await response.read())
         except Exception:
             response_json = {}
 
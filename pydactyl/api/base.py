@@ -1,8 +1,14 @@
+import functools
+import time
+from concurrent.futures import ThreadPoolExecutor
+
 import requests
 
+from pydactyl.api.codec import STDLIB_CODEC, get_codec
 from pydactyl.constants import REQUEST_TYPES
 from pydactyl.exceptions import BadRequestError
 from pydactyl.exceptions import PterodactylApiError
+from pydactyl.responses import BulkResponse
 
 
 def parse_response(response, detail=False):
@@ -34,13 +40,138 @@ def url_join(*args):
     return '/'.join(arg.strip('/') for arg in args)
 
 
+def match_external_ids(items, pending, found):
+    """Move listed records whose external_id is pending into found.
+
+    Args:
+        items(iter): Record attributes from a listing.
+        pending(dict): str(external_id) to the external_id as requested.
+        found(dict): Requested external_id to record attributes.
+    """
+    for item in items:
+        if not pending:
+            return
+        if isinstance(item, dict) and 'attributes' in item:
+            item = item['attributes']
+        external_id = item.get('external_id')
+        if external_id is not None and str(external_id) in pending:
+            found[pending.pop(str(external_id))] = item
+
+
+def not_found_errors(resource, pending):
+    """Errors for external ids that a complete listing didn't contain."""
+    return {external_id: KeyError('No {} with external_id {}'.format(
+        resource[:-1], external_id)) for external_id in pending.values()}
+
+
 class PterodactylAPI(object):
     """Pterodactyl API client."""
 
-    def __init__(self, url, api_key, session=None):
+    def __init__(self, url, api_key, session=None, rate_limiter=None,
+                 cache=None, json_codec=None, allocation_index=None):
         self._api_key = api_key
         self._url = url
         self._session = session or requests.Session()
+        self._rate_limiter = rate_limiter
+        self._cache = cache
+        self._json_codec = get_codec(json_codec)
+        self._allocation_index = allocation_index
+
+    def _build_api(self, api_class):
+        """Create another API class sharing this one's session."""
+        return api_class(self._url, self._api_key, self._session,
+                         rate_limiter=self._rate_limiter, cache=self._cache,
+                         json_codec=self._json_codec,
+                         allocation_index=self._allocation_index)
+
+    def _run_bulk(self, calls, concurrency=None, stagger=0):
+        """Run many calls, collecting each result or error.
+
+        Args:
+            calls(iter): (key, callable) pairs, each callable takes no
+                    arguments.
+            concurrency(int): Maximum number of calls to run at once using a
+                    thread pool.  Calls run one after another if not set.
+            stagger(float): Minimum seconds between the start of consecutive
+                    calls.
+
+        Returns:
+            BulkResponse: Results and errors keyed by each call's key.
+        """
+        start = time.monotonic()
+
+        def run(indexed_call):
+            index, (key, func) = indexed_call
+            delay = start + index * stagger - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            call_start = time.monotonic()
+            try:
+                outcome = True, func()
+            except Exception as e:
+                outcome = False, e
+            return (key, time.monotonic() - call_start) + outcome
+
+        calls = list(enumerate(calls))
+        if concurrency and concurrency > 1 and len(calls) > 1:
+            with ThreadPoolExecutor(max_workers=concurrency) as executor:
+                outcomes = list(executor.map(run, calls))
+        else:
+            outcomes = [run(call) for call in calls]
+        return BulkResponse.from_outcomes(outcomes,
+                                          time.monotonic() - start)
+
+    def _resolve_external_ids(self, resource, external_ids, list_func,
+                              get_func, inventory=None, concurrency=10,
+                              per_page=100):
+        """Resolve many external ids with as few requests as possible.
+
+        Ids are answered from the inventory when it has synced the resource,
+        ids it doesn't know are looked up one by one.  Without an inventory
+        one paginated scan is used, unless the listing has more pages left
+        than ids left to find, then the rest are looked up one by one.
+
+        Args:
+            resource(str): Inventory resource name, 'users' or 'servers'.
+            external_ids(iter): External ids to resolve.
+            list_func(callable): List method, called with params.
+            get_func(callable): Single lookup, called with external_id.
+            inventory(Inventory): Loaded inventory to answer from.
+            concurrency(int): Maximum number of lookups sent at once.
+            per_page(int): Records per page when scanning.
+
+        Returns:
+            BulkResponse: Attributes keyed by external id, and errors for ids
+                    that don't exist or couldn't be looked up.
+        """
+        start = time.monotonic()
+        external_ids = list(external_ids)
+        pending = {str(external_id): external_id
+                   for external_id in external_ids}
+        found = {}
+        missing = {}
+        if inventory is not None and resource in inventory.synced:
+            for key in list(pending):
+                record = inventory.get(resource, key, 'external_id')
+                if record is not None:
+                    found[pending.pop(key)] = record
+        elif pending:
+            response = list_func(params={'per_page': per_page})
+            pages = response.meta.get('pagination', {}).get('total_pages', 1)
+            match_external_ids(response.data, pending, found)
+            if pending and pages - 1 < len(pending):
+                match_external_ids(response.iter_items(), pending, found)
+                missing = not_found_errors(resource, pending)
+                pending = {}
+
+        bulk = self._run_bulk(
+            [(external_id, functools.partial(get_func,
+                                             external_id=external_id))
+             for external_id in pending.values()], concurrency)
+        bulk.results.update(found)
+        bulk.errors.update(missing)
+        bulk.elapsed = time.monotonic() - start
+        return bulk.reorder(external_ids)
 
     def _get_headers(self):
         """Headers to use for API calls."""
@@ -85,6 +216,8 @@ class PterodactylAPI(object):
             headers.update(override_headers)
 
         if includes:
+            # Copy params so the caller's dict isn't modified.
+            params = dict(params or {})
             include_str = ','.join(includes)
             if params and params.get('include'):
                 params['include'] += ',' + include_str
@@ -93,6 +226,25 @@ class PterodactylAPI(object):
             else:
                 params = {'include': include_str}
 
+        cache_key = cache_entry = None
+        cache_ttl = 0
+        if self._cache is not None:
+            if mode != 'GET':
+                self._cache.invalidate(url)
+            elif json is not False:
+                cache_ttl = self._cache.get_ttl(endpoint)
+            if cache_ttl:
+                cache_key = self._cache.make_key(url, params,
+                                                 self._api_key)
+                cache_entry = self._cache.lookup(cache_key)
+            if cache_entry is not None:
+                if cache_entry.fresh:
+                    return self._cache.get_data(cache_entry)
+                headers.update(cache_entry.validators())
+
+        if self._rate_limiter is not None:
+            self._rate_limiter.acquire()
+
         if mode == 'GET':
             response = self._session.get(url, params=params, headers=headers)
         elif mode == 'POST':
@@ -115,8 +267,18 @@ class PterodactylAPI(object):
                 'Invalid request type specified(%s).  Must be one of %r.' % (
                     mode, REQUEST_TYPES))
 
+        if self._rate_limiter is not None:
+            self._rate_limiter.update(response.headers)
+
+        if cache_entry is not None and response.status_code == 304:
+            self._cache.revalidated(cache_entry, cache_ttl)
+            return self._cache.get_data(cache_entry)
+
         try:
-            response_json = response.json()
+            if self._json_codec is STDLIB_CODEC:
+                response_json = response.json()
+            else:
+                response_json = self._json_codec.loads(response.content)
         except ValueError:
             response_json = {}
 
@@ -126,6 +288,10 @@ class PterodactylAPI(object):
         else:
             response.raise_for_status()
 
+        if cache_key is not None and response_json:
+            self._cache.store(cache_key, response_json, response.headers,
+                              cache_ttl)
+
         if json is True:
             return response_json
         elif json is False:
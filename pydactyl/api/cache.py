@@ -0,0 +1,294 @@
+"""Opt-in HTTP response cache for read-heavy API endpoints."""
+import copy
+import fnmatch
+import hashlib
+import re
+import threading
+import time
+from collections import OrderedDict
+
+# Endpoints reporting live server state, never cached whatever the policy.
+UNCACHED_ENDPOINTS = ('client/servers/*/resources',
+                      'client/servers/*/websocket')
+
+# Endpoints cached by default, everything else is only cached when a policy
+# or the cache's TTL allows it.  Allocations change whenever a server is
+# created, so they are left out of the node policy.
+DEFAULT_POLICIES = {
+    'application/nests*': 3600,
+    'application/locations*': 600,
+    'application/nodes/*/allocations*': 0,
+    'application/nodes*': 300,
+    'client/permissions': 3600,
+}
+
+# A server's own URL, writes below it drop everything cached for the server.
+_SERVER_URL = re.compile(r'^(.*/(?:client|application)/servers/[^/]+)/')
+
+
+class CacheEntry(object):
+    """A cached JSON response and its validators."""
+
+    __slots__ = ('data', 'expires', 'etag', 'last_modified')
+
+    def __init__(self, data, expires, etag=None, last_modified=None):
+        self.data = data
+        self.expires = expires
+        self.etag = etag
+        self.last_modified = last_modified
+
+    @property
+    def fresh(self):
+        return time.monotonic() < self.expires
+
+    def validators(self):
+        """Conditional request headers used to revalidate a stale entry."""
+        headers = {}
+        if self.etag:
+            headers['If-None-Match'] = self.etag
+        if self.last_modified:
+            headers['If-Modified-Since'] = self.last_modified
+        return headers
+
+
+class ResponseCache(object):
+    """LRU cache of GET responses with TTL expiry and revalidation.
+
+    Fresh entries are returned without contacting the panel.  Once an entry
+    expires it is revalidated with If-None-Match or If-Modified-Since when
+    the panel sent an ETag or Last-Modified header, and a 304 response
+    extends the entry's lifetime.  Any POST, PATCH, PUT or DELETE to an
+    endpoint drops cached responses for that endpoint, everything below it,
+    and its parent listing.  A write below a server, e.g. a power action,
+    drops everything cached for that server.
+
+    Policies override the default TTL for endpoints matching a glob
+    pattern, the first matching pattern wins.  A TTL of 0 disables caching.
+    By default only the endpoints in DEFAULT_POLICIES are cached, and
+    server resources and websocket credentials never are.
+
+        ResponseCache(ttl=0, policies={
+            'application/nests*': 3600,
+            'application/locations*': 600,
+        })
+    """
+
+    def __init__(self, ttl=0, max_entries=512, policies=None):
+        """Initialize the response cache.
+
+        Args:
+            ttl(float): Seconds responses stay fresh unless a policy matches.
+            max_entries(int): Maximum number of responses to keep, the least
+                    recently used are evicted first.
+            policies(dict): Endpoint glob patterns mapped to a TTL in
+                    seconds, e.g. {'application/nests*': 3600}.  Defaults to
+                    DEFAULT_POLICIES.
+        """
+        if policies is None:
+            policies = DEFAULT_POLICIES
+        self._ttl = ttl
+        self._max_entries = max_entries
+        self._policies = list(policies.items())
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.revalidations = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get_ttl(self, endpoint):
+        """Get the TTL in seconds that applies to an endpoint."""
+        endpoint = endpoint.strip('/')
+        for pattern in UNCACHED_ENDPOINTS:
+            if fnmatch.fnmatchcase(endpoint, pattern):
+                return 0
+        for pattern, ttl in self._policies:
+            if fnmatch.fnmatchcase(endpoint, pattern):
+                return ttl
+        return self._ttl
+
+    @staticmethod
+    def make_key(url, params=None, api_key=None):
+        """Build the cache key for a request.
+
+        The key includes a hash of the API key, so responses are never
+        served to a client authenticated with a different key.
+        """
+        params = tuple(sorted((str(k), str(v))
+                              for k, v in (params or {}).items()))
+        if api_key is None:
+            return url, params, None
+        return url, params, hashlib.sha256(api_key.encode()).hexdigest()
+
+    def lookup(self, key):
+        """Find a cached entry, counting a hit if it is still fresh.
+
+        Returns:
+            CacheEntry: The cached entry, fresh or stale, or None.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            if entry is not None and entry.fresh:
+                self.hits += 1
+            else:
+                self.misses += 1
+            return entry
+
+    def store(self, key, data, headers, ttl):
+        """Cache response data along with its validators.
+
+        Args:
+            key(tuple): Key from make_key().
+            data(dict): Decoded JSON response.
+            headers(dict): Response headers.
+            ttl(float): Seconds the response stays fresh.
+        """
+        entry = CacheEntry(copy.deepcopy(data), time.monotonic() + ttl,
+                           etag=headers.get('ETag'),
+                           last_modified=headers.get('Last-Modified'))
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def revalidated(self, entry, ttl):
+        """Mark a stale entry fresh after the panel returned 304."""
+        with self._lock:
+            entry.expires = time.monotonic() + ttl
+            self.revalidations += 1
+
+    @staticmethod
+    def get_data(entry):
+        """Copy of the entry's data, safe for the caller to modify."""
+        return copy.deepcopy(entry.data)
+
+    def invalidate(self, url):
+        """Drop responses affected by a write to url."""
+        url = url.rstrip('/')
+        server = _SERVER_URL.match(url)
+        if server is not None:
+            url = server.group(1)
+        parent = url.rsplit('/', 1)[0]
+        with self._lock:
+            for key in list(self._entries):
+                cached_url = key[0]
+                if (cached_url == url or cached_url == parent
+                        or cached_url.startswith(url + '/')):
+                    del self._entries[key]
+
+    def clear(self):
+        """Drop every cached response."""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        """Cache statistics.
+
+        Returns:
+            dict: Hit, miss, revalidation and eviction counts, the number
+                    of cached responses and the hit ratio.
+        """
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'revalidations': self.revalidations,
+            'evictions': self.evictions,
+            'entries': len(self._entries),
+            'hit_ratio': self.hits / lookups if lookups else 0.0,
+        }
+
+
+class EggCache(object):
+    """Egg definitions, including variables, keyed by (nest_id, egg_id).
+
+    Creating a server or changing its egg requires the egg's variables.
+    Caching them avoids a lookup before every write.
+    """
+
+    def __init__(self, ttl=300):
+        """Initialize the egg cache.
+
+        Args:
+            ttl(float): Seconds an egg definition is reused, 0 to disable.
+        """
+        self.ttl = ttl
+        self._eggs = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._eggs)
+
+    @staticmethod
+    def _key(nest_id, egg_id):
+        return str(nest_id), str(egg_id)
+
+    def get(self, nest_id, egg_id):
+        """Get a cached egg definition.
+
+        Returns:
+            dict: Egg attributes including relationships.variables, or None
+                    if the egg isn't cached or has expired.
+        """
+        key = self._key(nest_id, egg_id)
+        with self._lock:
+            entry = self._eggs.get(key)
+            if entry is None:
+                return None
+            egg_info, expires = entry
+            if time.monotonic() >= expires:
+                del self._eggs[key]
+                return None
+            return egg_info
+
+    def set(self, nest_id, egg_id, egg_info):
+        """Cache an egg definition.
+
+        Args:
+            nest_id(int): Pterodactyl Nest ID.
+            egg_id(int): Pterodactyl Egg ID.
+            egg_info(dict): Egg attributes including variables.
+        """
+        if not self.ttl:
+            return
+        with self._lock:
+            self._eggs[self._key(nest_id, egg_id)] = (
+                egg_info, time.monotonic() + self.ttl)
+
+    def invalidate(self, nest_id=None, egg_id=None):
+        """Drop cached eggs.
+
+        Args:
+            nest_id(int): Only drop eggs in this nest.
+            egg_id(int): Only drop this egg, requires nest_id.
+        """
+        with self._lock:
+            if nest_id is None:
+                self._eggs.clear()
+            elif egg_id is None:
+                for key in [k for k in self._eggs if k[0] == str(nest_id)]:
+                    del self._eggs[key]
+            else:
+                self._eggs.pop(self._key(nest_id, egg_id), None)
+
+
+def get_response_cache(cache):
+    """Get a ResponseCache from a client's cache argument.
+
+    Args:
+        cache(bool|ResponseCache): True to cache the endpoints in
+                DEFAULT_POLICIES, an existing ResponseCache, or None/False
+                to disable caching.
+    """
+    if cache is None or cache is False:
+        return None
+    if cache is True:
+        return ResponseCache()
+    return cache
@@ -21,12 +21,14 @@ class AsyncClientAPI(AsyncPterodactylAPI):
 
     @property
     def account(self):
-        self._account = AsyncAccount(self._url, self._api_key, self._session)
+        if self._account is None:
+            self._account = self._build_api(AsyncAccount)
         return self._account
 
     @property
     def servers(self):
-        self._servers = AsyncClientServersAPI(self._url, self._api_key, self._session)
+        if self._servers is None:
+            self._servers = self._build_api(AsyncClientServersAPI)
         return self._servers
 
 
@@ -46,40 +48,48 @@ class AsyncClientServersAPI(AsyncServersBase, AsyncClientAPI):
 
     @property
     def backups(self):
-        self._backups = AsyncBackups(self._url, self._api_key, self._session)
+        if self._backups is None:
+            self._backups = self._build_api(AsyncBackups)
         return self._backups
 
     @property
     def databases(self):
-        self._databases = AsyncDatabases(self._url, self._api_key, self._session)
+        if self._databases is None:
+            self._databases = self._build_api(AsyncDatabases)
         return self._databases
 
     @property
     def files(self):
-        self._files = AsyncFiles(self._url, self._api_key, self._session)
+        if self._files is None:
+            self._files = self._build_api(AsyncFiles)
         return self._files
 
     @property
     def network(self):
-        self._network = AsyncNetwork(self._url, self._api_key, self._session)
+        if self._network is None:
+            self._network = self._build_api(AsyncNetwork)
         return self._network
 
     @property
     def schedules(self):
-        self._schedules = AsyncSchedules(self._url, self._api_key, self._session)
+        if self._schedules is None:
+            self._schedules = self._build_api(AsyncSchedules)
         return self._schedules
 
     @property
     def settings(self):
-        self._settings = AsyncSettings(self._url, self._api_key, self._session)
+        if self._settings is None:
+            self._settings = self._build_api(AsyncSettings)
         return self._settings
 
     @property
     def startup(self):
-        self._startup = AsyncStartup(self._url, self._api_key, self._session)
+        if self._startup is None:
+            self._startup = self._build_api(AsyncStartup)
         return self._startup
 
     @property
     def users(self):
-        self._users = AsyncUsers(self._url, self._api_key, self._session)
+        if self._users is None:
+            self._users = self._build_api(AsyncUsers)
         return self._users
@@ -30,12 +30,14 @@ class ClientAPI(PterodactylAPI):
 
     @property
     def account(self):
-        self._account = Account(self._url, self._api_key)
+        if self._account is None:
+            self._account = self._build_api(Account)
         return self._account
 
     @property
     def servers(self):
-        self._servers = ClientServersAPI(self._url, self._api_key)
+        if self._servers is None:
+            self._servers = self._build_api(ClientServersAPI)
         return self._servers
 
 
@@ -60,40 +62,48 @@ class ClientServersAPI(ServersBase, ClientAPI):
 
     @property
     def backups(self):
-        self._backups = Backups(self._url, self._api_key)
+        if self._backups is None:
+            self._backups = self._build_api(Backups)
         return self._backups
 
     @property
     def databases(self):
-        self._databases = Databases(self._url, self._api_key)
+        if self._databases is None:
+            self._databases = self._build_api(Databases)
         return self._databases
 
     @property
     def files(self):
-        self._files = Files(self._url, self._api_key)
+        if self._files is None:
+            self._files = self._build_api(Files)
         return self._files
 
     @property
     def network(self):
-        self._network = Network(self._url, self._api_key)
+        if self._network is None:
+            self._network = self._build_api(Network)
         return self._network
 
     @property
     def schedules(self):
-        self._schedules = Schedules(self._url, self._api_key)
+        if self._schedules is None:
+            self._schedules = self._build_api(Schedules)
         return self._schedules
 
     @property
     def settings(self):
-        self._settings = Settings(self._url, self._api_key)
+        if self._settings is None:
+            self._settings = self._build_api(Settings)
         return self._settings
 
     @property
     def startup(self):
-        self._startup = Startup(self._url, self._api_key)
+        if self._startup is None:
+            self._startup = self._build_api(Startup)
         return self._startup
 
     @property
     def users(self):
-        self._users = Users(self._url, self._api_key)
+        if self._users is None:
+            self._users = self._build_api(Users)
         return self._users
@@ -1,10 +1,23 @@
+import functools
+import logging
+import time
+
+import aiohttp
 from pydactyl.api import base
 from pydactyl.api.async_base import AsyncPterodactylAPI
+from pydactyl.api.client.servers.async_stats_collector import (
+    AsyncStatsCollector)
+from pydactyl.api.client.servers.async_utilization_poller import (
+    AsyncUtilizationPoller)
 from pydactyl.api.client.servers.async_websocket_client import AsyncWebsocketClient
+from pydactyl.api.client.servers.async_websocket_multiplexer import (
+    AsyncWebsocketMultiplexer)
 from pydactyl.constants import POWER_SIGNALS
 from pydactyl.exceptions import BadRequestError
 from pydactyl.responses import PaginatedResponse
 
+logger = logging.getLogger(__name__)
+
 
 class AsyncServersBase(AsyncPterodactylAPI):
     """Async Pterodactyl Client Server Base API.
@@ -13,6 +26,11 @@ class AsyncServersBase(AsyncPterodactylAPI):
     when using AsyncPterodactylClient.
     """
 
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.websockets = {}
+        self._server_states = {}
+
     async def list_servers(self, includes=None, params=None):
         """List all servers the client has access to.
 
@@ -23,7 +41,8 @@ class AsyncServersBase(AsyncPterodactylAPI):
         endpoint = 'client'
         response = await self._api_request(endpoint=endpoint, includes=includes,
                                      params=params)
-        return PaginatedResponse(self, endpoint, response)
+        return PaginatedResponse(self, endpoint, response, params=params,
+                                 includes=includes)
 
     async def list_permissions(self):
         """Retries all available permissions.
@@ -59,6 +78,10 @@ class AsyncServersBase(AsyncPterodactylAPI):
         """
         response = await self._api_request(
             endpoint='client/servers/{}/resources'.format(server_id))
+        if isinstance(response, dict):
+            state = response.get('attributes', {}).get('current_state')
+            if state is not None:
+                self._set_cached_state(server_id, state)
         return base.parse_response(response, detail)
 
     async def send_console_command(self, server_id, cmd):
@@ -105,6 +128,111 @@ class AsyncServersBase(AsyncPterodactylAPI):
                                      data=data, json=False)
         return response
 
+    async def send_power_action_many(self, server_ids, signal, concurrency=10,
+                                     stagger=0):
+        """Sends a power action to many servers.
+
+        The requests are sent with up to concurrency requests in flight.
+        Use stagger to spread out the actions, e.g. so a node isn't asked to
+        restart all of its servers at the same moment.
+
+        Args:
+            server_ids(iter): Server identifiers (abbreviated UUIDs)
+            signal(str): Power signal to send to the servers, see
+                    send_power_action() for valid options.
+            concurrency(int): Maximum number of requests sent at once.
+            stagger(float): Minimum seconds between sending the action to
+                    consecutive servers.
+
+        Returns:
+            BulkResponse: send_power_action() responses and errors keyed by
+                    server identifier.  Use stats() for batch timings.
+        """
+        if signal not in POWER_SIGNALS:
+            raise BadRequestError(
+                'Invalid power signal sent({}), must be one of: {}'.format(
+                    signal, POWER_SIGNALS))
+
+        calls = [(server_id, functools.partial(self.send_power_action,
+                                               server_id, signal))
+                 for server_id in dict.fromkeys(server_ids)]
+        return await self._run_bulk(calls, concurrency, stagger=stagger)
+
+    def get_cached_state(self, server_id, max_age=60):
+        """Get the last known power state of a server without a request.
+
+        States come from status events received by an open websocket from
+        get_websocket_client(), from get_server_utilization() and from
+        console commands rejected because the server is offline.
+
+        Args:
+            server_id(str): Server identifier (abbreviated UUID)
+            max_age(float): Ignore states older than this many seconds.
+                    States from an open websocket are always current.
+
+        Returns:
+            str: Power state, e.g. running or offline, or None if unknown.
+        """
+        ws = self.websockets.get(server_id)
+        if ws is not None and ws.connected and ws.state is not None:
+            return ws.state
+        cached = self._server_states.get(server_id)
+        if cached is not None and time.monotonic() - cached[1] <= max_age:
+            return cached[0]
+        return None
+
+    def _set_cached_state(self, server_id, state):
+        self._server_states[server_id] = (state, time.monotonic())
+
+    async def broadcast_console_command(self, server_ids, cmd, concurrency=10,
+                                        skip_offline=True, state_max_age=60):
+        """Sends a console command to many servers.
+
+        Servers with an open websocket from get_websocket_client() receive
+        the command over it, the rest receive it over HTTP with up to
+        concurrency requests in flight.  Servers known to be offline are
+        skipped instead of waiting for the panel to reject the command.
+
+        Args:
+            server_ids(iter): Server identifiers (abbreviated UUIDs)
+            cmd(str): Console command to send to the servers
+            concurrency(int): Maximum number of servers sent the command at
+                    once.
+            skip_offline(bool): Skip servers whose cached state is offline,
+                    see get_cached_state().
+            state_max_age(float): Ignore cached states older than this many
+                    seconds.
+
+        Returns:
+            BulkResponse: How the command was delivered to each server, one
+                    of 'websocket', 'http' or 'skipped', and errors for
+                    servers it couldn't be delivered to.
+        """
+        async def deliver(server_id):
+            if (skip_offline and self.get_cached_state(
+                    server_id, state_max_age) == 'offline'):
+                return 'skipped'
+            ws = self.websockets.get(server_id)
+            if ws is not None and ws.connected:
+                try:
+                    await ws.send_command(cmd)
+                    return 'websocket'
+                except Exception as e:
+                    logger.warning(
+                        'Websocket send to %s failed, using HTTP: %s',
+                        server_id, e)
+            try:
+                await self.send_console_command(server_id, cmd)
+            except aiohttp.ClientResponseError as e:
+                if e.status == 412:
+                    self._set_cached_state(server_id, 'offline')
+                raise
+            return 'http'
+
+        calls = [(server_id, functools.partial(deliver, server_id))
+                 for server_id in dict.fromkeys(server_ids)]
+        return await self._run_bulk(calls, concurrency)
+
     async def get_websocket(self, server_id):
         """Generates credentials to connect to the server's websocket.
 
@@ -117,21 +245,76 @@ class AsyncServersBase(AsyncPterodactylAPI):
         response = await self._api_request(endpoint=endpoint, mode='GET')
         return response
 
-    async def get_websocket_client(self, server_id):
+    async def get_websocket_client(self, server_id, **kwargs):
         """Get an authenticated websocket client for the server.
 
         Args:
             server_id(str): Server identifier (abbreviated UUID)
+            **kwargs: Other websocket client options, e.g. reconnect=True to
+                    reconnect with fresh credentials when the connection
+                    drops.
 
         Returns:
             WebsocketClient: An instantiated and ready-to-connect websocket client.
         """
         response = await self.get_websocket(server_id)
         data = response['data']
+        kwargs.setdefault('json_codec', self._json_codec)
 
         async def refresh_token():
             return await self.get_websocket(server_id)
 
-        return AsyncWebsocketClient(url=data['socket'], token=data['token'],
-                                    session=self._session,
-                                    token_refresher=refresh_token)
+        client = AsyncWebsocketClient(url=data['socket'], token=data['token'],
+                                      session=await self._get_session(),
+                                      token_refresher=refresh_token,
+                                      **kwargs)
+        self.websockets[server_id] = client
+        return client
+
+    def get_websocket_multiplexer(self, server_ids=(), **kwargs):
+        """Get a multiplexer that watches the websockets of many servers.
+
+        Use it as an async context manager to open the sockets, then iterate
+        listen() for (server_id, event) pairs from all of them.
+
+        Args:
+            server_ids(iter): Server identifiers (abbreviated UUIDs)
+            **kwargs: Other AsyncWebsocketMultiplexer options, e.g. events,
+                    exclude_events or max_queue.
+
+        Returns:
+            AsyncWebsocketMultiplexer: A multiplexer that hasn't started yet.
+        """
+        return AsyncWebsocketMultiplexer(self, server_ids, **kwargs)
+
+    def get_stats_collector(self, server_ids=(), size=360, **kwargs):
+        """Get a collector that keeps a rolling stats history per server.
+
+        Use it as an async context manager to start collecting, then read
+        collector.history or collector.summary() at any time.
+
+        Args:
+            server_ids(iter): Server identifiers (abbreviated UUIDs)
+            size(int): Number of samples kept per server.
+            **kwargs: Other AsyncStatsCollector options.
+
+        Returns:
+            AsyncStatsCollector: A collector that hasn't started yet.
+        """
+        return AsyncStatsCollector(self, server_ids, size=size, **kwargs)
+
+    def get_utilization_poller(self, server_ids=(), **kwargs):
+        """Get a poller that tracks the utilization of many servers.
+
+        Iterate listen() for (server_id, utilization) pairs of the servers
+        whose utilization changed, or call poll() for a single round.
+
+        Args:
+            server_ids(iter): Server identifiers (abbreviated UUIDs)
+            **kwargs: Other AsyncUtilizationPoller options, e.g. interval or
+                    concurrency.
+
+        Returns:
+            AsyncUtilizationPoller: A poller that hasn't polled yet.
+        """
+        return AsyncUtilizationPoller(self, server_ids, **kwargs)
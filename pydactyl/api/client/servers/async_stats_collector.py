@@ -0,0 +1,313 @@
+import asyncio
+import json
+import logging
+import time
+from array import array
+
+logger = logging.getLogger(__name__)
+
+# Numeric fields of a stats event, in the order they're stored.
+STATS_FIELDS = ('cpu_absolute', 'memory_bytes', 'memory_limit_bytes',
+                'disk_bytes', 'rx_bytes', 'tx_bytes', 'uptime')
+
+
+def parse_stats(event, loads=json.loads):
+    """Decode the payload of a stats websocket event.
+
+    Args:
+        event(dict): Event from a websocket client's listen().
+        loads(callable): JSON decoder for the payload string.
+
+    Returns:
+        tuple: (state, values) where values is a tuple of floats ordered
+                like STATS_FIELDS, missing fields are 0.
+    """
+    payload = event['args'][0]
+    if isinstance(payload, (str, bytes)):
+        payload = loads(payload)
+    network = payload.get('network') or {}
+    values = []
+    for field in STATS_FIELDS:
+        value = payload.get(field)
+        if value is None:
+            value = network.get(field)
+        values.append(float(value or 0))
+    return payload.get('state'), tuple(values)
+
+
+class StatsHistory:
+    """Fixed-size history of one server's stats.
+
+    Samples are kept in preallocated arrays of doubles used as ring buffers,
+    so memory stays the same no matter how many samples are added.  Once full,
+    each new sample replaces the oldest one.
+    """
+
+    def __init__(self, size=360):
+        """Initialize the history.
+
+        Args:
+            size(int): Number of samples to keep, e.g. 360 samples is 6
+                    minutes of stats sent every second.
+        """
+        if size < 1:
+            raise ValueError('size must be at least 1')
+        self.size = size
+        self.state = None
+        self._times = array('d', [0.0]) * size
+        self._columns = {field: array('d', [0.0]) * size
+                         for field in STATS_FIELDS}
+        self._next = 0
+        self._count = 0
+
+    def __len__(self):
+        return self._count
+
+    def __repr__(self):
+        return '<StatsHistory samples={}/{} state={}>'.format(
+            self._count, self.size, self.state)
+
+    def append(self, values, state=None, timestamp=None):
+        """Add a sample, replacing the oldest one if the history is full.
+
+        Args:
+            values(iter): Floats ordered like STATS_FIELDS, see parse_stats().
+            state(str): Power state reported with the sample.
+            timestamp(float): time.monotonic() of the sample, defaults to now.
+        """
+        i = self._next
+        self._times[i] = time.monotonic() if timestamp is None else timestamp
+        for field, value in zip(STATS_FIELDS, values):
+            self._columns[field][i] = value
+        if state is not None:
+            self.state = state
+        self._next = (i + 1) % self.size
+        self._count = min(self._count + 1, self.size)
+
+    def _window(self, column, window):
+        """Return the newest window samples of a column, oldest first."""
+        count = self._count if window is None else min(window, self._count)
+        start = (self._next - count) % self.size
+        if start + count <= self.size:
+            return column[start:start + count].tolist()
+        return (column[start:] + column[:self._next]).tolist()
+
+    def values(self, field, window=None):
+        """Get the samples of a field.
+
+        Args:
+            field(str): One of STATS_FIELDS, e.g. 'cpu_absolute'
+            window(int): Only the newest window samples, all if None.
+
+        Returns:
+            list: Sample values, oldest first.
+        """
+        return self._window(self._columns[field], window)
+
+    def timestamps(self, window=None):
+        """Get the time.monotonic() of each sample, oldest first."""
+        return self._window(self._times, window)
+
+    def latest(self):
+        """Get the newest sample.
+
+        Returns:
+            dict: Field values and the state, or None if empty.
+        """
+        if not self._count:
+            return None
+        i = (self._next - 1) % self.size
+        latest = {field: column[i] for field, column in self._columns.items()}
+        latest['state'] = self.state
+        return latest
+
+    def average(self, field, window=None):
+        """Mean of a field over the newest window samples, None if empty."""
+        values = self.values(field, window)
+        if not values:
+            return None
+        return sum(values) / len(values)
+
+    def percentile(self, field, percent, window=None):
+        """Percentile of a field over the newest window samples.
+
+        Args:
+            field(str): One of STATS_FIELDS, e.g. 'memory_bytes'
+            percent(float): Percentile between 0 and 100.
+            window(int): Only the newest window samples, all if None.
+
+        Returns:
+            float: The value, or None if empty.
+        """
+        values = sorted(self.values(field, window))
+        if not values:
+            return None
+        return values[min(len(values) - 1, int(len(values) * percent / 100))]
+
+    def rate(self, field, window=None):
+        """Per second increase of a counter, e.g. 'rx_bytes'.
+
+        Counters reset when the server restarts, so drops are ignored.
+
+        Returns:
+            float: The rate, or None with fewer than two samples.
+        """
+        values = self.values(field, window)
+        times = self.timestamps(window)
+        if len(values) < 2 or times[-1] <= times[0]:
+            return None
+        increase = sum(max(0.0, b - a) for a, b in zip(values, values[1:]))
+        return increase / (times[-1] - times[0])
+
+    def summary(self, window=None):
+        """Rolling statistics for every field.
+
+        Returns:
+            dict: Sample count, state and the latest, mean, 95th percentile
+                    and max of each field.  Network fields also have a rate
+                    in bytes per second.
+        """
+        summary = {'samples': min(self._count, window or self._count),
+                   'state': self.state}
+        for field in STATS_FIELDS:
+            values = sorted(self.values(field, window))
+            if not values:
+                continue
+            summary[field] = {
+                'latest': self._columns[field][(self._next - 1) % self.size],
+                'mean': sum(values) / len(values),
+                'p95': values[min(len(values) - 1, int(len(values) * 0.95))],
+                'max': values[-1],
+            }
+        for field in ('rx_bytes', 'tx_bytes'):
+            if field in summary:
+                summary[field]['rate'] = self.rate(field, window)
+        return summary
+
+
+class AsyncStatsCollector:
+    """Keep a rolling history of stats for many servers.
+
+    Stats events are read from each server's AsyncWebsocketClient through an
+    AsyncWebsocketMultiplexer, decoded once and stored in a StatsHistory per
+    server.  Memory use depends only on the number of servers and size.
+    """
+
+    def __init__(self, servers, server_ids=(), size=360, json_codec=None,
+                 **kwargs):
+        """Initialize the collector.
+
+        Args:
+            servers(AsyncServersBase): Client servers API used to open the
+                    websockets, e.g. api.client.servers
+            server_ids(iter): Server identifiers to collect stats for.
+            size(int): Number of samples kept per server.
+            json_codec(JSONCodec): Decoder for stats payloads, defaults to the
+                    one used by servers.
+            **kwargs: Other AsyncWebsocketMultiplexer options, e.g.
+                    max_queue=100
+        """
+        self._servers = servers
+        self._server_ids = list(server_ids)
+        self._size = size
+        codec = json_codec or getattr(servers, '_json_codec', None)
+        self._loads = codec.loads if codec is not None else json.loads
+        self._mux_kwargs = kwargs
+        self._multiplexer = None
+        self._task = None
+        self.history = {}
+
+    def record(self, server_id, event):
+        """Store a stats event.  Other events are ignored.
+
+        Args:
+            server_id(str): Server identifier (abbreviated UUID)
+            event(dict): Event from a websocket client's listen().
+
+        Returns:
+            StatsHistory: The server's history, or None if not stored.
+        """
+        if event.get('event') != 'stats' or not event.get('args'):
+            return None
+        try:
+            state, values = parse_stats(event, self._loads)
+        except (ValueError, TypeError, AttributeError) as e:
+            logger.warning('Bad stats from server %s: %s', server_id, e)
+            return None
+        history = self.history.get(server_id)
+        if history is None:
+            history = self.history[server_id] = StatsHistory(self._size)
+        history.append(values, state)
+        return history
+
+    async def collect(self, client, server_id):
+        """Record stats from one connected websocket client until it closes.
+
+        Args:
+            client(AsyncWebsocketClient): A connected client.
+            server_id(str): Identifier to store the stats under.
+        """
+        await client.request_stats()
+        async for event in client.listen(events=('stats',)):
+            self.record(server_id, event)
+
+    async def start(self):
+        """Open the websockets and collect stats in the background."""
+        if self._task is not None:
+            return
+        kwargs = dict(self._mux_kwargs)
+        kwargs.setdefault('request_stats', True)
+        kwargs.setdefault('reconnect', True)
+        self._multiplexer = self._servers.get_websocket_multiplexer(
+            self._server_ids, events=('stats',), **kwargs)
+        await self._multiplexer.start()
+        self._task = asyncio.ensure_future(self._run())
+
+    def add(self, server_id):
+        """Start collecting stats for another server."""
+        if self._multiplexer is None:
+            self._server_ids.append(server_id)
+            return
+        self._multiplexer.add(server_id)
+        # listen() ends whenever no server is being watched, e.g. when the
+        # collector started empty, so read the multiplexer again.
+        if self._task.done():
+            self._task = asyncio.ensure_future(self._run())
+
+    async def remove(self, server_id, keep_history=False):
+        """Stop collecting stats for a server.
+
+        Args:
+            server_id(str): Server identifier (abbreviated UUID)
+            keep_history(bool): Keep the samples collected so far.
+        """
+        if self._multiplexer is not None:
+            await self._multiplexer.remove(server_id)
+        if not keep_history:
+            self.history.pop(server_id, None)
+
+    async def _run(self):
+        async for server_id, event in self._multiplexer.listen():
+            self.record(server_id, event)
+
+    async def close(self):
+        """Close the websockets, the collected history is kept."""
+        if self._multiplexer is not None:
+            await self._multiplexer.close()
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+        self._multiplexer = None
+        self._task = None
+
+    def summary(self, window=None):
+        """Rolling statistics for every server, see StatsHistory.summary()."""
+        return {server_id: history.summary(window)
+                for server_id, history in self.history.items()}
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
@@ -0,0 +1,206 @@
+import asyncio
+import functools
+import logging
+import time
+
+import aiohttp
+
+logger = logging.getLogger(__name__)
+
+# Smallest change in each resource that counts as a change.  Network
+# counters and uptime grow constantly, so they're ignored by default.
+DEFAULT_TOLERANCES = {
+    'cpu_absolute': 1.0,
+    'memory_bytes': 1024 * 1024,
+    'disk_bytes': 1024 * 1024,
+}
+
+TABLE_COLUMNS = ('server_id', 'current_state', 'cpu_absolute', 'memory_bytes',
+                 'disk_bytes', 'network_rx_bytes', 'network_tx_bytes',
+                 'uptime')
+
+
+def utilization_changed(old, new, tolerances=None):
+    """Check whether a server's utilization changed meaningfully.
+
+    Args:
+        old(dict): Previous get_server_utilization() result, or None.
+        new(dict): Latest get_server_utilization() result.
+        tolerances(dict): Resource name to smallest absolute change that
+                counts, defaults to DEFAULT_TOLERANCES.
+
+    Returns:
+        bool: True if the state, suspension or a watched resource changed.
+    """
+    if old is None:
+        return True
+    if (old.get('current_state') != new.get('current_state') or
+            old.get('is_suspended') != new.get('is_suspended')):
+        return True
+    if tolerances is None:
+        tolerances = DEFAULT_TOLERANCES
+    old_resources = old.get('resources') or {}
+    new_resources = new.get('resources') or {}
+    for field, tolerance in tolerances.items():
+        if abs((new_resources.get(field) or 0) -
+               (old_resources.get(field) or 0)) >= tolerance:
+            return True
+    return False
+
+
+class AsyncUtilizationPoller:
+    """Poll the resource utilization of many servers.
+
+    Each round fetches get_server_utilization() for every server concurrently
+    over the client's shared session.  Only servers whose utilization changed
+    are reported.  When the panel answers 429 Too Many Requests the interval
+    is doubled, up to max_interval, and it recovers once rounds succeed again.
+    """
+
+    def __init__(self, servers, server_ids=(), interval=10, concurrency=10,
+                 max_interval=120, tolerances=None):
+        """Initialize the poller.
+
+        Args:
+            servers(AsyncServersBase): Client servers API used to fetch
+                    utilization, e.g. api.client.servers
+            server_ids(iter): Server identifiers to poll.
+            interval(float): Seconds between the start of each round.
+            concurrency(int): Maximum number of requests sent at once.
+            max_interval(float): Longest interval while rate limited.
+            tolerances(dict): Smallest resource changes reported, see
+                    utilization_changed().
+        """
+        self._servers = servers
+        self._server_ids = list(dict.fromkeys(server_ids))
+        self._concurrency = concurrency
+        self._tolerances = tolerances
+        self._stopped = None
+        self.base_interval = interval
+        self.max_interval = max_interval
+        self.interval = interval
+        self.snapshot = {}
+        self.updated = {}
+        self.errors = {}
+
+    def add(self, server_id):
+        """Poll another server from the next round."""
+        if server_id not in self._server_ids:
+            self._server_ids.append(server_id)
+
+    def remove(self, server_id):
+        """Stop polling a server and forget its utilization."""
+        if server_id in self._server_ids:
+            self._server_ids.remove(server_id)
+        self.snapshot.pop(server_id, None)
+        self.updated.pop(server_id, None)
+        self.errors.pop(server_id, None)
+
+    async def poll(self):
+        """Fetch the utilization of every server once.
+
+        Returns:
+            dict: Utilization of the servers that changed since the last
+                    round, keyed by server identifier.
+        """
+        calls = [(server_id, functools.partial(
+                    self._servers.get_server_utilization, server_id))
+                 for server_id in self._server_ids]
+        response = await self._servers._run_bulk(calls, self._concurrency)
+
+        now = time.monotonic()
+        changes = {}
+        for server_id, utilization in response.results.items():
+            self.errors.pop(server_id, None)
+            if utilization_changed(self.snapshot.get(server_id), utilization,
+                                   self._tolerances):
+                changes[server_id] = utilization
+            self.snapshot[server_id] = utilization
+            self.updated[server_id] = now
+
+        rate_limited = False
+        for server_id, error in response.errors.items():
+            self.errors[server_id] = error
+            if (isinstance(error, aiohttp.ClientResponseError)
+                    and error.status == 429):
+                rate_limited = True
+            else:
+                logger.warning('Polling server %s failed: %s', server_id,
+                               error)
+        self._adjust_interval(rate_limited)
+        return changes
+
+    def _adjust_interval(self, rate_limited):
+        if rate_limited:
+            interval = min(self.max_interval, self.interval * 2)
+            if interval != self.interval:
+                logger.warning('Rate limited, polling every %ss', interval)
+        else:
+            interval = max(self.base_interval, self.interval / 2)
+        self.interval = interval
+
+    async def listen(self):
+        """Async generator of utilization changes, polling until stop().
+
+        Yields:
+            tuple: (server_id, utilization dict) for each changed server.
+        """
+        self._stopped = asyncio.Event()
+        while not self._stopped.is_set():
+            start = time.monotonic()
+            for change in (await self.poll()).items():
+                yield change
+            delay = self.interval - (time.monotonic() - start)
+            if delay > 0:
+                try:
+                    await asyncio.wait_for(self._stopped.wait(), delay)
+                except asyncio.TimeoutError:
+                    pass
+
+    def stop(self):
+        """End listen() once the current round is done."""
+        if self._stopped is not None:
+            self._stopped.set()
+
+    def table(self, columns=TABLE_COLUMNS):
+        """Get the latest utilization of every server as rows.
+
+        Args:
+            columns(iter): Fields in each row, from the utilization, its
+                    resources, server_id or age (seconds since the server
+                    was last polled successfully).
+
+        Returns:
+            list: A tuple of values per server, ordered by server identifier.
+        """
+        now = time.monotonic()
+        rows = []
+        for server_id in sorted(self.snapshot):
+            utilization = self.snapshot[server_id]
+            resources = utilization.get('resources') or {}
+            row = []
+            for column in columns:
+                if column == 'server_id':
+                    row.append(server_id)
+                elif column == 'age':
+                    row.append(now - self.updated[server_id])
+                elif column in utilization:
+                    row.append(utilization[column])
+                else:
+                    row.append(resources.get(column))
+            rows.append(tuple(row))
+        return rows
+
+    def format_table(self, columns=TABLE_COLUMNS):
+        """Format table() as aligned text with a header line."""
+        lines = [tuple(columns)] + [
+            tuple('' if value is None else
+                  '{:.2f}'.format(value) if isinstance(value, float) else
+                  str(value) for value in row)
+            for row in self.table(columns)]
+        widths = [max(len(line[i]) for line in lines)
+                  for i in range(len(columns))]
+        return '\n'.join(
+            '  '.join(value.ljust(width) for value, width in
+                      zip(line, widths)).rstrip()
+            for line in lines)
@@ -1,6 +1,17 @@
 import aiohttp
-import json
+import asyncio
 import logging
+import time
+
+from pydactyl.api.client.servers.websocket_client import (event_filter,
+                                                          peek_event,
+                                                          reconnect_delay,
+                                                          token_expiry)
+from pydactyl.api.codec import get_codec
+from pydactyl.constants import (WEBSOCKET_DISCONNECTED,
+                                WEBSOCKET_RECONNECTED,
+                                WEBSOCKET_RECONNECTING,
+                                WEBSOCKET_RECONNECT_FAILED)
 
 
 class AsyncWebsocketClient:
@@ -10,7 +21,10 @@ class AsyncWebsocketClient:
     and receive events from the server console.
     """
 
-    def __init__(self, url, token, session=None, token_refresher=None):
+    def __init__(self, url, token, session=None, token_refresher=None,
+                 reconnect=False, max_reconnects=None, backoff_factor=1,
+                 backoff_max=60, auto_refresh=True, refresh_margin=90,
+                 json_codec=None):
         """Initialize the Websocket client.
 
         Args:
@@ -18,24 +32,62 @@ class AsyncWebsocketClient:
             token (str): The authentication token.
             session (aiohttp.ClientSession, optional): Existing aiohttp session.
             token_refresher (function, optional): Async function to refresh the token.
+            reconnect (bool, optional): Reconnect when the connection drops
+                instead of ending listen().
+            max_reconnects (int, optional): Consecutive failed reconnect
+                attempts before giving up, None to keep trying.
+            backoff_factor (float, optional): Base delay in seconds between
+                reconnect attempts, doubled on each attempt.
+            backoff_max (float, optional): Maximum delay between attempts.
+            auto_refresh (bool, optional): Refresh the token from a background
+                task before it expires, so listen() never waits on it.
+            refresh_margin (float, optional): Seconds before the token's
+                expiry to refresh it.
+            json_codec (str|JSONCodec, optional): JSON decoder for events,
+                see pydactyl.api.codec.get_codec().
         """
         self._url = url
         self._token = token
         self._session = session
         self._token_refresher = token_refresher
+        self._auto_refresh = auto_refresh
+        self._refresh_margin = refresh_margin
+        self._refresh_task = None
+        self._refresh_wakeup = None
+        self._refresh_now = False
+        self._json_codec = get_codec(json_codec)
+        self._reconnect = reconnect
+        self._max_reconnects = max_reconnects
+        self._backoff_factor = backoff_factor
+        self._backoff_max = backoff_max
         self._ws = None
+        self._closed = False
+        self._resend_events = []
+        self.state = None
         self._logger = logging.getLogger(__name__)
 
+    @property
+    def connected(self):
+        """True if the websocket is open."""
+        return self._ws is not None and not self._ws.closed
+
     async def connect(self):
         """Connect to the websocket."""
+        self._closed = False
         if self._session is None or self._session.closed:
             self._session = aiohttp.ClientSession()
 
         self._ws = await self._session.ws_connect(self._url)
         await self.authenticate()
+        self._start_token_refresher()
 
     async def close(self):
         """Close the websocket connection."""
+        self._closed = True
+        if self._refresh_task is not None:
+            self._refresh_task.cancel()
+            await asyncio.gather(self._refresh_task, return_exceptions=True)
+            self._refresh_task = None
         if self._ws:
             await self._ws.close()
 
@@ -45,6 +97,56 @@ class AsyncWebsocketClient:
         # Actually, in async_base, we often manage the session.
         pass
 
+    def _start_token_refresher(self):
+        """Start the background token refresher if it isn't running."""
+        if not (self._token_refresher and self._auto_refresh):
+            return
+        if self._refresh_task is not None and not self._refresh_task.done():
+            return
+        self._refresh_wakeup = asyncio.Event()
+        self._refresh_task = asyncio.ensure_future(self._refresh_loop())
+
+    def _wake_token_refresher(self, refresh_now):
+        if self._refresh_task is None or self._refresh_task.done():
+            return False
+        self._refresh_now = self._refresh_now or refresh_now
+        self._refresh_wakeup.set()
+        return True
+
+    async def _refresh_loop(self):
+        """Refresh the token shortly before it expires until closed."""
+        retry_delay = None
+        while not self._closed:
+            delay = retry_delay
+            if delay is None:
+                expiry = token_expiry(self._token)
+                if expiry is not None:
+                    delay = max(0, expiry - self._refresh_margin - time.time())
+            # Woken early by a "token expiring" event or a new token.
+            try:
+                await asyncio.wait_for(self._refresh_wakeup.wait(), delay)
+                woken = True
+            except asyncio.TimeoutError:
+                woken = False
+            self._refresh_wakeup.clear()
+            if woken and not self._refresh_now:
+                retry_delay = None
+                continue
+            self._refresh_now = False
+            try:
+                await self._refresh_token()
+                retry_delay = None
+            except Exception as e:
+                self._logger.error("Failed to refresh websocket token: %s", e)
+                retry_delay = 5
+
+    async def _refresh_token(self):
+        """Get a new token and authenticate the connection with it."""
+        response = await self._token_refresher()
+        self._token = response['data']['token']
+        await self.authenticate()
+        self._logger.info("Websocket token refreshed.")
+
     async def authenticate(self):
         """Authenticate with the server."""
         await self.send("auth", [self._token])
@@ -68,7 +170,7 @@ class AsyncWebsocketClient:
         Args:
             command (str): The command string.
         """
-        await self.send("send", [command])
+        await self.send("send command", [command])
 
     async def send_power_action(self, signal: str):
         """Send a power action to the server.
@@ -79,15 +181,32 @@ class AsyncWebsocketClient:
         await self.send("set state", [signal])
 
     async def request_logs(self):
-        """Request server logs."""
+        """Request server logs.
+
+        Requested again after reconnecting.
+        """
+        self._remember("send logs")
         await self.send("send logs")
 
     async def request_stats(self):
-        """Request server stats."""
+        """Request server stats.
+
+        Requested again after reconnecting.
+        """
+        self._remember("send stats")
         await self.send("send stats")
 
+    def _remember(self, event):
+        if event not in self._resend_events:
+            self._resend_events.append(event)
+
     async def listen(self, events = (), exclude_events = ()):
         """Async generator that yields messages from the server.
+
+        In reconnect mode a dropped connection is reopened with fresh
+        credentials and the same generator keeps yielding.  Connection
+        changes are reported as disconnected, reconnecting, reconnected and
+        reconnect failed events, which can be filtered like any other.
         
         Args:
             events (list[str], optional): The events to listen for.
@@ -99,23 +218,114 @@ class AsyncWebsocketClient:
         if not self._ws:
             raise RuntimeError("Websocket is not connected.")
 
+        skip, wanted = event_filter(events, exclude_events)
+        while True:
+            async for data in self._receive(skip):
+                if wanted(data):
+                    yield data
+            if not self._reconnect or self._closed:
+                break
+            reconnected = False
+            async for data in self._reconnect_events():
+                reconnected = data['event'] == WEBSOCKET_RECONNECTED
+                if wanted(data):
+                    yield data
+            if not reconnected:
+                break
+
+    async def listen_batches(self, events=("console output",),
+                             exclude_events=(), max_count=500,
+                             max_latency=0.1):
+        """Async generator that yields events from the server in batches.
+
+        A batch is yielded once it holds max_count events or its first event
+        is max_latency seconds old, whichever comes first, so consumers can
+        bulk-insert console output instead of handling every line.  Events
+        are read by a background task, which pauses while max_count events
+        are waiting.
+
+        Args:
+            events (list[str], optional): The events to listen for.
+            exclude_events (list[str], optional): The events to exclude.
+            max_count (int, optional): Maximum number of events per batch.
+            max_latency (float, optional): Maximum seconds an event waits in
+                a batch.
+
+        Yields:
+             list[dict]: Parsed JSON messages from the server, oldest first.
+        """
+        if not self._ws:
+            raise RuntimeError("Websocket is not connected.")
+
+        loop = asyncio.get_running_loop()
+        queue = asyncio.Queue(max_count)
+        done = object()
+        errors = []
+
+        async def pump():
+            try:
+                async for data in self.listen(events, exclude_events):
+                    await queue.put(data)
+            except Exception as e:
+                errors.append(e)
+            await queue.put(done)
+
+        task = asyncio.ensure_future(pump())
+        try:
+            item = None
+            while item is not done:
+                item = await queue.get()
+                if item is done:
+                    break
+                batch = [item]
+                deadline = loop.time() + max_latency
+                while len(batch) < max_count:
+                    try:
+                        item = queue.get_nowait()
+                    except asyncio.QueueEmpty:
+                        remaining = deadline - loop.time()
+                        if remaining <= 0:
+                            break
+                        try:
+                            item = await asyncio.wait_for(queue.get(),
+                                                          remaining)
+                        except asyncio.TimeoutError:
+                            break
+                    if item is done:
+                        break
+                    batch.append(item)
+                yield batch
+            if errors:
+                raise errors[0]
+        finally:
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+
+    async def _receive(self, skip=None):
+        """Yield messages until the connection closes.
+
+        Args:
+            skip (callable, optional): Returns True for event names that can
+                be dropped without parsing the message.
+        """
         async for msg in self._ws:
             if msg.type == aiohttp.WSMsgType.TEXT:
+                if skip is not None:
+                    name = peek_event(msg.data)
+                    if name is not None and skip(name):
+                        continue
                 try:
-                    data = json.loads(msg.data)
+                    data = self._json_codec.loads(msg.data)
+                    if data['event'] == 'status' and data.get('args'):
+                        self.state = data['args'][0]
                     if data['event'] == 'token expiring':
-                        if self._token_refresher:
+                        if (not self._wake_token_refresher(refresh_now=True)
+                                and self._token_refresher):
                             try:
-                                response = await self._token_refresher()
-                                self._token = response['data']['token']
-                                await self.authenticate()
-                                self._logger.info("Websocket token refreshed.")
+                                await self._refresh_token()
                             except Exception as e:
                                 self._logger.error("Failed to refresh websocket token: %s", e)
 
-                    if (events and data['event'] not in events or
-                        exclude_events and data['event'] in exclude_events):
-                        continue
                     yield data
                 except ValueError:
                     self._logger.warning("Received non-JSON message: %s", msg.data)
@@ -124,6 +334,47 @@ class AsyncWebsocketClient:
                                    self._ws.exception())
                 break
 
+    async def _reconnect_events(self):
+        """Reopen the connection, yielding connection state events."""
+        yield {"event": WEBSOCKET_DISCONNECTED, "args": []}
+        attempt = 0
+        while self._max_reconnects is None or attempt < self._max_reconnects:
+            attempt += 1
+            delay = reconnect_delay(attempt, self._backoff_factor,
+                                    self._backoff_max)
+            yield {"event": WEBSOCKET_RECONNECTING, "args": [attempt, delay]}
+            await asyncio.sleep(delay)
+            if self._closed:
+                return
+            try:
+                await self._reopen()
+            except Exception as e:
+                self._logger.warning("Websocket reconnect attempt %d failed: %s",
+                                     attempt, e)
+                continue
+            self._logger.info("Websocket reconnected.")
+            yield {"event": WEBSOCKET_RECONNECTED, "args": [attempt]}
+            return
+        yield {"event": WEBSOCKET_RECONNECT_FAILED, "args": [attempt]}
+
+    async def _reopen(self):
+        """Connect with fresh credentials and restore requested streams."""
+        if self._ws and not self._ws.closed:
+            await self._ws.close()
+        if self._token_refresher:
+            data = (await self._token_refresher())['data']
+            self._token = data['token']
+            self._url = data.get('socket', self._url)
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession()
+        self._ws = await self._session.ws_connect(self._url)
+        await self.authenticate()
+        for event in self._resend_events:
+            await self.send(event)
+        # Reschedule the refresher for the new token.
+        if not self._wake_token_refresher(refresh_now=False):
+            self._start_token_refresher()
+
     async def __aenter__(self):
         await self.connect()
         return self
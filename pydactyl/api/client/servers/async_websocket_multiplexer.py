@@ -0,0 +1,207 @@
+import asyncio
+import logging
+
+from pydactyl.api.client.servers.websocket_client import reconnect_delay
+
+logger = logging.getLogger(__name__)
+
+# Queued by a server's task when its socket is done to wake up listen().
+_CLOSED = object()
+
+
+class AsyncWebsocketMultiplexer:
+    """Watch the websockets of many servers on one event loop.
+
+    Each server gets a task that connects and authenticates its
+    AsyncWebsocketClient, then feeds its events into one shared queue.
+    listen() yields (server_id, event) pairs from every server.  The queue is
+    bounded, so sockets stop being read while the consumer falls behind
+    instead of buffering without limit.
+    """
+
+    def __init__(self, servers, server_ids=(), events=(), exclude_events=(),
+                 max_queue=1000, connect_concurrency=10, request_logs=False,
+                 request_stats=False, reconnect=False, max_reconnects=None,
+                 backoff_factor=1, backoff_max=60):
+        """Initialize the multiplexer.
+
+        Args:
+            servers(AsyncServersBase): Client servers API used to get
+                    websocket credentials, e.g. api.client.servers
+            server_ids(iter): Server identifiers to watch.
+            events(iter): Default events to listen for, all if empty.
+            exclude_events(iter): Default events to drop.
+            max_queue(int): Maximum number of events waiting to be consumed.
+            connect_concurrency(int): Maximum number of sockets being
+                    opened at once.
+            request_logs(bool): Request recent console output after
+                    connecting.
+            request_stats(bool): Request resource stats after connecting.
+            reconnect(bool): Reconnect dropped sockets instead of closing
+                    them, connection changes are yielded as events.  A
+                    server that can't be reached at first is retried too,
+                    its state is 'retrying' until it connects.
+            max_reconnects(int): Consecutive failed attempts before a server
+                    is given up on, None to keep trying.
+            backoff_factor(float): Base delay in seconds between attempts,
+                    doubled on each attempt.
+            backoff_max(float): Maximum delay between attempts.
+        """
+        self._servers = servers
+        self._events = events
+        self._exclude_events = exclude_events
+        self._max_queue = max_queue
+        self._connect_concurrency = connect_concurrency
+        self._request_logs = request_logs
+        self._request_stats = request_stats
+        self._reconnect = reconnect
+        self._max_reconnects = max_reconnects
+        self._backoff_factor = backoff_factor
+        self._backoff_max = backoff_max
+        self._server_ids = list(server_ids)
+        self._filters = {}
+        self._tasks = {}
+        self._active = 0
+        self._queue = None
+        self._connect_semaphore = None
+        self.clients = {}
+        self.states = {}
+        self.errors = {}
+
+    async def start(self):
+        """Open sockets for the servers given to the constructor."""
+        for server_id in self._server_ids:
+            if server_id not in self._tasks:
+                self.add(server_id)
+
+    def add(self, server_id, events=None, exclude_events=None):
+        """Start watching a server.
+
+        Must be called from the running event loop.
+
+        Args:
+            server_id(str): Server identifier (abbreviated UUID)
+            events(iter): Events to listen for from this server, overrides
+                    the default.
+            exclude_events(iter): Events to drop from this server, overrides
+                    the default.
+        """
+        if self._queue is None:
+            self._queue = asyncio.Queue(self._max_queue)
+            self._connect_semaphore = asyncio.Semaphore(
+                self._connect_concurrency)
+        task = self._tasks.get(server_id)
+        if task is not None and not task.done():
+            raise ValueError('Already watching server {}'.format(server_id))
+        self._filters[server_id] = (
+            self._events if events is None else events,
+            self._exclude_events if exclude_events is None
+            else exclude_events)
+        self._active += 1
+        task = asyncio.ensure_future(self._run(server_id))
+        task.add_done_callback(self._task_done)
+        self._tasks[server_id] = task
+
+    async def remove(self, server_id):
+        """Stop watching a server and close its socket."""
+        task = self._tasks.pop(server_id, None)
+        if task is not None and not task.done():
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+
+    async def listen(self):
+        """Async generator of events from every watched server.
+
+        Ends once every server's socket has closed or been removed.
+
+        Yields:
+            tuple: (server_id, event dict)
+        """
+        if self._queue is None:
+            return
+        while self._active > 0 or not self._queue.empty():
+            server_id, data = await self._queue.get()
+            if data is not _CLOSED:
+                yield server_id, data
+
+    async def close(self):
+        """Stop watching every server."""
+        for server_id in list(self._tasks):
+            await self.remove(server_id)
+
+    async def _run(self, server_id):
+        """Connect to a server and queue its events until the socket ends."""
+        self.states[server_id] = 'connecting'
+        client = None
+        try:
+            client = await self._connect(server_id)
+            self.clients[server_id] = client
+            self.errors.pop(server_id, None)
+            self.states[server_id] = 'connected'
+            if self._request_logs:
+                await client.request_logs()
+            if self._request_stats:
+                await client.request_stats()
+
+            events, exclude_events = self._filters[server_id]
+            async for data in client.listen(events, exclude_events):
+                await self._queue.put((server_id, data))
+            self.states[server_id] = 'closed'
+        except asyncio.CancelledError:
+            self.states[server_id] = 'closed'
+            raise
+        except Exception as e:
+            logger.error('Websocket for server %s failed: %s', server_id, e)
+            self.states[server_id] = 'failed'
+            self.errors[server_id] = e
+        finally:
+            self.clients.pop(server_id, None)
+            if client is not None:
+                await client.close()
+
+    async def _connect(self, server_id):
+        """Open a server's socket, retrying with backoff in reconnect mode."""
+        attempt = 0
+        while True:
+            client = None
+            try:
+                async with self._connect_semaphore:
+                    client = await self._servers.get_websocket_client(
+                        server_id, reconnect=self._reconnect,
+                        max_reconnects=self._max_reconnects,
+                        backoff_factor=self._backoff_factor,
+                        backoff_max=self._backoff_max)
+                    await client.connect()
+                return client
+            except Exception as e:
+                if client is not None:
+                    await client.close()
+                attempt += 1
+                if not self._reconnect or (
+                        self._max_reconnects is not None
+                        and attempt > self._max_reconnects):
+                    raise
+                delay = reconnect_delay(attempt, self._backoff_factor,
+                                        self._backoff_max)
+                logger.warning('Websocket for server %s failed to connect, '
+                               'retrying in %.1fs: %s', server_id, delay, e)
+                self.states[server_id] = 'retrying'
+                self.errors[server_id] = e
+                await asyncio.sleep(delay)
+
+    def _task_done(self, task):
+        """Count a finished server task, even one cancelled before it ran."""
+        self._active -= 1
+        # Wake listen() so it notices.  If the queue is full listen() isn't
+        # waiting and checks _active again once it's drained.
+        try:
+            self._queue.put_nowait((None, _CLOSED))
+        except asyncio.QueueFull:
+            pass
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
@@ -1,7 +1,95 @@
+import base64
 import json
 import logging
+import random
+import threading
+import time
+
 import websocket
 
+from pydactyl.api.codec import get_codec
+from pydactyl.constants import (WEBSOCKET_DISCONNECTED,
+                                WEBSOCKET_RECONNECTED,
+                                WEBSOCKET_RECONNECTING,
+                                WEBSOCKET_RECONNECT_FAILED)
+
+
+def reconnect_delay(attempt, backoff_factor, backoff_max):
+    """Seconds to wait before a reconnect attempt, with random jitter.
+
+    Args:
+        attempt(int): Reconnect attempt, starting at 1.
+        backoff_factor(float): Base delay, doubled on each attempt.
+        backoff_max(float): Maximum delay.
+    """
+    backoff = min(backoff_max, backoff_factor * (2 ** (attempt - 1)))
+    return random.uniform(backoff / 2, backoff)
+
+
+# Events the clients act on themselves, never dropped before parsing.
+_HANDLED_EVENTS = frozenset(('status', 'token expiring'))
+_EVENT_PREFIX = '{"event":"'
+
+
+def peek_event(message):
+    """Get the event name of a Wings message without parsing the JSON.
+
+    Wings sends compact JSON with the event first, e.g.
+    {"event":"console output","args":["..."]}, so the name can be read with
+    a prefix check and one find().
+
+    Returns:
+        str: The event name, or None if the message isn't in that form.
+    """
+    if not message.startswith(_EVENT_PREFIX):
+        return None
+    end = message.find('"', len(_EVENT_PREFIX))
+    if end < 0:
+        return None
+    name = message[len(_EVENT_PREFIX):end]
+    if '\\' in name:
+        return None
+    return name
+
+
+def event_filter(events, exclude_events):
+    """Build the filters listen() applies before and after parsing.
+
+    Returns:
+        tuple: (skip, wanted) where skip(name) is True for event names that
+                can be dropped unparsed, or None if nothing is filtered, and
+                wanted(data) is True for parsed events to yield.
+    """
+    events = frozenset(events or ())
+    exclude_events = frozenset(exclude_events or ())
+
+    def wanted_name(name):
+        return not (events and name not in events or name in exclude_events)
+
+    def wanted(data):
+        return wanted_name(data['event'])
+
+    def skip(name):
+        return name not in _HANDLED_EVENTS and not wanted_name(name)
+
+    return (skip if events or exclude_events else None), wanted
+
+
+def token_expiry(token):
+    """Get the expiry time of a websocket token from its JWT exp claim.
+
+    Returns:
+        float: Expiry as a Unix timestamp, or None if the token isn't a JWT
+                with an exp claim.
+    """
+    try:
+        payload = token.split('.')[1]
+        payload += '=' * (-len(payload) % 4)
+        return float(json.loads(base64.urlsafe_b64decode(payload))['exp'])
+    except (AttributeError, IndexError, KeyError, TypeError, ValueError):
+        return None
+
+
 class WebsocketClient:
     """Helper class for interacting with a Pterodactyl server's websocket (Sync).
 
@@ -9,30 +97,118 @@ class WebsocketClient:
     and receive events from the server console.
     """
 
-    def __init__(self, url, token, token_refresher=None):
+    def __init__(self, url, token, token_refresher=None, reconnect=False,
+                 max_reconnects=None, backoff_factor=1, backoff_max=60,
+                 auto_refresh=True, refresh_margin=90, json_codec=None):
         """Initialize the Websocket client.
 
         Args:
             url (str): The websocket URL to connect to.
             token (str): The authentication token.
             token_refresher (callable, optional): Function to refresh the token.
+            reconnect (bool, optional): Reconnect when the connection drops
+                instead of ending listen().
+            max_reconnects (int, optional): Consecutive failed reconnect
+                attempts before giving up, None to keep trying.
+            backoff_factor (float, optional): Base delay in seconds between
+                reconnect attempts, doubled on each attempt.
+            backoff_max (float, optional): Maximum delay between attempts.
+            auto_refresh (bool, optional): Refresh the token from a background
+                thread before it expires, so listen() never waits on it.
+            refresh_margin (float, optional): Seconds before the token's
+                expiry to refresh it.
+            json_codec (str|JSONCodec, optional): JSON decoder for events,
+                see pydactyl.api.codec.get_codec().
         """
         self._url = url
         self._token = token
         self._token_refresher = token_refresher
+        self._auto_refresh = auto_refresh
+        self._refresh_margin = refresh_margin
+        self._refresh_thread = None
+        self._refresh_wakeup = threading.Event()
+        self._refresh_now = False
+        self._json_codec = get_codec(json_codec)
+        self._reconnect = reconnect
+        self._max_reconnects = max_reconnects
+        self._backoff_factor = backoff_factor
+        self._backoff_max = backoff_max
         self._ws = None
+        self._closed = False
+        self._resend_events = []
+        self.state = None
         self._logger = logging.getLogger(__name__)
 
+    @property
+    def connected(self):
+        """True if the websocket is open."""
+        return self._ws is not None and bool(self._ws.connected)
+
     def connect(self):
         """Connect to the websocket."""
+        self._closed = False
         self._ws = websocket.create_connection(self._url)
         self.authenticate()
+        self._start_token_refresher()
 
     def close(self):
         """Close the websocket connection."""
+        self._closed = True
+        self._refresh_wakeup.set()
         if self._ws:
             self._ws.close()
 
+    def _start_token_refresher(self):
+        """Start the background token refresher if it isn't running."""
+        if not (self._token_refresher and self._auto_refresh):
+            return
+        if self._refresh_thread is not None and self._refresh_thread.is_alive():
+            return
+        self._refresh_wakeup.clear()
+        self._refresh_thread = threading.Thread(
+            target=self._refresh_loop, name='pydactyl-websocket-token',
+            daemon=True)
+        self._refresh_thread.start()
+
+    def _wake_token_refresher(self, refresh_now):
+        if self._refresh_thread is None or not self._refresh_thread.is_alive():
+            return False
+        self._refresh_now = self._refresh_now or refresh_now
+        self._refresh_wakeup.set()
+        return True
+
+    def _refresh_loop(self):
+        """Refresh the token shortly before it expires until closed."""
+        retry_delay = None
+        while not self._closed:
+            delay = retry_delay
+            if delay is None:
+                expiry = token_expiry(self._token)
+                if expiry is not None:
+                    delay = max(0, expiry - self._refresh_margin - time.time())
+            # Woken early by close(), a "token expiring" event or a new token.
+            woken = self._refresh_wakeup.wait(delay)
+            self._refresh_wakeup.clear()
+            if self._closed:
+                break
+            if woken and not self._refresh_now:
+                retry_delay = None
+                continue
+            self._refresh_now = False
+            try:
+                self._refresh_token()
+                retry_delay = None
+            except Exception as e:
+                self._logger.error("Failed to refresh websocket token: %s", e)
+                retry_delay = 5
+
+    def _refresh_token(self):
+        """Get a new token and authenticate the connection with it."""
+        response = self._token_refresher()
+        self._token = response['data']['token']
+        self.authenticate()
+        self._logger.info("Websocket token refreshed.")
+
     def authenticate(self):
         """Authenticate with the server."""
         self.send("auth", [self._token])
@@ -71,16 +247,33 @@ class WebsocketClient:
         self.send("status")
 
     def get_logs(self):
-        """Request server console output."""
-        self.send("console output")
+        """Request server console output.
+
+        Requested again after reconnecting.
+        """
+        self._remember("send logs")
+        self.send("send logs")
 
     def get_stats(self):
-        """Request server stats, e.g. CPU, memory, disk usage."""
-        self.send("stats")
+        """Request server stats, e.g. CPU, memory, disk usage.
+
+        Requested again after reconnecting.
+        """
+        self._remember("send stats")
+        self.send("send stats")
+
+    def _remember(self, event):
+        if event not in self._resend_events:
+            self._resend_events.append(event)
 
     def listen(self, events = (), exclude_events = ()):
         """Generator that yields events from the server.
-        
+
+        In reconnect mode a dropped connection is reopened with fresh
+        credentials and the same generator keeps yielding.  Connection
+        changes are reported as disconnected, reconnecting, reconnected and
+        reconnect failed events, which can be filtered like any other.
+
         Args:
             events (list[str], optional): The events to listen for.
             exclude_events (list[str], optional): The events to exclude.
@@ -88,33 +281,112 @@ class WebsocketClient:
         Yields:
              dict: The parsed JSON message from the server.
         """
+        yield from self._listen(events, exclude_events)
+
+    def listen_batches(self, events=("console output",), exclude_events=(),
+                       max_count=500, max_latency=0.1):
+        """Generator that yields events from the server in batches.
+
+        A batch is yielded once it holds max_count events or its first event
+        is max_latency seconds old, whichever comes first, so consumers can
+        bulk-insert console output instead of handling every line.
+
+        Args:
+            events (list[str], optional): The events to listen for.
+            exclude_events (list[str], optional): The events to exclude.
+            max_count (int, optional): Maximum number of events per batch.
+            max_latency (float, optional): Maximum seconds an event waits in
+                a batch.
+
+        Yields:
+             list[dict]: Parsed JSON messages from the server, oldest first.
+        """
+        batch = []
+        deadline = None
+
+        def timeout():
+            if deadline is None:
+                return None
+            return max(0.001, deadline - time.monotonic())
+
+        try:
+            for data in self._listen(events, exclude_events, timeout):
+                if data is not None:
+                    if not batch:
+                        deadline = time.monotonic() + max_latency
+                    batch.append(data)
+                if batch and (len(batch) >= max_count
+                              or time.monotonic() >= deadline):
+                    yield batch
+                    batch = []
+                    deadline = None
+            if batch:
+                yield batch
+        finally:
+            if self._ws:
+                try:
+                    self._ws.settimeout(None)
+                except Exception:
+                    pass
+
+    def _listen(self, events, exclude_events, timeout=None):
+        """Yield events, or None each time a receive timeout expires."""
         if not self._ws:
             raise RuntimeError("Websocket is not connected.")
 
+        skip, wanted = event_filter(events, exclude_events)
+        while True:
+            for data in self._receive(skip, timeout):
+                if data is None or wanted(data):
+                    yield data
+            if not self._reconnect or self._closed:
+                break
+            reconnected = False
+            for data in self._reconnect_events():
+                reconnected = data['event'] == WEBSOCKET_RECONNECTED
+                if wanted(data):
+                    yield data
+            if not reconnected:
+                break
+
+    def _receive(self, skip=None, timeout=None):
+        """Yield messages until the connection closes.
+
+        Args:
+            skip (callable, optional): Returns True for event names that can
+                be dropped without parsing the message.
+            timeout (callable, optional): Returns the receive timeout in
+                seconds, None yielded when it expires.
+        """
         while True:
             try:
+                if timeout is not None:
+                    self._ws.settimeout(timeout())
                 message = self._ws.recv()
                 if not message:
                     break
-                
+                if skip is not None:
+                    name = peek_event(message)
+                    if name is not None and skip(name):
+                        continue
+
                 try:
-                    data = json.loads(message)
+                    data = self._json_codec.loads(message)
+                    if data['event'] == 'status' and data.get('args'):
+                        self.state = data['args'][0]
                     if data['event'] == 'token expiring':
-                        if self._token_refresher:
+                        if (not self._wake_token_refresher(refresh_now=True)
+                                and self._token_refresher):
                             try:
-                                response = self._token_refresher()
-                                self._token = response['data']['token']
-                                self.authenticate()
-                                self._logger.info("Websocket token refreshed.")
+                                self._refresh_token()
                             except Exception as e:
                                 self._logger.error("Failed to refresh websocket token: %s", e)
 
-                    if (events and data['event'] not in events or 
-                        exclude_events and data['event'] in exclude_events):
-                        continue
                     yield data
                 except ValueError:
                     self._logger.warning("Received non-JSON message: %s", message)
+            except websocket.WebSocketTimeoutException:
+                yield None
             except websocket.WebSocketConnectionClosedException:
                 self._logger.info("Websocket connection closed.")
                 break
@@ -122,6 +394,48 @@ class WebsocketClient:
                 self._logger.error("Error receiving message: %s", e)
                 break
 
+    def _reconnect_events(self):
+        """Reopen the connection, yielding connection state events."""
+        yield {"event": WEBSOCKET_DISCONNECTED, "args": []}
+        attempt = 0
+        while self._max_reconnects is None or attempt < self._max_reconnects:
+            attempt += 1
+            delay = reconnect_delay(attempt, self._backoff_factor,
+                                    self._backoff_max)
+            yield {"event": WEBSOCKET_RECONNECTING, "args": [attempt, delay]}
+            time.sleep(delay)
+            if self._closed:
+                return
+            try:
+                self._reopen()
+            except Exception as e:
+                self._logger.warning("Websocket reconnect attempt %d failed: %s",
+                                     attempt, e)
+                continue
+            self._logger.info("Websocket reconnected.")
+            yield {"event": WEBSOCKET_RECONNECTED, "args": [attempt]}
+            return
+        yield {"event": WEBSOCKET_RECONNECT_FAILED, "args": [attempt]}
+
+    def _reopen(self):
+        """Connect with fresh credentials and restore requested streams."""
+        if self._ws:
+            try:
+                self._ws.close()
+            except Exception:
+                pass
+        if self._token_refresher:
+            data = self._token_refresher()['data']
+            self._token = data['token']
+            self._url = data.get('socket', self._url)
+        self._ws = websocket.create_connection(self._url)
+        self.authenticate()
+        for event in self._resend_events:
+            self.send(event)
+        # Reschedule the refresher for the new token.
+        if not self._wake_token_refresher(refresh_now=False):
+            self._start_token_refresher()
+
     def __enter__(self):
         self.connect()
         return self
@@ -0,0 +1,72 @@
+"""Pluggable JSON codecs for decoding API responses and websocket events."""
+import json
+
+
+class JSONCodec(object):
+    """A pair of JSON loads/dumps functions.
+
+    loads accepts str or bytes, dumps always returns str.
+    """
+
+    __slots__ = ('name', 'loads', 'dumps')
+
+    def __init__(self, name, loads, dumps):
+        self.name = name
+        self.loads = loads
+        self.dumps = dumps
+
+    def __repr__(self):
+        return '<JSONCodec {}>'.format(self.name)
+
+
+STDLIB_CODEC = JSONCodec('json', json.loads, json.dumps)
+
+
+def _orjson_codec():
+    import orjson
+    return JSONCodec('orjson', orjson.loads,
+                     lambda obj: orjson.dumps(obj).decode('utf-8'))
+
+
+def _ujson_codec():
+    import ujson
+    return JSONCodec('ujson', ujson.loads, ujson.dumps)
+
+
+# Fastest first, used to pick a codec for None and 'auto'.
+_CODECS = (
+    ('orjson', _orjson_codec),
+    ('ujson', _ujson_codec),
+    ('json', lambda: STDLIB_CODEC),
+)
+
+
+def get_codec(codec=None):
+    """Get a JSON codec.
+
+    Args:
+        codec: None or 'auto' for the fastest one installed, falling back
+                to the standard library, 'json' to force the standard
+                library, 'orjson' or 'ujson' to require that package, or a
+                JSONCodec.
+
+    Returns:
+        JSONCodec: The codec to use.
+
+    Raises:
+        ValueError: If the codec name is unknown.
+        ImportError: If the requested package isn't installed.
+    """
+    if isinstance(codec, JSONCodec):
+        return codec
+    if codec is None or codec == 'auto':
+        for _, factory in _CODECS:
+            try:
+                return factory()
+            except ImportError:
+                continue
+    for name, factory in _CODECS:
+        if codec == name:
+            return factory()
+    raise ValueError('Unknown JSON codec {!r}, must be one of {}.'.format(
+        codec, ('auto',) + tuple(name for name, _ in _CODECS)))
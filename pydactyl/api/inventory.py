@@ -0,0 +1,347 @@
+"""In-memory mirror of the panel's servers, users, nodes and locations."""
+import threading
+import time
+
+# Application API list method for each resource.
+LISTINGS = {
+    'servers': ('servers', 'list_servers'),
+    'users': ('user', 'list_users'),
+    'nodes': ('nodes', 'list_nodes'),
+    'locations': ('locations', 'list_locations'),
+}
+
+# Index name to record attribute.  Unique indexes map a value to one record
+# id, the others map a value to the set of record ids sharing it.
+UNIQUE_INDEXES = {
+    'servers': {'uuid': 'uuid', 'identifier': 'identifier',
+                'external_id': 'external_id'},
+    'users': {'uuid': 'uuid', 'external_id': 'external_id',
+              'username': 'username', 'email': 'email'},
+    'nodes': {'uuid': 'uuid'},
+    'locations': {'short': 'short'},
+}
+MULTI_INDEXES = {
+    'servers': {'user': 'user', 'node': 'node', 'egg': 'egg',
+                'nest': 'nest'},
+    'users': {},
+    'nodes': {'location': 'location_id'},
+    'locations': {},
+}
+
+
+def _item_attributes(item):
+    if isinstance(item, dict) and 'attributes' in item:
+        return item['attributes']
+    return item
+
+
+class Inventory(object):
+    """Local copy of the panel inventory with secondary indexes.
+
+    refresh() pulls the listings from the application API and records what
+    was added, updated or removed.  Lookups are then answered from
+    dictionaries without any requests, e.g. every server owned by user 5 on
+    node 2 is find('servers', user=5, node=2).
+
+    The panel can only sort listings by id, not filter them by update time,
+    so a full refresh still reads every page but only reindexes records
+    whose updated_at changed.  refresh(full=False) reads the newest records
+    first and stops at the first one already known, which picks up new
+    records in a page or two but misses updates and deletions.
+    """
+
+    def __init__(self, api, resources=tuple(LISTINGS), per_page=100,
+                 store=None):
+        """Initialize the inventory.
+
+        Args:
+            api(PterodactylClient|AsyncPterodactylClient): Client used to
+                    list the inventory.
+            resources(iter): Resources to mirror, any of 'servers', 'users',
+                    'nodes' and 'locations'.
+            per_page(int): Records requested per page.
+            store(SQLiteInventoryStore): Persists the inventory.  Records
+                    saved by an earlier process are loaded right away and
+                    each refresh only writes what changed.
+        """
+        for resource in resources:
+            if resource not in LISTINGS:
+                raise ValueError('Unknown inventory resource {!r}, must be '
+                                 'one of {}.'.format(resource, tuple(LISTINGS)))
+        self._api = api
+        self._per_page = per_page
+        self._store = store
+        self._lock = threading.Lock()
+        self.resources = tuple(resources)
+        self.records = {resource: {} for resource in self.resources}
+        self.synced = {}
+        self.allocations = {}
+        self.allocations_synced = {}
+        self._unique = {resource: {name: {} for name in
+                                   UNIQUE_INDEXES[resource]}
+                        for resource in self.resources}
+        self._multi = {resource: {name: {} for name in
+                                  MULTI_INDEXES[resource]}
+                       for resource in self.resources}
+        if store is not None:
+            self._load_store()
+
+    def _load_store(self):
+        """Load the snapshot saved in the store."""
+        for resource in self.resources:
+            synced = self._store.synced_at(resource)
+            if synced is not None:
+                self.load(resource, self._store.list(resource), synced)
+        for node_id in self._store.parents('allocations'):
+            self.allocations[node_id] = {
+                record['id']: record
+                for record in self._store.list('allocations', node_id)}
+            self.allocations_synced[node_id] = self._store.synced_at(
+                'allocations', node_id)
+
+    def __len__(self):
+        return sum(len(records) for records in self.records.values())
+
+    def __repr__(self):
+        return '<Inventory {}>'.format(', '.join(
+            '{}={}'.format(resource, len(records))
+            for resource, records in self.records.items()))
+
+    def _listing(self, resource, newest_first=False):
+        api_name, method = LISTINGS[resource]
+        params = {'per_page': self._per_page,
+                  'sort': '-id' if newest_first else 'id'}
+        return getattr(getattr(self._api, api_name), method)(params=params)
+
+    def refresh(self, resources=None, full=True):
+        """Update the inventory from the panel.
+
+        Args:
+            resources(iter): Resources to refresh, all of them if None.
+            full(bool): Read every record, picking up updates and deletions.
+                    If False only records newer than the newest known one
+                    are added.
+
+        Returns:
+            dict: Resource name to a dict of 'added', 'updated' and
+                    'removed' record ids.
+        """
+        changes = {}
+        for resource in resources or self.resources:
+            response = self._listing(resource, newest_first=not full)
+            changes[resource] = self._sync(
+                resource, response.iter_items(), full)
+        return changes
+
+    async def refresh_async(self, resources=None, full=True):
+        """Update the inventory from the panel using an async client.
+
+        See refresh() for the arguments and return value.
+        """
+        changes = {}
+        for resource in resources or self.resources:
+            response = await self._listing(resource, newest_first=not full)
+            items = [item async for item in self._aiter_new(
+                response, resource, full)]
+            changes[resource] = self._sync(resource, items, full)
+        return changes
+
+    async def _aiter_new(self, response, resource, full):
+        newest = None if full else self._newest_id(resource)
+        async for item in response.aiter_items():
+            if newest is not None and item['id'] <= newest:
+                break
+            yield item
+
+    def _newest_id(self, resource):
+        records = self.records[resource]
+        return max(records) if records else None
+
+    def _sync(self, resource, items, full):
+        """Merge listed items into the store and its indexes."""
+        records = self.records[resource]
+        changes = {'added': [], 'updated': [], 'removed': []}
+        newest = None if full else self._newest_id(resource)
+        seen = set()
+        with self._lock:
+            for item in items:
+                item = _item_attributes(item)
+                record_id = item['id']
+                if newest is not None and record_id <= newest:
+                    break
+                seen.add(record_id)
+                old = records.get(record_id)
+                if old is None:
+                    changes['added'].append(record_id)
+                elif ('updated_at' in item and
+                      old.get('updated_at') == item['updated_at']
+                      or old == item):
+                    continue
+                else:
+                    self._unindex(resource, old)
+                    changes['updated'].append(record_id)
+                records[record_id] = item
+                self._index(resource, item)
+            if full:
+                for record_id in sorted(set(records) - seen):
+                    self._unindex(resource, records.pop(record_id))
+                    changes['removed'].append(record_id)
+            self.synced[resource] = time.time()
+            if self._store is not None:
+                self._store.apply(
+                    resource, [records[record_id] for record_id in
+                               changes['added'] + changes['updated']],
+                    changes['removed'], self.synced[resource])
+        return changes
+
+    def refresh_node_allocations(self, node_ids=None):
+        """Update the allocations of nodes from the panel.
+
+        Args:
+            node_ids(iter): Nodes to refresh, defaults to every node in the
+                    inventory.
+
+        Returns:
+            dict: Node id to a dict of 'added', 'updated' and 'removed'
+                    allocation ids.
+        """
+        if node_ids is None:
+            node_ids = sorted(self.records.get('nodes', ()))
+        changes = {}
+        for node_id in node_ids:
+            response = self._api.nodes.list_node_allocations(
+                node_id, params={'per_page': self._per_page})
+            changes[node_id] = self._sync_allocations(
+                node_id, response.iter_items())
+        return changes
+
+    async def refresh_node_allocations_async(self, node_ids=None):
+        """Update the allocations of nodes using an async client.
+
+        See refresh_node_allocations() for the arguments and return value.
+        """
+        if node_ids is None:
+            node_ids = sorted(self.records.get('nodes', ()))
+        changes = {}
+        for node_id in node_ids:
+            response = await self._api.nodes.list_node_allocations(
+                node_id, params={'per_page': self._per_page})
+            items = [item async for item in response.aiter_items()]
+            changes[node_id] = self._sync_allocations(node_id, items)
+        return changes
+
+    def _sync_allocations(self, node_id, items):
+        """Replace a node's allocations, returning what changed."""
+        old = self.allocations.get(node_id, {})
+        new = {}
+        changes = {'added': [], 'updated': [], 'removed': []}
+        for item in items:
+            item = _item_attributes(item)
+            new[item['id']] = item
+            if item['id'] not in old:
+                changes['added'].append(item['id'])
+            elif old[item['id']] != item:
+                changes['updated'].append(item['id'])
+        changes['removed'] = [allocation_id for allocation_id in old
+                              if allocation_id not in new]
+        with self._lock:
+            self.allocations[node_id] = new
+            self.allocations_synced[node_id] = time.time()
+            if self._store is not None:
+                self._store.apply(
+                    'allocations', [new[allocation_id] for allocation_id in
+                                    changes['added'] + changes['updated']],
+                    changes['removed'], self.allocations_synced[node_id],
+                    parent=node_id)
+        return changes
+
+    def load(self, resource, records, synced=None):
+        """Replace a resource's records, e.g. with a saved snapshot.
+
+        Args:
+            resource(str): Resource name, e.g. 'servers'
+            records(iter): Record attribute dicts.
+            synced(float): time.time() the records were listed.
+        """
+        with self._lock:
+            self.records[resource] = {}
+            for index in self._unique[resource].values():
+                index.clear()
+            for index in self._multi[resource].values():
+                index.clear()
+            for record in records:
+                self.records[resource][record['id']] = record
+                self._index(resource, record)
+            if synced is not None:
+                self.synced[resource] = synced
+
+    def _index(self, resource, record):
+        record_id = record['id']
+        for name, field in UNIQUE_INDEXES[resource].items():
+            value = record.get(field)
+            if value is not None:
+                self._unique[resource][name][value] = record_id
+        for name, field in MULTI_INDEXES[resource].items():
+            value = record.get(field)
+            if value is not None:
+                self._multi[resource][name].setdefault(
+                    value, set()).add(record_id)
+
+    def _unindex(self, resource, record):
+        record_id = record['id']
+        for name, field in UNIQUE_INDEXES[resource].items():
+            index = self._unique[resource][name]
+            if index.get(record.get(field)) == record_id:
+                del index[record.get(field)]
+        for name, field in MULTI_INDEXES[resource].items():
+            ids = self._multi[resource][name].get(record.get(field))
+            if ids is not None:
+                ids.discard(record_id)
+                if not ids:
+                    del self._multi[resource][name][record.get(field)]
+
+    def get(self, resource, value, index='id'):
+        """Look up one record.
+
+        Args:
+            resource(str): Resource name, e.g. 'servers'
+            value: Value to look up, e.g. a server's external_id.
+            index(str): 'id' or a unique index of the resource, e.g. 'uuid',
+                    'identifier' or 'external_id'
+
+        Returns:
+            dict: The record's attributes, or None if not found.
+        """
+        if index != 'id':
+            value = self._unique[resource][index].get(value)
+        return self.records[resource].get(value)
+
+    def find(self, resource, **criteria):
+        """Find the records matching every criteria.
+
+        Args:
+            resource(str): Resource name, e.g. 'servers'
+            **criteria: Index name to value, e.g. user=5, node=2.  Unique
+                    indexes can be used too.
+
+        Returns:
+            list: Matching records ordered by id.
+        """
+        records = self.records[resource]
+        matches = None
+        for name, value in criteria.items():
+            if name == 'id':
+                ids = {value} if value in records else set()
+            elif name in self._unique[resource]:
+                record_id = self._unique[resource][name].get(value)
+                ids = {record_id} if record_id is not None else set()
+            elif name in self._multi[resource]:
+                ids = self._multi[resource][name].get(value, set())
+            else:
+                raise KeyError('{} has no index {!r}'.format(resource, name))
+            matches = set(ids) if matches is None else matches & ids
+            if not matches:
+                return []
+        if matches is None:
+            matches = records
+        return [records[record_id] for record_id in sorted(matches)]
@@ -0,0 +1,151 @@
+"""SQLite persistence for Inventory snapshots."""
+import json
+import sqlite3
+import threading
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS records (
+    resource TEXT NOT NULL,
+    parent INTEGER NOT NULL DEFAULT 0,
+    id INTEGER NOT NULL,
+    updated_at TEXT,
+    data TEXT NOT NULL,
+    PRIMARY KEY (resource, parent, id)
+);
+CREATE TABLE IF NOT EXISTS syncs (
+    resource TEXT NOT NULL,
+    parent INTEGER NOT NULL DEFAULT 0,
+    synced_at REAL NOT NULL,
+    PRIMARY KEY (resource, parent)
+);
+"""
+
+
+class SQLiteInventoryStore(object):
+    """Keeps listed records in an SQLite database between processes.
+
+    Records are stored as the attribute dicts returned by the list methods,
+    e.g. list_servers(), keyed by resource name and id.  Node allocations
+    are also keyed by their node id, passed as parent.  Each resource
+    remembers when it was last synced so a new process can load the
+    snapshot and only ask the panel for what changed since.
+    """
+
+    def __init__(self, path):
+        """Open or create the database.
+
+        Args:
+            path(str): Database file, or ':memory:' for a temporary store.
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        with self._db:
+            self._db.executescript(_SCHEMA)
+
+    def __repr__(self):
+        return '<SQLiteInventoryStore {}>'.format(self.path)
+
+    def close(self):
+        self._db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def get(self, resource, record_id, parent=None):
+        """Get one record.
+
+        Args:
+            resource(str): Resource name, e.g. 'servers'
+            record_id(int): Record id.
+            parent(int): Node id for 'allocations'.
+
+        Returns:
+            dict: The record's attributes, or None if not stored.
+        """
+        with self._lock:
+            row = self._db.execute(
+                'SELECT data FROM records WHERE resource = ? AND parent = ? '
+                'AND id = ?', (resource, parent or 0, record_id)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def list(self, resource, parent=None, **filters):
+        """List stored records.
+
+        Args:
+            resource(str): Resource name, e.g. 'servers'
+            parent(int): Node id for 'allocations'.
+            **filters: Attribute name to required value, e.g. user=5.
+
+        Returns:
+            list: Record attribute dicts ordered by id.
+        """
+        query = ('SELECT data FROM records WHERE resource = ? '
+                 'AND parent = ?')
+        args = [resource, parent or 0]
+        for name, value in filters.items():
+            if not name.isidentifier():
+                raise ValueError('Invalid filter {!r}'.format(name))
+            query += " AND json_extract(data, '$.{}') IS ?".format(name)
+            args.append(value)
+        with self._lock:
+            rows = self._db.execute(query + ' ORDER BY id', args).fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    def parents(self, resource):
+        """Parent ids with a synced snapshot of the resource."""
+        with self._lock:
+            rows = self._db.execute(
+                'SELECT parent FROM syncs WHERE resource = ? ORDER BY parent',
+                (resource,)).fetchall()
+        return [row[0] for row in rows]
+
+    def synced_at(self, resource, parent=None):
+        """time.time() of the resource's last sync, None if never synced."""
+        with self._lock:
+            row = self._db.execute(
+                'SELECT synced_at FROM syncs WHERE resource = ? '
+                'AND parent = ?', (resource, parent or 0)).fetchone()
+        return row[0] if row else None
+
+    def save(self, resource, records, synced, parent=None):
+        """Replace every stored record of a resource."""
+        with self._lock, self._db:
+            self._db.execute(
+                'DELETE FROM records WHERE resource = ? AND parent = ?',
+                (resource, parent or 0))
+            self._upsert(resource, records, parent)
+            self._mark_synced(resource, synced, parent)
+
+    def apply(self, resource, records, removed, synced, parent=None):
+        """Store the changes found by a refresh.
+
+        Args:
+            resource(str): Resource name, e.g. 'servers'
+            records(iter): Added and updated record attribute dicts.
+            removed(iter): Ids of removed records.
+            synced(float): time.time() of the refresh.
+            parent(int): Node id for 'allocations'.
+        """
+        with self._lock, self._db:
+            self._upsert(resource, records, parent)
+            self._db.executemany(
+                'DELETE FROM records WHERE resource = ? AND parent = ? '
+                'AND id = ?',
+                [(resource, parent or 0, record_id) for record_id in removed])
+            self._mark_synced(resource, synced, parent)
+
+    def _upsert(self, resource, records, parent):
+        self._db.executemany(
+            'INSERT OR REPLACE INTO records '
+            '(resource, parent, id, updated_at, data) VALUES (?, ?, ?, ?, ?)',
+            [(resource, parent or 0, record['id'], record.get('updated_at'),
+              json.dumps(record)) for record in records])
+
+    def _mark_synced(self, resource, synced, parent):
+        self._db.execute(
+            'INSERT OR REPLACE INTO syncs (resource, parent, synced_at) '
+            'VALUES (?, ?, ?)', (resource, parent or 0, synced))
@@ -1,11 +1,27 @@
+import functools
+
+from pydactyl.api.allocation_index import (AllocationIndex,
+                                           parse_port_ranges,
+                                           select_allocations)
 from pydactyl.api.base import PterodactylAPI
 from pydactyl.constants import USE_SSL
+from pydactyl.exceptions import BadRequestError
 from pydactyl.responses import PaginatedResponse
 
 
 class Nodes(PterodactylAPI):
     """Class for interacting with the Pterdactyl Nodes API."""
 
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        if self._allocation_index is None:
+            self._allocation_index = AllocationIndex()
+
+    @property
+    def allocation_index(self):
+        """AllocationIndex of the free ports of each loaded node."""
+        return self._allocation_index
+
     def list_nodes(self, includes=None, params=None):
         """List all nodes.
 
@@ -16,7 +32,8 @@ class Nodes(PterodactylAPI):
         endpoint = 'application/nodes'
         response = self._api_request(endpoint=endpoint,
                                      includes=includes, params=params)
-        return PaginatedResponse(self, endpoint, response)
+        return PaginatedResponse(self, endpoint, response, params=params,
+                                 includes=includes)
 
     def get_node_config(self, node_id):
         """Get the Wings configuration for the specified node.
@@ -150,7 +167,51 @@ class Nodes(PterodactylAPI):
         endpoint = 'application/nodes/{}/allocations'.format(node_id)
         response = self._api_request(endpoint=endpoint, includes=includes,
                                      params=params)
-        return PaginatedResponse(self, endpoint, response)
+        return PaginatedResponse(self, endpoint, response, params=params,
+                                 includes=includes)
+
+    def load_allocation_index(self, node_id):
+        """Load or reload a node's allocations into allocation_index.
+
+        Args:
+            node_id(int): Pterodactyl Node ID.
+        """
+        response = self.list_node_allocations(node_id,
+                                              params={'per_page': 100})
+        self.allocation_index.load(node_id, response.iter_items())
+
+    def find_free_allocations(self, node_id, count=1, port_range=None,
+                              ip=None, reserve=False):
+        """Find unassigned allocations on a node, e.g. for create_server().
+
+        The node's allocations are listed the first time, later calls are
+        answered from allocation_index, which is shared with the servers
+        API.  Creating or deleting allocations and servers through the same
+        client keeps the index up to date.
+
+        Example:
+            allocations = api.nodes.find_free_allocations(
+                1, count=2, port_range=(25565, 25600), reserve=True)
+
+        Args:
+            node_id(int): Pterodactyl Node ID.
+            count(int): Number of allocations wanted.
+            port_range(tuple): Lowest and highest port, inclusive.
+            ip(str): Only allocations on this IP.
+            reserve(bool): Mark the allocations as assigned so later calls
+                    don't return them.  Nothing is reserved unless count
+                    allocations are free.
+
+        Returns:
+            list: Dicts with the id, ip and port of each allocation, ordered
+                    by IP then port.
+        """
+        if node_id not in self.allocation_index:
+            self.load_allocation_index(node_id)
+        if reserve:
+            return self.allocation_index.reserve(node_id, count, port_range,
+                                                 ip)
+        return self.allocation_index.find_free(node_id, count, port_range, ip)
 
     def create_allocations(self, node_id, ip, ports, alias=None):
         """Create one or more allocations.
@@ -170,6 +231,8 @@ class Nodes(PterodactylAPI):
         response = self._api_request(
             endpoint='application/nodes/{}/allocations'.format(node_id),
             mode='POST', data=data, json=False)
+        # The panel doesn't return the new allocation ids.
+        self.allocation_index.invalidate(node_id)
         return response
 
     def delete_allocation(self, node_id, allocation_id):
@@ -189,5 +252,56 @@ class Nodes(PterodactylAPI):
                                                                 allocation_id)
         response = self._api_request(
             endpoint=endpoint, mode='DELETE', json=False)
+        self.allocation_index.remove([allocation_id])
         return response
 
+    def delete_allocations(self, node_id, allocation_ids=(), port_ranges=(),
+                           ip=None, concurrency=10):
+        """Deletes many allocations on the specified node.
+
+        The panel only deletes one allocation per call, so the deletes are
+        sent using a thread pool, see pool_maxsize in PterodactylClient.
+        Port ranges are resolved to allocation ids with a single listing of
+        the node's allocations.  Allocations assigned to a server can't be
+        deleted and are reported as errors without a request.
+
+        Example:
+            bulk = api.nodes.delete_allocations(
+                3, port_ranges=['25000-25255'], ip='10.0.0.1', concurrency=8)
+            bulk.stats()
+
+        Args:
+            node_id(int): Pterodactyl Node ID.
+            allocation_ids(iter): Pterodactyl Allocation IDs to delete.
+            port_ranges(iter): Ports to delete as accepted by
+                    create_allocations(), e.g. ['4000', '4003-4005'].
+            ip(str): Only delete ports on this IP.
+            concurrency(int): Maximum number of deletes sent at once.
+
+        Returns:
+            BulkResponse: delete_allocation() responses and errors keyed by
+                    allocation id.
+        """
+        allocation_ids = list(dict.fromkeys(allocation_ids))
+        order = list(allocation_ids)
+        assigned = {}
+        if port_ranges:
+            ranges = parse_port_ranges(port_ranges)
+            response = self.list_node_allocations(node_id,
+                                                  params={'per_page': 100})
+            ids, assigned = select_allocations(response.iter_items(), ranges,
+                                               ip)
+            # The panel lists allocations by id.
+            order += sorted(ids + list(assigned))
+            allocation_ids = [allocation_id for allocation_id in
+                              dict.fromkeys(allocation_ids + ids)
+                              if allocation_id not in assigned]
+        bulk = self._run_bulk(
+            [(allocation_id, functools.partial(self.delete_allocation,
+                                               node_id, allocation_id))
+             for allocation_id in allocation_ids], concurrency)
+        for allocation_id, port in assigned.items():
+            bulk.errors[allocation_id] = BadRequestError(
+                'Allocation {} (port {}) is assigned to a server'.format(
+                    allocation_id, port))
+        return bulk.reorder(order)
@@ -0,0 +1,132 @@
+"""Client-side rate limiting for Pterodactyl API keys."""
+import asyncio
+import threading
+import time
+
+
+def _header_number(headers, name):
+    """Read a numeric header, returning None if missing or invalid."""
+    try:
+        value = headers.get(name)
+    except AttributeError:
+        return None
+    if not isinstance(value, (str, int, float)):
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        return None
+
+
+class RateLimiter(object):
+    """Token bucket limiting the requests made with one API key.
+
+    The panel throttles each API key, by default to 240 requests per minute
+    on the Application API.  Each request takes one token from the bucket and
+    tokens refill continuously at limit/period per second, so bursts of up to
+    ``limit`` requests are allowed before callers are made to wait.
+
+    The bucket corrects itself using the X-RateLimit-Limit and
+    X-RateLimit-Remaining headers returned by the panel, and pauses when a
+    throttled response includes Retry-After.  The same instance can be used
+    from threads and from asyncio tasks.
+    """
+
+    def __init__(self, limit=240, period=60):
+        """Initialize the rate limiter.
+
+        Args:
+            limit(int): Number of requests allowed per period.
+            period(float): Length of the rate limit window in seconds.
+        """
+        self._lock = threading.Lock()
+        self._limit = float(limit)
+        self._period = float(period)
+        self._tokens = float(limit)
+        self._updated = time.monotonic()
+
+    @property
+    def limit(self):
+        """Requests allowed per period, updated from response headers."""
+        return self._limit
+
+    @property
+    def available(self):
+        """Number of requests that can be made without waiting."""
+        with self._lock:
+            self._refill()
+            return max(0.0, self._tokens)
+
+    def _refill(self):
+        now = time.monotonic()
+        elapsed = now - self._updated
+        self._updated = now
+        self._tokens = min(self._limit,
+                           self._tokens + elapsed * self._limit / self._period)
+
+    def _reserve(self):
+        """Take a token, returning the seconds to wait before using it.
+
+        Tokens can go negative, each waiting caller then holds its place in
+        line instead of racing the others when the bucket refills.
+        """
+        with self._lock:
+            self._refill()
+            self._tokens -= 1
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens * self._period / self._limit
+
+    def acquire(self):
+        """Block until a request may be sent.
+
+        Returns:
+            float: Seconds spent waiting.
+        """
+        delay = self._reserve()
+        if delay:
+            time.sleep(delay)
+        return delay
+
+    async def acquire_async(self):
+        """Wait without blocking the event loop until a request may be sent.
+
+        Returns:
+            float: Seconds spent waiting.
+        """
+        delay = self._reserve()
+        if delay:
+            await asyncio.sleep(delay)
+        return delay
+
+    def update(self, headers):
+        """Adjust the bucket using rate limit headers from a response.
+
+        Args:
+            headers(dict): Response headers from the panel.
+        """
+        limit = _header_number(headers, 'X-RateLimit-Limit')
+        remaining = _header_number(headers, 'X-RateLimit-Remaining')
+        retry_after = _header_number(headers, 'Retry-After')
+        with self._lock:
+            self._refill()
+            if limit:
+                self._limit = limit
+            if remaining is not None:
+                self._tokens = min(self._tokens, remaining)
+            if retry_after:
+                # Throttled, hold off everyone until the window resets.
+                self._tokens = min(
+                    self._tokens, -retry_after * self._limit / self._period)
+
+
+def get_rate_limiter(rate_limit):
+    """Get a RateLimiter from a requests per minute value.
+
+    Args:
+        rate_limit(int|RateLimiter): Requests per minute, an existing
+                RateLimiter to share, or None to disable rate limiting.
+    """
+    if rate_limit is None or isinstance(rate_limit, RateLimiter):
+        return rate_limit
+    return RateLimiter(limit=rate_limit, period=60)
@@ -1,4 +1,7 @@
+import functools
+
 from pydactyl.api import base
+from pydactyl.api.cache import EggCache
 from pydactyl.exceptions import BadRequestError
 from pydactyl.responses import PaginatedResponse
 
@@ -6,6 +9,10 @@ from pydactyl.responses import PaginatedResponse
 class Servers(base.PterodactylAPI):
     """Class for interacting with the Pterdactyl Servers API."""
 
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.egg_cache = EggCache()
+
     def list_servers(self, includes=None, params=None):
         """List all servers.
 
@@ -18,7 +25,8 @@ class Servers(base.PterodactylAPI):
             self._api_request(endpoint=endpoint, includes=includes,
                               params=params),
             detail=True)
-        return PaginatedResponse(self, endpoint, response)
+        return PaginatedResponse(self, endpoint, response, params=params,
+                                 includes=includes)
 
     def get_server_info(self, server_id=None, external_id=None, detail=False,
                         includes=None, params=None):
@@ -47,6 +55,34 @@ class Servers(base.PterodactylAPI):
                                      params=params)
         return base.parse_response(response, detail)
 
+    def resolve_external_ids(self, external_ids, inventory=None,
+                             concurrency=10):
+        """Look up many servers by external_id.
+
+        Ids are answered from inventory when it has synced servers,
+        otherwise from one paginated scan of every server.  Only ids the
+        inventory doesn't know, or that a scan of a large panel wasn't worth
+        it for, are looked up one request at a time.
+
+        Example:
+            bulk = api.servers.resolve_external_ids(
+                ['whmcs-12', 'whmcs-13'])
+            bulk.results['whmcs-12']['id']
+
+        Args:
+            external_ids(iter): IDs from an external system like WHMCS
+            inventory(Inventory): Loaded inventory to answer from.
+            concurrency(int): Maximum number of single lookups sent at once.
+
+        Returns:
+            BulkResponse: Server attributes keyed by external id.  Ids
+                    with no server are in errors.
+        """
+        return self._resolve_external_ids(
+            'servers', external_ids, self.list_servers,
+            functools.partial(self.get_server_info, detail=False),
+            inventory=inventory, concurrency=concurrency)
+
     def suspend_server(self, server_id):
         """Suspend the server with the specified internal ID.
 
@@ -107,6 +143,9 @@ class Servers(base.PterodactylAPI):
             endpoint += '/force'
 
         response = self._api_request(endpoint=endpoint, mode='DELETE')
+        # The panel doesn't say which allocations the server had.
+        if self._allocation_index is not None:
+            self._allocation_index.invalidate()
         return response
 
     def list_server_databases(self, server_id, includes=None, params=None):
@@ -120,7 +159,8 @@ class Servers(base.PterodactylAPI):
         endpoint = 'application/servers/{}/databases'.format(server_id)
         response = self._api_request(endpoint=endpoint, includes=includes,
                                      params=params)
-        return PaginatedResponse(self, endpoint, response)
+        return PaginatedResponse(self, endpoint, response, params=params,
+                                 includes=includes)
 
     def get_server_database_info(self, server_id, database_id, detail=False,
                                  includes=None, params=None):
@@ -245,9 +285,7 @@ class Servers(base.PterodactylAPI):
                                   'location_ids')
 
         # Fetch the Egg variables which are required to create the server.
-        egg_info = self._api_request(
-            endpoint='application/nests/{}/eggs/{}'.format(
-                nest_id, egg_id), params={'include': 'variables'})['attributes']
+        egg_info = self._get_egg(nest_id, egg_id)
         egg_vars = egg_info['relationships']['variables']['data']
 
         # Build a dict of environment variables.  Prefer values passed in the
@@ -303,8 +341,59 @@ class Servers(base.PterodactylAPI):
 
         response = self._api_request(endpoint='application/servers',
                                      mode='POST', data=data, json=False)
+        self._track_allocations(default_allocation, additional_allocations)
         return response
-    
+
+    def _track_allocations(self, default_allocation, additional_allocations):
+        """Update the shared allocation index after creating a server."""
+        if self._allocation_index is None:
+            return
+        if default_allocation is None:
+            # The deployment service doesn't say which allocations it used.
+            self._allocation_index.invalidate()
+        else:
+            self._allocation_index.mark_assigned(
+                [default_allocation] + list(additional_allocations or ()))
+
+    def create_servers_bulk(self, specs, concurrency=4):
+        """Create many servers, continuing past individual failures.
+
+        Each distinct egg is looked up once before any server is created,
+        then create_server() runs for each spec using a thread pool.  All
+        requests go through the client's rate limiter and retries, see
+        pool_maxsize in PterodactylClient for sizing the connection pool.
+
+        Example:
+            bulk = api.servers.create_servers_bulk([
+                {'name': 'one', 'user_id': 1, 'nest_id': 1, 'egg_id': 3,
+                 'memory_limit': 1024, 'swap_limit': 0, 'disk_limit': 0,
+                 'location_ids': [1]},
+                ...], concurrency=8)
+            for index, error in bulk.errors.items(): ...
+
+        Args:
+            specs(iter): Dicts of keyword arguments for create_server().
+            concurrency(int): Maximum number of servers created at once.
+
+        Returns:
+            BulkResponse: create_server() responses and errors keyed by the
+                    index of each spec.
+        """
+        specs = list(specs)
+        eggs = self._run_bulk(
+            [(egg, functools.partial(self._get_egg, *egg))
+             for egg in self._unique_eggs(specs)], concurrency)
+        bulk = self._run_bulk(
+            [(index, functools.partial(self.create_server, **spec))
+             for index, spec in enumerate(specs)
+             if self._egg_key(spec) not in eggs.errors], concurrency)
+        for index, spec in enumerate(specs):
+            if self._egg_key(spec) in eggs.errors:
+                bulk.errors[index] = eggs.errors[self._egg_key(spec)]
+        bulk.errors = {i: bulk.errors[i] for i in sorted(bulk.errors)}
+        bulk.elapsed += eggs.elapsed
+        return bulk
+
     def update_server_details(self, server_id, name, user_id, external_id=None, description=None):
         """Updates the details of an existing server.
         
@@ -449,9 +538,7 @@ class Servers(base.PterodactylAPI):
         merged_env = {}
         if egg_id is not None and egg_id != current_egg:
             nest_id = server_info['nest']
-            egg_info = self._api_request(
-                endpoint='application/nests/{}/eggs/{}'.format(nest_id, egg_id),
-                params={'include': 'variables'})['attributes']
+            egg_info = self._get_egg(nest_id, egg_id)
             egg_vars = egg_info['relationships']['variables']['data']
 
             # Build a dict of environment variables. Prefer values passed in
@@ -496,3 +583,66 @@ class Servers(base.PterodactylAPI):
             endpoint='application/servers/{}/startup'.format(server_id),
             mode='PATCH', data=data, json=False)
         return response
+
+    def _get_egg(self, nest_id, egg_id):
+        """Get an egg and its variables, using the egg cache if possible."""
+        egg_info = self.egg_cache.get(nest_id, egg_id)
+        if egg_info is None:
+            egg_info = self._api_request(
+                endpoint='application/nests/{}/eggs/{}'.format(
+                    nest_id, egg_id),
+                params={'include': 'variables'})['attributes']
+            self.egg_cache.set(nest_id, egg_id, egg_info)
+        return egg_info
+
+    @staticmethod
+    def _egg_key(spec):
+        return spec.get('nest_id'), spec.get('egg_id')
+
+    def _unique_eggs(self, specs):
+        """Distinct (nest_id, egg_id) pairs used by create_server specs."""
+        eggs = []
+        for spec in specs:
+            egg = self._egg_key(spec)
+            if None not in egg and egg not in eggs:
+                eggs.append(egg)
+        return eggs
+
+    def prefetch_eggs(self):
+        """Load every egg and its variables into the egg cache.
+
+        Makes one request per page of nests and one per nest, after which
+        create_server() and update_server_startup() don't need to look up
+        eggs until the cache expires.
+
+        Returns:
+            int: Number of eggs loaded.
+        """
+        endpoint = 'application/nests'
+        params = {'per_page': 100}
+        nests = PaginatedResponse(
+            self, endpoint, self._api_request(endpoint=endpoint,
+                                              params=params),
+            params=params)
+        count = 0
+        for nest in nests.iter_items():
+            endpoint = 'application/nests/{}/eggs'.format(nest['id'])
+            params = {'per_page': 100}
+            eggs = PaginatedResponse(
+                self, endpoint,
+                self._api_request(endpoint=endpoint, params=params,
+                                  includes=('variables',)),
+                params=params, includes=('variables',))
+            for egg in eggs.iter_items():
+                self.egg_cache.set(nest['id'], egg['id'], egg)
+                count += 1
+        return count
+
+    def invalidate_eggs(self, nest_id=None, egg_id=None):
+        """Drop cached eggs so they are fetched again on next use.
+
+        Args:
+            nest_id(int): Only drop eggs in this nest.  Drops all if None.
+            egg_id(int): Only drop this egg, requires nest_id.
+        """
+        self.egg_cache.invalidate(nest_id, egg_id)
@@ -5,19 +5,27 @@ from pydactyl.api.client.client_api import ClientAPI
 from pydactyl.api.locations import Locations
 from pydactyl.api.nests import Nests
 from pydactyl.api.nodes import Nodes
+from pydactyl.api.allocation_index import AllocationIndex
+from pydactyl.api.cache import get_response_cache
+from pydactyl.api.codec import get_codec
+from pydactyl.api.rate_limit import get_rate_limiter
 from pydactyl.api.servers import Servers
 from pydactyl.api.user import User
 from pydactyl.exceptions import ClientConfigError
 
 
-def http_adapter(backoff_factor, retries, extra_retry_codes):
-    """Configures an HTTP adapter with retries and backoff."""
+def http_adapter(backoff_factor, retries, extra_retry_codes,
+                 pool_connections=requests.adapters.DEFAULT_POOLSIZE,
+                 pool_maxsize=requests.adapters.DEFAULT_POOLSIZE):
+    """Configures an HTTP adapter with retries, backoff and pool sizes."""
     retry_codes = [429] + extra_retry_codes
     retries = requests.adapters.Retry(
         total=retries, status_forcelist=retry_codes,
         backoff_factor=backoff_factor,
         allowed_methods=['DELETE', 'GET', 'HEAD', 'OPTIONS', 'POST', 'PUT'])
-    adapter = requests.adapters.HTTPAdapter(max_retries=retries)
+    adapter = requests.adapters.HTTPAdapter(max_retries=retries,
+                                            pool_connections=pool_connections,
+                                            pool_maxsize=pool_maxsize)
     return adapter
 
 
@@ -34,7 +42,10 @@ class PterodactylClient(object):
     """
 
     def __init__(self, url=None, api_key=None, backoff_factor=1, retries=3,
-                 extra_retry_codes=[], logger: logging.Logger = get_logger()):
+                 extra_retry_codes=[], logger: logging.Logger = get_logger(),
+                 pool_connections=requests.adapters.DEFAULT_POOLSIZE,
+                 pool_maxsize=requests.adapters.DEFAULT_POOLSIZE,
+                 rate_limit=None, cache=None, json_codec=None):
         """Initialize a Pterodactyl class instance.
 
         Args:
@@ -45,6 +56,25 @@ class PterodactylClient(object):
             extra_retry_codes(iter): list of additional integer HTTP status
                     codes to retry on, e.g. [502, 504]
             logger(logging.Logger): the logger that Pydactyl will use
+            pool_connections(int): number of urllib3 connection pools to
+                    cache, one per host
+            pool_maxsize(int): maximum number of connections to keep open
+                    per pool.  Methods taking a concurrency argument send
+                    that many requests at once from a thread pool, so set
+                    this at least as large as the concurrency used.
+            rate_limit(int|RateLimiter): maximum requests per minute to send
+                    with this API key, e.g. 240.  The limit is corrected
+                    using the panel's rate limit headers.  A RateLimiter can
+                    be passed to share one budget between clients.
+            cache(bool|ResponseCache): True to cache GET responses of the
+                    endpoints in DEFAULT_POLICIES, or a ResponseCache with
+                    custom TTLs and per-endpoint policies.  Disabled by
+                    default.
+            json_codec(str|JSONCodec): JSON decoder for responses and
+                    websocket events.  Defaults to the fastest one
+                    installed out of orjson, ujson and the standard library.
+                    Pass 'json' to force the standard library, or 'orjson'
+                    or 'ujson' to require that package.
         """
         if not url:
             raise ClientConfigError(
@@ -61,10 +91,20 @@ class PterodactylClient(object):
         self._session = requests.Session()
         adapter = http_adapter(backoff_factor=backoff_factor,
                                retries=retries,
-                               extra_retry_codes=extra_retry_codes)
+                               extra_retry_codes=extra_retry_codes,
+                               pool_connections=pool_connections,
+                               pool_maxsize=pool_maxsize)
         self._session.mount('https://', adapter)
         self._session.mount('http://', adapter)
+        self._rate_limiter = get_rate_limiter(rate_limit)
+        self._cache = get_response_cache(cache)
+        self._json_codec = get_codec(json_codec)
+        self._allocation_index = AllocationIndex()
 
+        self._reset_apis()
+
+    def _reset_apis(self):
+        """Drop cached sub-APIs so they are rebuilt on next access."""
         self._client = None
         self._locations = None
         self._nests = None
@@ -72,32 +112,73 @@ class PterodactylClient(object):
         self._servers = None
         self._user = None
 
+    @property
+    def api_key(self):
+        return self._api_key
+
+    @api_key.setter
+    def api_key(self, api_key):
+        self._api_key = api_key
+        self._reset_apis()
+
+    @property
+    def cache(self):
+        """The ResponseCache shared by all sub-APIs, or None if disabled."""
+        return self._cache
+
+    @property
+    def allocation_index(self):
+        """The AllocationIndex shared by the nodes and servers APIs."""
+        return self._allocation_index
+
+    @property
+    def session(self):
+        return self._session
+
+    @session.setter
+    def session(self, session):
+        self._session = session
+        self._reset_apis()
+
+    def _build_api(self, api_class):
+        """Create a sub-API sharing this client's session."""
+        return api_class(self._url, self._api_key, self._session,
+                         rate_limiter=self._rate_limiter, cache=self._cache,
+                         json_codec=self._json_codec,
+                         allocation_index=self._allocation_index)
+
     @property
     def client(self):
-        self._client = ClientAPI(self._url, self._api_key, self._session)
+        if self._client is None:
+            self._client = self._build_api(ClientAPI)
         return self._client
 
     @property
     def locations(self):
-        self._locations = Locations(self._url, self._api_key, self._session)
+        if self._locations is None:
+            self._locations = self._build_api(Locations)
         return self._locations
 
     @property
     def nests(self):
-        self._nests = Nests(self._url, self._api_key, self._session)
+        if self._nests is None:
+            self._nests = self._build_api(Nests)
         return self._nests
 
     @property
     def nodes(self):
-        self._nodes = Nodes(self._url, self._api_key, self._session)
+        if self._nodes is None:
+            self._nodes = self._build_api(Nodes)
         return self._nodes
 
     @property
     def servers(self):
-        self._servers = Servers(self._url, self._api_key, self._session)
+        if self._servers is None:
+            self._servers = self._build_api(Servers)
         return self._servers
 
     @property
     def user(self):
-        self._user = User(self._url, self._api_key, self._session)
+        if self._user is None:
+            self._user = self._build_api(User)
         return self._user
@@ -1,5 +1,9 @@
-import aiohttp
 import logging
+from pydactyl.api.async_base import AsyncRetry, AsyncSessionManager
+from pydactyl.api.allocation_index import AllocationIndex
+from pydactyl.api.cache import get_response_cache
+from pydactyl.api.codec import get_codec
+from pydactyl.api.rate_limit import get_rate_limiter
 from pydactyl.api.client.async_client_api import AsyncClientAPI
 from pydactyl.api.application.async_locations import AsyncLocations
 from pydactyl.api.application.async_nests import AsyncNests
@@ -8,15 +12,56 @@ from pydactyl.api.application.async_servers import AsyncServers
 from pydactyl.api.application.async_user import AsyncUser
 from pydactyl.exceptions import ClientConfigError
 
+
 def get_logger() -> logging.Logger:
     """Get the default logger."""
     logger = logging.getLogger(__name__)
     return logger
 
+
 class AsyncPterodactylClient(object):
     """Async Pterodactyl Client."""
 
-    def __init__(self, url=None, api_key=None, logger: logging.Logger = get_logger()):
+    def __init__(self, url=None, api_key=None, backoff_factor=1, retries=3,
+                 extra_retry_codes=[], logger: logging.Logger = get_logger(),
+                 connection_limit=100, connection_limit_per_host=0,
+                 keepalive_timeout=15, dns_cache_ttl=300, rate_limit=None,
+                 cache=None, json_codec=None):
+        """Initialize an async Pterodactyl class instance.
+
+        All sub-APIs share one aiohttp session and TCPConnector which is
+        opened on first use and kept until close() is called.
+
+        Args:
+            url(str): The base URL of the panel to connect to.
+            api_key(str): Pterodactyl Panel API key.
+            backoff_factor(int): retry backoff factor, matching the urllib3
+                    backoff_factor used by PterodactylClient
+            retries(int): maximum number of retries per call
+            extra_retry_codes(iter): list of additional integer HTTP status
+                    codes to retry on, e.g. [502, 504]
+            logger(logging.Logger): the logger that Pydactyl will use
+            connection_limit(int): maximum number of simultaneous
+                    connections, 0 for no limit
+            connection_limit_per_host(int): maximum number of simultaneous
+                    connections to the panel, 0 for no limit
+            keepalive_timeout(float): seconds to keep idle connections open
+            dns_cache_ttl(int): seconds to cache DNS lookups, None to cache
+                    forever
+            rate_limit(int|RateLimiter): maximum requests per minute to send
+                    with this API key, e.g. 240.  The limit is corrected
+                    using the panel's rate limit headers.  A RateLimiter can
+                    be passed to share one budget between clients.
+            cache(bool|ResponseCache): True to cache GET responses of the
+                    endpoints in DEFAULT_POLICIES, or a ResponseCache with
+                    custom TTLs and per-endpoint policies.  Disabled by
+                    default.
+            json_codec(str|JSONCodec): JSON decoder for responses and
+                    websocket events.  Defaults to the fastest one
+                    installed out of orjson, ujson and the standard library.
+                    Pass 'json' to force the standard library, or 'orjson'
+                    or 'ujson' to require that package.
+        """
         if not url:
             raise ClientConfigError(
                 'You must specify the hostname of a Pterodactyl instance.')
@@ -29,6 +74,19 @@ class AsyncPterodactylClient(object):
         self._url = url
         self._logger = logger
         self._session = None
+        self._session_manager = AsyncSessionManager(
+            limit=connection_limit, limit_per_host=connection_limit_per_host,
+            keepalive_timeout=keepalive_timeout, ttl_dns_cache=dns_cache_ttl)
+        self._retry = AsyncRetry(total=retries, backoff_factor=backoff_factor,
+                                 status_forcelist=[429] + extra_retry_codes)
+        self._rate_limiter = get_rate_limiter(rate_limit)
+        self._cache = get_response_cache(cache)
+        self._json_codec = get_codec(json_codec)
+        self._allocation_index = AllocationIndex()
+        self._reset_apis()
+
+    def _reset_apis(self):
+        """Drop cached sub-APIs so they are rebuilt on next access."""
         self._client = None
         self._locations = None
         self._nests = None
@@ -36,44 +94,90 @@ class AsyncPterodactylClient(object):
         self._servers = None
         self._user = None
 
+    @property
+    def api_key(self):
+        return self._api_key
+
+    @api_key.setter
+    def api_key(self, api_key):
+        self._api_key = api_key
+        self._reset_apis()
+
+    @property
+    def cache(self):
+        """The ResponseCache shared by all sub-APIs, or None if disabled."""
+        return self._cache
+
+    @property
+    def allocation_index(self):
+        """The AllocationIndex shared by the nodes and servers APIs."""
+        return self._allocation_index
+
+    @property
+    def session(self):
+        """The aiohttp session used by all sub-APIs.
+
+        Defaults to the managed session.  Assigning a session replaces it for
+        all sub-APIs, the caller remains responsible for closing it.
+        """
+        return self._session or self._session_manager.session
+
+    @session.setter
+    def session(self, session):
+        self._session = session
+        self._reset_apis()
+
+    def _build_api(self, api_class):
+        """Create a sub-API sharing this client's session."""
+        return api_class(self._url, self._api_key, self._session,
+                         session_manager=self._session_manager,
+                         retry=self._retry, rate_limiter=self._rate_limiter,
+                         cache=self._cache, json_codec=self._json_codec,
+                         allocation_index=self._allocation_index)
+
     async def __aenter__(self):
-        self._session = aiohttp.ClientSession()
+        await self._session_manager.get_session()
         return self
 
     async def __aexit__(self, exc_type, exc_val, exc_tb):
-        if self._session:
-            await self._session.close()
+        await self.close()
 
     async def close(self):
-        if self._session:
-            await self._session.close()
+        """Close the managed session and its open connections."""
+        await self._session_manager.close()
 
     @property
     def client(self):
-        self._client = AsyncClientAPI(self._url, self._api_key, self._session)
+        if self._client is None:
+            self._client = self._build_api(AsyncClientAPI)
         return self._client
 
     @property
     def locations(self):
-        self._locations = AsyncLocations(self._url, self._api_key, self._session)
+        if self._locations is None:
+            self._locations = self._build_api(AsyncLocations)
         return self._locations
 
     @property
     def nests(self):
-        self._nests = AsyncNests(self._url, self._api_key, self._session)
+        if self._nests is None:
+            self._nests = self._build_api(AsyncNests)
         return self._nests
 
     @property
     def nodes(self):
-        self._nodes = AsyncNodes(self._url, self._api_key, self._session)
+        if self._nodes is None:
+            self._nodes = self._build_api(AsyncNodes)
         return self._nodes
 
     @property
     def servers(self):
-        self._servers = AsyncServers(self._url, self._api_key, self._session)
+        if self._servers is None:
+            self._servers = self._build_api(AsyncServers)
         return self._servers
 
     @property
     def user(self):
-        self._user = AsyncUser(self._url, self._api_key, self._session)
+        if self._user is None:
+            self._user = self._build_api(AsyncUser)
         return self._user
@@ -7,3 +7,9 @@ POWER_SIGNALS = ('start', 'stop', 'restart', 'kill')
 REQUEST_TYPES = ('GET', 'POST', 'PATCH', 'DELETE', 'PUT')
 SCHEDULE_ACTIONS = ('command', 'power', 'backup')
 USE_SSL = {True: 'https', False: 'http'}
+
+# Connection state events yielded by websocket clients in reconnect mode.
+WEBSOCKET_DISCONNECTED = 'disconnected'
+WEBSOCKET_RECONNECTING = 'reconnecting'
+WEBSOCKET_RECONNECTED = 'reconnected'
+WEBSOCKET_RECONNECT_FAILED = 'reconnect failed'
@@ -1,16 +1,33 @@
 """Classes used for creating responses."""
+import asyncio
 import inspect
-
+from concurrent.futures import ThreadPoolExecutor
 
 
 class PaginatedResponse(object):
     """An iterable API response that returns paginated results."""
 
-    def __init__(self, client, endpoint, data):
+    def __init__(self, client, endpoint, data, params=None, includes=None):
+        """Initialize a paginated response from the first page of results.
+
+        The params and includes used for the first page are reused when
+        fetching every later page, so filters, includes and per_page apply
+        to all pages.
+
+        Args:
+            client(PterodactylAPI): API instance used to fetch more pages.
+            endpoint(str): URI for the API
+            data(dict): First page of the response.
+            params(dict): Parameters used for the original request.
+            includes(iter): Includes used for the original request.
+        """
         self._client = client
         self.data = data['data']
         self.endpoint = endpoint
         self.meta = data['meta']
+        self.params = dict(params or {})
+        self.params.pop('page', None)
+        self.includes = includes
 
     def __getitem__(self, item):
         if isinstance(item, int):
@@ -41,9 +58,7 @@ class PaginatedResponse(object):
             # PaginatedResponses are initialized with the first page of results
             return self
         if self._next_page_exists(self.meta):
-            params = {'page': self._iteration}
-            response = self._client._api_request(endpoint=self.endpoint,
-                                                 params=params)
+            response = self._request_page(self._iteration)
             self.data = response['data']
             self.meta = response['meta']
             return self
@@ -60,9 +75,7 @@ class PaginatedResponse(object):
         if self._iteration == 1:
             return self
         if self._next_page_exists(self.meta):
-            params = {'page': self._iteration}
-            response = self._client._api_request(endpoint=self.endpoint,
-                                                 params=params)
+            response = self._request_page(self._iteration)
             if inspect.isawaitable(response):
                 response = await response
             self.data = response['data']
@@ -85,28 +98,188 @@ class PaginatedResponse(object):
         """
         return getattr(self, key, default)
 
-    def collect(self):
+    def collect(self, concurrency=None):
         """Collect all results from all pages.
 
+        By default pages are fetched one after another.  When concurrency is
+        greater than 1 the remaining pages are fetched in parallel using a
+        thread pool, results are still returned in page order.  See
+        pool_maxsize in PterodactylClient for sizing the connection pool.
+
+        Args:
+            concurrency(int): Maximum number of pages to fetch at once.
+
         Returns:
             iter: Combined responses from all pages
         """
+        remaining = self._remaining_pages()
+        if concurrency and concurrency > 1 and remaining is not None:
+            collected = list(self.data)
+            with ThreadPoolExecutor(max_workers=concurrency) as executor:
+                for data in executor.map(self._fetch_page_data, remaining):
+                    collected.extend(data)
+            return collected
+
         collected = []
         for page in self:
             collected.extend(page.data)
         return collected
 
-    async def collect_async(self):
+    async def collect_async(self, concurrency=None):
         """Collect all results from all pages asynchronously.
 
+        By default pages are fetched one after another.  When concurrency is
+        greater than 1 up to that many of the remaining pages are requested
+        at once, results are still returned in page order.
+
+        Args:
+            concurrency(int): Maximum number of pages to fetch at once.
+
         Returns:
             iter: Combined responses from all pages
         """
+        remaining = self._remaining_pages()
+        if concurrency and concurrency > 1 and remaining is not None:
+            semaphore = asyncio.Semaphore(concurrency)
+
+            async def fetch(page):
+                async with semaphore:
+                    return await self._fetch_page_data_async(page)
+
+            collected = list(self.data)
+            for data in await asyncio.gather(*[fetch(page)
+                                               for page in remaining]):
+                collected.extend(data)
+            return collected
+
         collected = []
         async for page in self:
             collected.extend(page.data)
         return collected
 
+    def iter_items(self, prefetch=False):
+        """Iterate over the items on every page.
+
+        Unlike collect() only one page is kept in memory at a time, each page
+        is released once its items have been consumed.  The response object
+        itself is not advanced.
+
+        Args:
+            prefetch(bool): If True the next page is requested in a
+                    background thread while the current page is consumed.
+
+        Yields:
+            dict: The attributes of each item.
+        """
+        page = self.meta.get('pagination', {}).get('current_page', 1)
+        data, meta = self.data, self.meta
+        executor = ThreadPoolExecutor(max_workers=1) if prefetch else None
+        upcoming = None
+        try:
+            while True:
+                has_next = self._next_page_exists(meta)
+                if has_next and executor:
+                    upcoming = executor.submit(self._request_page, page + 1)
+                for item in data:
+                    yield self._item_attributes(item)
+                if not has_next:
+                    return
+                page += 1
+                if upcoming:
+                    response = upcoming.result()
+                else:
+                    response = self._request_page(page)
+                data, meta = response['data'], response['meta']
+        finally:
+            if upcoming:
+                upcoming.cancel()
+            if executor:
+                executor.shutdown(wait=False)
+
+    async def aiter_items(self, prefetch=False):
+        """Iterate asynchronously over the items on every page.
+
+        Unlike collect_async() only one page is kept in memory at a time,
+        each page is released once its items have been consumed.  The
+        response object itself is not advanced.
+
+        Args:
+            prefetch(bool): If True the next page is requested while the
+                    current page is consumed.
+
+        Yields:
+            dict: The attributes of each item.
+        """
+        page = self.meta.get('pagination', {}).get('current_page', 1)
+        data, meta = self.data, self.meta
+        upcoming = None
+        try:
+            while True:
+                has_next = self._next_page_exists(meta)
+                if has_next and prefetch:
+                    upcoming = asyncio.ensure_future(
+                        self._request_page_async(page + 1))
+                for item in data:
+                    yield self._item_attributes(item)
+                if not has_next:
+                    return
+                page += 1
+                if upcoming:
+                    response = await upcoming
+                else:
+                    response = await self._request_page_async(page)
+                data, meta = response['data'], response['meta']
+        finally:
+            if upcoming and not upcoming.done():
+                upcoming.cancel()
+
+    @staticmethod
+    def _item_attributes(item):
+        """Get the attributes of a list item, if it has any."""
+        if isinstance(item, dict) and 'attributes' in item:
+            return item['attributes']
+        return item
+
+    def _remaining_pages(self):
+        """Page numbers after the current page, if the total is known.
+
+        Returns:
+            range: Remaining page numbers or None if the pagination metadata
+                    doesn't include the page counts.
+        """
+        pagination = self.meta.get('pagination', {})
+        if 'current_page' not in pagination or 'total_pages' not in pagination:
+            return None
+        return range(pagination['current_page'] + 1,
+                     pagination['total_pages'] + 1)
+
+    def _request_page(self, page):
+        """Request a page using the original query.
+
+        Returns:
+            dict: The response, or an awaitable for async clients.
+        """
+        params = dict(self.params)
+        params['page'] = page
+        if self.includes:
+            return self._client._api_request(endpoint=self.endpoint,
+                                             params=params,
+                                             includes=self.includes)
+        return self._client._api_request(endpoint=self.endpoint,
+                                         params=params)
+
+    async def _request_page_async(self, page):
+        response = self._request_page(page)
+        if inspect.isawaitable(response):
+            response = await response
+        return response
+
+    def _fetch_page_data(self, page):
+        return self._request_page(page)['data']
+
+    async def _fetch_page_data_async(self, page):
+        return (await self._request_page_async(page))['data']
+
     def get_next_page_link(self):
         """Get a link to the next page.
 
@@ -135,3 +308,94 @@ class PaginatedResponse(object):
                   and 'next' in data['pagination']['links']
                   and data['pagination']['links']['next'] != '')
         return exists
+
+
+class BulkResponse(object):
+    """Per-item outcome of an operation run against many items.
+
+    Items that succeeded are in results and items that raised are in errors,
+    both keyed by the item's key and kept in the order the items were given.
+    One failing item never prevents the others from running.
+    """
+
+    def __init__(self, elapsed=0.0):
+        """Initialize an empty bulk response.
+
+        Args:
+            elapsed(float): Seconds taken by the whole operation.
+        """
+        self.results = {}
+        self.errors = {}
+        self.durations = {}
+        self.elapsed = elapsed
+
+    @classmethod
+    def from_outcomes(cls, outcomes, elapsed):
+        """Build a bulk response from (key, duration, succeeded, value)."""
+        bulk = cls(elapsed=elapsed)
+        for key, duration, succeeded, value in outcomes:
+            bulk.durations[key] = duration
+            if succeeded:
+                bulk.results[key] = value
+            else:
+                bulk.errors[key] = value
+        return bulk
+
+    def __len__(self):
+        return len(self.results) + len(self.errors)
+
+    def reorder(self, keys):
+        """Order results, errors and durations by keys, e.g. the input items.
+
+        Keys not in keys keep their relative order after the others.
+        """
+        order = {}
+        for key in keys:
+            order.setdefault(key, len(order))
+
+        def ordered(items):
+            return dict(sorted(items.items(), key=lambda item: order.get(
+                item[0], len(order))))
+
+        self.results = ordered(self.results)
+        self.errors = ordered(self.errors)
+        self.durations = ordered(self.durations)
+        return self
+
+    def __repr__(self):
+        return '<BulkResponse succeeded={} failed={} elapsed={:.3f}s>'.format(
+            len(self.results), len(self.errors), self.elapsed)
+
+    @property
+    def ok(self):
+        """True if every item succeeded."""
+        return not self.errors
+
+    def raise_for_errors(self):
+        """Raise the first error, if any item failed."""
+        for error in self.errors.values():
+            raise error
+
+    def stats(self):
+        """Timing statistics for the whole operation.
+
+        Returns:
+            dict: Item counts, total elapsed seconds and the mean, 95th
+                    percentile and max seconds taken by each item.
+        """
+        durations = sorted(self.durations.values())
+        stats = {
+            'total': len(self),
+            'succeeded': len(self.results),
+            'failed': len(self.errors),
+            'elapsed': self.elapsed,
+            'mean': 0.0,
+            'p95': 0.0,
+            'max': 0.0,
+        }
+        if durations:
+            stats['mean'] = sum(durations) / len(durations)
+            stats['p95'] = durations[
+                min(len(durations) - 1, int(len(durations) * 0.95))]
+            stats['max'] = durations[-1]
+        return stats
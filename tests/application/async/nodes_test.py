@@ -2,11 +2,14 @@ import unittest
 from unittest import mock
 import asyncio
 from pydactyl.async_api_client import AsyncPterodactylClient
+from tests.base.fake_panel import FakeListing, allocations
 
 class AsyncNodesTests(unittest.TestCase):
 
     def setUp(self):
-        self.api = AsyncPterodactylClient(url='https://dummy.com', api_key='dummy')
+        # The mocked responses only implement json().
+        self.api = AsyncPterodactylClient(url='https://dummy.com',
+                                          api_key='dummy', json_codec='json')
 
     def test_list_nodes(self):
         async def run_test():
@@ -164,5 +167,49 @@ class AsyncNodesTests(unittest.TestCase):
 
         asyncio.run(run_test())
 
+    def test_find_free_allocations(self):
+        async def run_test():
+            panel = FakeListing([a['attributes'] for a in allocations()])
+            self.api.nodes._api_request = mock.AsyncMock(side_effect=panel)
+            found = await self.api.nodes.find_free_allocations(
+                1, count=2, ip='10.0.0.1', reserve=True)
+            self.assertEqual([4, 2], [a['id'] for a in found])
+            found = await self.api.nodes.find_free_allocations(
+                1, count=2, ip='10.0.0.1')
+            self.assertEqual([5], [a['id'] for a in found])
+            self.assertEqual(1, panel.pages)
+
+        asyncio.run(run_test())
+
+    def test_allocation_index_shared_with_servers(self):
+        async def run_test():
+            panel = FakeListing([a['attributes'] for a in allocations()])
+            self.api.nodes._api_request = mock.AsyncMock(side_effect=panel)
+            self.api.servers._api_request = mock.AsyncMock()
+            await self.api.nodes.find_free_allocations(1)
+            await self.api.servers.create_server(
+                name='Test Server', user_id=1, nest_id=1, egg_id=1,
+                memory_limit=1024, swap_limit=0, disk_limit=5000,
+                default_allocation=4, additional_allocations=[2])
+            found = await self.api.nodes.find_free_allocations(1, count=5)
+            self.assertEqual([5, 1], [a['id'] for a in found])
+            await self.api.servers.delete_server(7)
+            self.assertNotIn(1, self.api.allocation_index)
+
+        asyncio.run(run_test())
+
+    def test_delete_allocations(self):
+        async def run_test():
+            panel = FakeListing([a['attributes'] for a in allocations()])
+            self.api.nodes._api_request = mock.AsyncMock(side_effect=panel)
+            bulk = await self.api.nodes.delete_allocations(
+                1, port_ranges=[(25565, 25600)], concurrency=3)
+            self.assertEqual({1, 2, 4}, set(bulk.results))
+            self.assertEqual([3], list(bulk.errors))
+            self.assertEqual(1, panel.pages)
+            self.assertEqual(3, len(panel.writes))
+
+        asyncio.run(run_test())
+
 if __name__ == '__main__':
     unittest.main()
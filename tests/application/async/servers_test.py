@@ -1,12 +1,17 @@
 import unittest
 from unittest import mock
 import asyncio
+import requests
 from pydactyl.async_api_client import AsyncPterodactylClient
+from pydactyl.exceptions import PterodactylApiError
+from tests.base.fake_panel import FakeExternalPanel, server
 
 class AsyncServersTests(unittest.TestCase):
 
     def setUp(self):
-        self.api = AsyncPterodactylClient(url='https://dummy.com', api_key='dummy')
+        # The mocked responses only implement json().
+        self.api = AsyncPterodactylClient(url='https://dummy.com',
+                                          api_key='dummy', json_codec='json')
 
     def test_list_servers(self):
         async def run_test():
@@ -155,5 +160,128 @@ class AsyncServersTests(unittest.TestCase):
 
         asyncio.run(run_test())
 
+    def test_create_server_reuses_cached_egg(self):
+        async def run_test():
+            api_request = mock.AsyncMock(return_value={
+                'object': 'server',
+                'attributes': {
+                    'docker_image': 'image',
+                    'startup': 'cmd',
+                    'nest': 1,
+                    'egg': 2,
+                    'container': {'environment': {}, 'installed': 1},
+                    'relationships': {'variables': {'data': []}}
+                }
+            })
+            with mock.patch('pydactyl.api.async_base.AsyncPterodactylAPI.'
+                            '_api_request', api_request):
+                for _ in range(2):
+                    await self.api.servers.create_server(
+                        name='Test Server', user_id=1, nest_id=1, egg_id=1,
+                        memory_limit=1024, swap_limit=0, disk_limit=5000,
+                        default_allocation=1
+                    )
+                egg_endpoints = [c.kwargs['endpoint'] for c in
+                                 api_request.await_args_list]
+                self.assertEqual(
+                    1, egg_endpoints.count('application/nests/1/eggs/1'))
+
+                self.api.servers.invalidate_eggs()
+                await self.api.servers.update_server_startup(
+                    server_id=11, egg_id=1)
+                egg_endpoints = [c.kwargs['endpoint'] for c in
+                                 api_request.await_args_list]
+                self.assertEqual(
+                    2, egg_endpoints.count('application/nests/1/eggs/1'))
+
+        asyncio.run(run_test())
+
+    def test_prefetch_eggs(self):
+        async def run_test():
+            pagination = {'meta': {'pagination': {'links': {}}}}
+
+            async def api_request(endpoint, params=None, includes=None):
+                if endpoint == 'application/nests':
+                    return dict(data=[{'attributes': {'id': 1}},
+                                      {'attributes': {'id': 2}}], **pagination)
+                nest_id = int(endpoint.split('/')[2])
+                return dict(data=[{'attributes': {'id': nest_id * 10}}],
+                            **pagination)
+
+            with mock.patch('pydactyl.api.async_base.AsyncPterodactylAPI.'
+                            '_api_request', side_effect=api_request):
+                self.assertEqual(2, await self.api.servers.prefetch_eggs())
+            self.assertEqual({'id': 20},
+                             self.api.servers.egg_cache.get(2, 20))
+
+        asyncio.run(run_test())
+
+    def test_create_servers_bulk(self):
+        async def run_test():
+            in_flight = []
+            peak = []
+
+            async def api_request(endpoint, mode='GET', data=None, **kwargs):
+                if mode == 'GET':
+                    return {'attributes': {
+                        'docker_image': 'image', 'startup': 'cmd',
+                        'relationships': {'variables': {'data': []}}}}
+                in_flight.append(data['name'])
+                peak.append(len(in_flight))
+                await asyncio.sleep(0.01)
+                in_flight.remove(data['name'])
+                if data['name'] == 'bad':
+                    raise PterodactylApiError('no allocations')
+                return data['name']
+
+            specs = [dict(name=name, user_id=1, nest_id=1, egg_id=1,
+                          memory_limit=1024, swap_limit=0, disk_limit=0,
+                          default_allocation=1)
+                     for name in ('a', 'b', 'bad', 'd', 'e', 'f')]
+            with mock.patch('pydactyl.api.async_base.AsyncPterodactylAPI.'
+                            '_api_request',
+                            side_effect=api_request) as mock_api:
+                bulk = await self.api.servers.create_servers_bulk(
+                    specs, concurrency=2)
+
+            self.assertEqual({0: 'a', 1: 'b', 3: 'd', 4: 'e', 5: 'f'},
+                             bulk.results)
+            self.assertIsInstance(bulk.errors[2], PterodactylApiError)
+            self.assertEqual(2, max(peak))
+            self.assertEqual(7, mock_api.await_count)
+
+        asyncio.run(run_test())
+
+    def test_resolve_external_ids(self):
+        async def run_test():
+            panel = FakeExternalPanel([server(i, user=1, node=1,
+                                              external_id='whmcs-{}'.format(i))
+                                       for i in range(1, 151)])
+            self.api.servers._api_request = mock.AsyncMock(side_effect=panel)
+            bulk = await self.api.servers.resolve_external_ids(
+                ['whmcs-7', 'whmcs-140', 'whmcs-999'])
+            self.assertEqual({'whmcs-7': 7, 'whmcs-140': 140},
+                             {k: v['id'] for k, v in bulk.results.items()})
+            self.assertIsInstance(bulk.errors['whmcs-999'], KeyError)
+            self.assertEqual(2, panel.pages)
+            self.assertEqual([], panel.lookups)
+
+            # Two ids aren't worth scanning the two remaining pages.
+            panel.records += [server(i, user=1, node=1)
+                              for i in range(151, 301)]
+            panel.pages = 0
+            bulk = await self.api.servers.resolve_external_ids(
+                ['whmcs-3', 'whmcs-150', 'whmcs-999'])
+            self.assertEqual([('whmcs-3', 3), ('whmcs-150', 150)],
+                             [(k, v['id']) for k, v in bulk.results.items()])
+            self.assertIsInstance(bulk.errors['whmcs-999'],
+                                  requests.HTTPError)
+            self.assertEqual(1, panel.pages)
+            self.assertEqual({'application/servers/external/whmcs-150',
+                              'application/servers/external/whmcs-999'},
+                             set(panel.lookups))
+
+        asyncio.run(run_test())
+
 if __name__ == '__main__':
     unittest.main()
@@ -2,11 +2,14 @@ import unittest
 from unittest import mock
 import asyncio
 from pydactyl.async_api_client import AsyncPterodactylClient
+from tests.base.fake_panel import FakeExternalPanel, users
 
 class AsyncUserTests(unittest.TestCase):
 
     def setUp(self):
-        self.api = AsyncPterodactylClient(url='https://dummy.com', api_key='dummy')
+        # The mocked responses only implement json().
+        self.api = AsyncPterodactylClient(url='https://dummy.com',
+                                          api_key='dummy', json_codec='json')
 
     def test_list_users(self):
         async def run_test():
@@ -95,5 +98,25 @@ class AsyncUserTests(unittest.TestCase):
 
         asyncio.run(run_test())
 
+    def test_resolve_external_ids(self):
+        async def run_test():
+            panel = FakeExternalPanel(users(300))
+            self.api.user._api_request = mock.AsyncMock(side_effect=panel)
+            bulk = await self.api.user.resolve_external_ids(
+                ['ext-299', 'ext-3', 'ext-4', 'ext-6'])
+            self.assertEqual({'ext-3': 3, 'ext-299': 299},
+                             {k: v['id'] for k, v in bulk.results.items()})
+            self.assertIsInstance(bulk.errors['ext-4'], KeyError)
+            self.assertEqual(3, panel.pages)
+
+            panel.pages = 0
+            bulk = await self.api.user.resolve_external_ids(['ext-201'])
+            self.assertEqual(201, bulk.results['ext-201']['id'])
+            self.assertEqual(1, panel.pages)
+            self.assertEqual(['application/users/external/ext-201'],
+                             panel.lookups)
+
+        asyncio.run(run_test())
+
 if __name__ == '__main__':
     unittest.main()
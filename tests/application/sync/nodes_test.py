@@ -1,6 +1,8 @@
 from unittest import main, mock, TestCase
 
 from pydactyl import PterodactylClient
+from pydactyl.exceptions import BadRequestError
+from tests.base.fake_panel import FakeListing, allocations
 
 
 class NodesTests(TestCase):
@@ -157,6 +159,71 @@ class NodesTests(TestCase):
         self.client.nodes.delete_allocation(16, 123)
         mock_api.assert_called_with(**expected)
 
+    def test_find_free_allocations(self):
+        panel = FakeListing([a['attributes'] for a in allocations()])
+        self.client.nodes._api_request = mock.Mock(side_effect=panel)
+        self.assertEqual(
+            [{'id': 4, 'ip': '10.0.0.1', 'port': 25566}],
+            self.client.nodes.find_free_allocations(
+                16, port_range=(25565, 25600), reserve=True))
+        self.assertEqual([2, 1], [a['id'] for a in
+                                  self.client.nodes.find_free_allocations(
+                                      16, count=2, port_range=(25565, 25600))])
+        self.assertEqual(1, panel.pages)
+
+        self.client.nodes.delete_allocation(16, 2)
+        self.assertEqual([1], [a['id'] for a in
+                               self.client.nodes.find_free_allocations(
+                                   16, port_range=(25565, 25600))])
+        self.client.nodes.create_allocations(16, '10.0.0.1', ['25570'])
+        self.assertNotIn(16, self.client.nodes.allocation_index)
+
+    def test_allocation_index_shared_with_servers(self):
+        panel = FakeListing([a['attributes'] for a in allocations()])
+        self.client.nodes._api_request = mock.Mock(side_effect=panel)
+        self.client.servers._api_request = mock.MagicMock()
+        self.assertIs(self.client.allocation_index,
+                      self.client.nodes.allocation_index)
+        self.client.nodes.find_free_allocations(16)
+
+        self.client.servers.create_server('test server', 1, 2, 3, 4, 5, 6,
+                                          default_allocation=4,
+                                          additional_allocations=[2])
+        self.assertEqual([5, 1], [a['id'] for a in
+                                  self.client.nodes.find_free_allocations(
+                                      16, count=5)])
+        self.client.api_key = 'other'
+        self.client.servers._api_request = mock.MagicMock()
+        self.client.servers.delete_server(7)
+        self.assertNotIn(16, self.client.nodes.allocation_index)
+
+    def test_delete_allocations(self):
+        panel = FakeListing([a['attributes'] for a in allocations()])
+        self.client.nodes._api_request = mock.Mock(side_effect=panel)
+        bulk = self.client.nodes.delete_allocations(
+            16, allocation_ids=[5, 4], port_ranges=['25565-25566', 25567],
+            ip='10.0.0.1', concurrency=4)
+        self.assertEqual([5, 4, 2], list(bulk.results))
+        self.assertIsInstance(bulk.errors[3], BadRequestError)
+        self.assertEqual(1, panel.pages)
+        self.assertEqual(
+            {('DELETE', 'application/nodes/16/allocations/{}'.format(i))
+             for i in (2, 4, 5)}, set(panel.writes))
+        self.assertEqual(4, bulk.stats()['total'])
+
+    def test_delete_allocations_by_id(self):
+        panel = FakeListing([])
+        self.client.nodes._api_request = mock.Mock(side_effect=panel)
+        bulk = self.client.nodes.delete_allocations(16, [7, 8, 7])
+        self.assertEqual([7, 8], list(bulk.results))
+        self.assertEqual(0, panel.pages)
+
+    def test_delete_allocations_invalid_range(self):
+        for port_range in ('abc', '5000-4000', '0', (1, 70000)):
+            with self.assertRaises(BadRequestError):
+                self.client.nodes.delete_allocations(
+                    16, port_ranges=[port_range])
+
 
 if __name__ == '__main__':
     main()
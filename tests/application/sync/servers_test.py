@@ -1,7 +1,8 @@
 from unittest import main, mock, TestCase
 
 from pydactyl import PterodactylClient
-from pydactyl.exceptions import BadRequestError
+from pydactyl.exceptions import BadRequestError, PterodactylApiError
+from tests.base.fake_panel import FakeListing, server
 
 
 class ServersTests(TestCase):
@@ -202,5 +203,88 @@ class ServersTests(TestCase):
             startup_cmd='startup.sh', skip_scripts=False)
         mock_api.assert_called_with(**expected)
 
+    @mock.patch('pydactyl.api.base.PterodactylAPI._api_request')
+    def test_create_server_reuses_cached_egg(self, mock_api):
+        # Doubles as the server info read by update_server_startup.
+        mock_api.return_value = {'attributes': {
+            'docker_image': 'image', 'startup': 'cmd', 'nest': 2, 'egg': 1,
+            'container': {'environment': {}, 'installed': 1},
+            'relationships': {'variables': {'data': []}}}}
+        for _ in range(2):
+            self.client.servers.create_server('test server', 1, 2, 3, 4, 5, 6,
+                                              default_allocation=1234)
+        egg_calls = [c for c in mock_api.call_args_list
+                     if c.kwargs['endpoint'] == 'application/nests/2/eggs/3']
+        self.assertEqual(1, len(egg_calls))
+
+        self.client.servers.invalidate_eggs(nest_id=2)
+        self.client.servers.update_server_startup(server_id=11, egg_id=3)
+        egg_calls = [c for c in mock_api.call_args_list
+                     if c.kwargs['endpoint'] == 'application/nests/2/eggs/3']
+        self.assertEqual(2, len(egg_calls))
+
+    @mock.patch('pydactyl.api.base.PterodactylAPI._api_request')
+    def test_prefetch_eggs(self, mock_api):
+        pagination = {'meta': {'pagination': {'links': {}}}}
+        egg = {'id': 3, 'docker_image': 'image', 'startup': 'cmd',
+               'relationships': {'variables': {'data': []}}}
+        mock_api.side_effect = [
+            dict(data=[{'attributes': {'id': 2}}], **pagination),
+            dict(data=[{'attributes': egg}], **pagination),
+        ]
+        self.assertEqual(1, self.client.servers.prefetch_eggs())
+        mock_api.assert_called_with(endpoint='application/nests/2/eggs',
+                                    params={'per_page': 100},
+                                    includes=('variables',))
+
+        mock_api.reset_mock(side_effect=True)
+        self.client.servers.create_server('test server', 1, 2, 3, 4, 5, 6,
+                                          default_allocation=1234)
+        mock_api.assert_called_once()
+        self.assertEqual('application/servers',
+                         mock_api.call_args.kwargs['endpoint'])
+
+    @mock.patch('pydactyl.api.base.PterodactylAPI._api_request')
+    def test_create_servers_bulk(self, mock_api):
+        egg = {'attributes': {'docker_image': 'image', 'startup': 'cmd',
+                              'relationships': {'variables': {'data': []}}}}
+
+        def api_request(endpoint, mode='GET', data=None, **kwargs):
+            if endpoint.startswith('application/nests/9'):
+                raise PterodactylApiError('missing egg')
+            if mode == 'GET':
+                return egg
+            if data['name'] == 'bad':
+                raise PterodactylApiError('no allocations')
+            return data['name']
+
+        mock_api.side_effect = api_request
+        specs = [dict(name=name, user_id=1, nest_id=nest_id, egg_id=3,
+                      memory_limit=1024, swap_limit=0, disk_limit=0,
+                      default_allocation=1)
+                 for name, nest_id in (('a', 2), ('bad', 2), ('c', 9),
+                                       ('d', 2), ('e', 2))]
+        bulk = self.client.servers.create_servers_bulk(specs, concurrency=3)
+
+        self.assertEqual({0: 'a', 3: 'd', 4: 'e'}, bulk.results)
+        self.assertEqual([1, 2], list(bulk.errors))
+        self.assertFalse(bulk.ok)
+        endpoints = [c.kwargs['endpoint'] for c in mock_api.call_args_list]
+        self.assertEqual(1, endpoints.count('application/nests/2/eggs/3'))
+        self.assertEqual(1, endpoints.count('application/nests/9/eggs/3'))
+        self.assertEqual(4, endpoints.count('application/servers'))
+
+    def test_resolve_external_ids(self):
+        panel = FakeListing([server(i, user=1, node=1,
+                                    external_id='whmcs-{}'.format(i))
+                             for i in range(1, 151)])
+        self.client.servers._api_request = mock.Mock(side_effect=panel)
+        bulk = self.client.servers.resolve_external_ids(
+            ['whmcs-7', 'whmcs-140', 'whmcs-999'])
+        self.assertEqual({'whmcs-7': 7, 'whmcs-140': 140},
+                         {k: v['id'] for k, v in bulk.results.items()})
+        self.assertIsInstance(bulk.errors['whmcs-999'], KeyError)
+        self.assertEqual(2, panel.pages)
+
 if __name__ == '__main__':
     main()
@@ -1,7 +1,10 @@
 from unittest import main, mock, TestCase
 
+import requests
 from pydactyl import PterodactylClient
+from pydactyl.api.inventory import Inventory
 from pydactyl.exceptions import BadRequestError
+from tests.base.fake_panel import FakeExternalPanel, users
 
 
 class UserTests(TestCase):
@@ -157,6 +160,56 @@ class UserTests(TestCase):
             password='hunter2', root_admin=False, language='en')
         mock_api.assert_called_with(**expected)
 
+    def fake_panel(self, count):
+        panel = FakeExternalPanel(users(count))
+        self.client.user._api_request = mock.Mock(side_effect=panel)
+        return panel
+
+    def test_resolve_external_ids_scan(self):
+        panel = self.fake_panel(120)
+        bulk = self.client.user.resolve_external_ids(
+            ['ext-1', 'ext-99', 'ext-2', 'ext-101'])
+        self.assertEqual({'ext-1': 1, 'ext-99': 99, 'ext-101': 101},
+                         {k: v['id'] for k, v in bulk.results.items()})
+        self.assertEqual(['ext-2'], list(bulk.errors))
+        self.assertIsInstance(bulk.errors['ext-2'], KeyError)
+        self.assertEqual(2, panel.pages)
+        self.assertEqual([], panel.lookups)
+
+    def test_resolve_external_ids_point_lookups(self):
+        panel = self.fake_panel(1000)
+        bulk = self.client.user.resolve_external_ids(['ext-1', 'ext-901',
+                                                      'ext-2'])
+        self.assertEqual({'ext-1', 'ext-901'}, set(bulk.results))
+        self.assertIsInstance(bulk.errors['ext-2'], requests.HTTPError)
+        # The first page answered ext-1, the rest weren't worth 9 pages.
+        self.assertEqual(1, panel.pages)
+        self.assertEqual({'application/users/external/ext-901',
+                          'application/users/external/ext-2'},
+                         set(panel.lookups))
+
+    def test_resolve_external_ids_keeps_input_order(self):
+        self.fake_panel(1000)
+        bulk = self.client.user.resolve_external_ids(
+            ['ext-3', 'ext-901', 'ext-2', 'ext-1', 'ext-4'])
+        self.assertEqual(['ext-3', 'ext-901', 'ext-1'], list(bulk.results))
+        self.assertEqual(['ext-2', 'ext-4'], list(bulk.errors))
+
+    def test_resolve_external_ids_from_inventory(self):
+        panel = self.fake_panel(10)
+        inventory = Inventory(self.client, resources=('users',))
+        inventory.refresh()
+        panel.records.append({'id': 11, 'username': 'new',
+                              'external_id': 'ext-11'})
+        panel.pages = 0
+        bulk = self.client.user.resolve_external_ids(
+            ['ext-3', 'ext-11'], inventory=inventory)
+        self.assertEqual({'ext-3': 3, 'ext-11': 11},
+                         {k: v['id'] for k, v in bulk.results.items()})
+        self.assertEqual(0, panel.pages)
+        self.assertEqual(['application/users/external/ext-11'],
+                         panel.lookups)
+
 
 if __name__ == '__main__':
     main()
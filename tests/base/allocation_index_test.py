@@ -0,0 +1,83 @@
+import threading
+import unittest
+
+from pydactyl.api.allocation_index import AllocationIndex
+from tests.base.fake_panel import allocations
+
+
+class AllocationIndexTests(unittest.TestCase):
+
+    def setUp(self):
+        self.index = AllocationIndex()
+        self.index.load(1, allocations())
+
+    def test_find_free(self):
+        self.assertIn(1, self.index)
+        self.assertNotIn(2, self.index)
+        self.assertEqual(
+            [{'id': 4, 'ip': '10.0.0.1', 'port': 25566},
+             {'id': 2, 'ip': '10.0.0.1', 'port': 25567},
+             {'id': 1, 'ip': '10.0.0.2', 'port': 25565}],
+            self.index.find_free(1, count=3, port_range=(25565, 25600)))
+        self.assertEqual([1], [a['id'] for a in self.index.find_free(
+            1, count=5, ip='10.0.0.2')])
+        self.assertEqual([5], [a['id'] for a in self.index.find_free(
+            1, port_range=(26000, 40000))])
+        self.assertEqual([], self.index.find_free(1, ip='10.0.0.9'))
+        self.assertEqual(4, self.index.free_count(1))
+        self.assertEqual(2, self.index.free_count(1, (25566, 25567)))
+        with self.assertRaises(KeyError):
+            self.index.find_free(2)
+
+    def test_assignment_updates(self):
+        self.index.mark_assigned([4, 99])
+        self.assertEqual([2], [a['id'] for a in self.index.find_free(
+            1, ip='10.0.0.1', port_range=(25565, 25600))])
+        self.index.mark_free([3, 4])
+        self.assertEqual([3, 4, 2], [a['id'] for a in self.index.find_free(
+            1, count=3, ip='10.0.0.1')])
+        self.index.remove([3])
+        self.index.mark_free([3])
+        self.assertEqual([4, 2], [a['id'] for a in self.index.find_free(
+            1, count=2, ip='10.0.0.1')])
+
+    def test_reserve(self):
+        self.assertEqual([], self.index.reserve(1, count=5,
+                                                port_range=(25565, 25600)))
+        self.assertEqual(3, self.index.free_count(1, (25565, 25600)))
+        reserved = self.index.reserve(1, count=2, port_range=(25565, 25600))
+        self.assertEqual([4, 2], [a['id'] for a in reserved])
+        self.assertEqual([1], [a['id'] for a in self.index.reserve(
+            1, port_range=(25565, 25600))])
+
+    def test_concurrent_reserve_never_shares(self):
+        index = AllocationIndex()
+        index.load(1, [{'id': port, 'ip': '10.0.0.1', 'port': port,
+                        'assigned': False} for port in range(20000, 21000)])
+        reserved = []
+
+        def worker():
+            for _ in range(50):
+                reserved.extend(a['id'] for a in index.reserve(1, count=2))
+
+        threads = [threading.Thread(target=worker) for _ in range(10)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(1000, len(reserved))
+        self.assertEqual(1000, len(set(reserved)))
+        self.assertEqual(0, index.free_count(1))
+
+    def test_invalidate(self):
+        self.index.load(2, [])
+        self.index.invalidate(1)
+        self.assertNotIn(1, self.index)
+        self.assertIn(2, self.index)
+        self.index.mark_free([1])
+        self.index.invalidate()
+        self.assertNotIn(2, self.index)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,5 +1,12 @@
+import io
+import timeit
 import unittest
+from unittest import mock
 
+import requests
+from urllib3.response import HTTPResponse
+
+from pydactyl.api.client.client_api import ClientServersAPI
 from pydactyl.exceptions import ClientConfigError
 from pydactyl import api_client
 
@@ -11,3 +18,76 @@ class ApiClientTests(unittest.TestCase):
             api_client.PterodactylClient(api_key='key', url=None)
         with self.assertRaises(ClientConfigError):
             api_client.PterodactylClient(api_key=None, url='url')
+
+    def test_pool_sizes_are_configurable(self):
+        client = api_client.PterodactylClient(
+            url='https://dummy.com', api_key='key', pool_connections=2,
+            pool_maxsize=32)
+        adapter = client._session.get_adapter('https://dummy.com')
+        self.assertEqual(2, adapter._pool_connections)
+        self.assertEqual(32, adapter._pool_maxsize)
+
+    def test_client_sub_apis_share_parent_session(self):
+        client = api_client.PterodactylClient(url='https://dummy.com',
+                                              api_key='key')
+        servers = client.client.servers
+        sub_apis = [client.client, client.client.account, servers,
+                    servers.backups, servers.databases, servers.files,
+                    servers.network, servers.schedules, servers.settings,
+                    servers.startup, servers.users]
+        for sub_api in sub_apis:
+            self.assertIs(client._session, sub_api._session)
+
+    @mock.patch('urllib3.connectionpool.HTTPConnectionPool.urlopen')
+    def test_client_fan_out_uses_single_connection_pool(self, mock_urlopen):
+        mock_urlopen.side_effect = lambda *args, **kwargs: HTTPResponse(
+            body=io.BytesIO(b'{"object": "list", "data": []}'), status=200,
+            preload_content=False,
+            headers={'Content-Type': 'application/json'})
+        client = api_client.PterodactylClient(url='http://dummy.com',
+                                              api_key='key')
+        for _ in range(5):
+            client.client.account.get_account()
+            client.client.servers.files.list_files('abc')
+            client.client.servers.backups.list_backups('abc')
+            client.client.servers.get_server_utilization('abc')
+
+        adapter = client._session.get_adapter('http://dummy.com')
+        self.assertEqual(20, mock_urlopen.call_count)
+        self.assertEqual(1, len(adapter.poolmanager.pools))
+
+    def test_sub_apis_are_cached(self):
+        client = api_client.PterodactylClient(url='https://dummy.com',
+                                              api_key='key')
+        for name in ('client', 'locations', 'nests', 'nodes', 'servers',
+                     'user'):
+            self.assertIs(getattr(client, name), getattr(client, name))
+        self.assertIs(client.client.servers.files,
+                      client.client.servers.files)
+
+    def test_sub_apis_rebuilt_when_key_or_session_changes(self):
+        client = api_client.PterodactylClient(url='https://dummy.com',
+                                              api_key='key')
+        servers = client.servers
+        client.api_key = 'new_key'
+        self.assertIsNot(servers, client.servers)
+        self.assertEqual('new_key', client.servers._api_key)
+
+        files = client.client.servers.files
+        client.session = requests.Session()
+        self.assertIsNot(files, client.client.servers.files)
+        self.assertIs(client.session, client.client.servers.files._session)
+
+    def test_cached_sub_api_access_benchmark(self):
+        client = api_client.PterodactylClient(url='https://dummy.com',
+                                              api_key='key')
+
+        def build():
+            return ClientServersAPI(client._url, client._api_key,
+                                    client._session).files
+
+        cached = min(timeit.repeat(lambda: client.client.servers.files,
+                                   number=2000, repeat=3))
+        uncached = min(timeit.repeat(build, number=2000, repeat=3))
+        self.assertLess(cached, uncached)
+
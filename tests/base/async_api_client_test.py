@@ -0,0 +1,115 @@
+import asyncio
+import unittest
+from unittest import mock
+
+import aiohttp
+
+from pydactyl.api.async_base import AsyncPterodactylAPI
+from pydactyl.async_api_client import AsyncPterodactylClient
+from pydactyl.exceptions import ClientConfigError
+
+
+def mock_response(json_data=None, status=200):
+    response = mock.Mock()
+    response.json = mock.AsyncMock(return_value=json_data or {})
+    response.status = status
+    return response
+
+
+class AsyncApiClientTests(unittest.TestCase):
+
+    def setUp(self):
+        # The mocked responses only implement json().
+        self.api = AsyncPterodactylClient(url='https://dummy.com',
+                                          api_key='dummy', json_codec='json')
+
+    def test_async_client_raises_without_required_params(self):
+        with self.assertRaises(ClientConfigError):
+            AsyncPterodactylClient(api_key='key', url=None)
+        with self.assertRaises(ClientConfigError):
+            AsyncPterodactylClient(api_key=None, url='url')
+
+    def test_sub_apis_are_cached(self):
+        for name in ('client', 'locations', 'nests', 'nodes', 'servers',
+                     'user'):
+            self.assertIs(getattr(self.api, name), getattr(self.api, name))
+        self.assertIs(self.api.client.servers.files,
+                      self.api.client.servers.files)
+
+    def test_sub_apis_rebuilt_with_new_session(self):
+        async def run_test():
+            servers = self.api.servers
+            async with aiohttp.ClientSession() as session:
+                self.api.session = session
+                self.assertIsNot(servers, self.api.servers)
+                self.assertIs(session, self.api.servers._session)
+                self.assertIs(session, self.api.client.servers.files._session)
+
+        asyncio.run(run_test())
+
+    def test_connector_is_configurable(self):
+        async def run_test():
+            api = AsyncPterodactylClient(
+                url='https://dummy.com', api_key='dummy',
+                connection_limit=25, connection_limit_per_host=5,
+                keepalive_timeout=30, dns_cache_ttl=600)
+            with mock.patch('aiohttp.TCPConnector',
+                            wraps=aiohttp.TCPConnector) as mock_connector:
+                async with api:
+                    await api.servers._get_session()
+                    await api.client.servers.files._get_session()
+                mock_connector.assert_called_once_with(
+                    limit=25, limit_per_host=5, keepalive_timeout=30,
+                    ttl_dns_cache=600)
+
+        asyncio.run(run_test())
+
+    def test_sub_apis_share_one_session(self):
+        async def run_test():
+            with mock.patch('aiohttp.ClientSession.get') as mock_get:
+                mock_get.return_value.__aenter__.return_value = mock_response(
+                    {'object': 'list', 'data': []})
+                async with self.api as api:
+                    await api.nodes.get_node_config(1)
+                    await api.client.account.get_account()
+                    await api.client.servers.files.list_files('abc')
+                    await api.client.servers.get_server_utilization('abc')
+                    session = api.session
+
+                sessions = {await sub_api._get_session() for sub_api in (
+                    api.nodes, api.client.account, api.client.servers.files)}
+                self.assertEqual(4, mock_get.call_count)
+                self.assertIsNot(session, api.session)
+                self.assertTrue(session.closed)
+                self.assertEqual(1, len(sessions))
+                await api.close()
+
+        asyncio.run(run_test())
+
+    def test_session_is_reused_outside_context_manager(self):
+        async def run_test():
+            with mock.patch('aiohttp.ClientSession.get') as mock_get:
+                mock_get.return_value.__aenter__.return_value = mock_response(
+                    {'object': 'server', 'attributes': {}})
+                with mock.patch('aiohttp.ClientSession.__init__',
+                                autospec=True,
+                                side_effect=aiohttp.ClientSession.__init__
+                                ) as mock_init:
+                    for _ in range(5):
+                        await self.api.servers.get_server_info(1)
+                self.assertEqual(1, mock_init.call_count)
+            await self.api.close()
+            self.assertIsNone(self.api.session)
+
+        asyncio.run(run_test())
+
+    def test_temporary_session_warns(self):
+        async def run_test():
+            api = AsyncPterodactylAPI(url='https://dummy.com',
+                                      api_key='dummy')
+            with mock.patch('aiohttp.ClientSession.get') as mock_get:
+                mock_get.return_value.__aenter__.return_value = mock_response()
+                with self.assertWarns(RuntimeWarning):
+                    await api._api_request(endpoint='anything')
+
+        asyncio.run(run_test())
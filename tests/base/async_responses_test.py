@@ -86,5 +86,96 @@ class AsyncPaginationTests(unittest.TestCase):
 
         asyncio.run(run_test())
 
+    def test_collect_async_concurrent_keeps_order(self):
+        async def run_test():
+            in_flight = []
+            peak = []
+
+            async def api_request(endpoint, params):
+                in_flight.append(params['page'])
+                peak.append(len(in_flight))
+                # Later pages return first to check the results are reordered.
+                await asyncio.sleep(0.01 * (10 - params['page']))
+                in_flight.remove(params['page'])
+                return {'data': [{'id': params['page']}]}
+
+            client = mock.Mock(spec=AsyncPterodactylClient)
+            client._api_request = mock.Mock(side_effect=api_request)
+            data = {
+                'data': [{'id': 1}],
+                'meta': {
+                    'pagination': {
+                        'total': 8, 'current_page': 1, 'total_pages': 8,
+                        'links': {'next': 'http://next'}
+                    }
+                }
+            }
+
+            paginated = PaginatedResponse(client, 'endpoint', data)
+            items = await paginated.collect_async(concurrency=3)
+
+            self.assertEqual(list(range(1, 9)), [i['id'] for i in items])
+            self.assertEqual(7, client._api_request.call_count)
+            self.assertEqual(3, max(peak))
+
+        asyncio.run(run_test())
+
+    def test_pages_reuse_original_query(self):
+        async def run_test():
+            client = mock.Mock(spec=AsyncPterodactylClient)
+            client._api_request = mock.AsyncMock()
+            client._api_request.return_value = {
+                'data': [{'id': 2}],
+                'meta': {'pagination': {'total': 2, 'links': {'next': ''}}}
+            }
+            data = {
+                'data': [{'id': 1}],
+                'meta': {
+                    'pagination': {
+                        'total': 2,
+                        'links': {'next': 'http://next'}
+                    }
+                }
+            }
+
+            paginated = PaginatedResponse(
+                client, 'endpoint', data, params={'per_page': 1},
+                includes=('egg',))
+            items = await paginated.collect_async()
+
+            self.assertEqual(2, len(items))
+            client._api_request.assert_awaited_once_with(
+                endpoint='endpoint', params={'per_page': 1, 'page': 2},
+                includes=('egg',))
+
+        asyncio.run(run_test())
+
+    def test_aiter_items(self):
+        async def run_test():
+            client = mock.Mock(spec=AsyncPterodactylClient)
+            data = {
+                'data': [{'attributes': {'id': 1}}, {'attributes': {'id': 2}}],
+                'meta': {'pagination': {'current_page': 1,
+                                        'links': {'next': 'http://next'}}}
+            }
+
+            for prefetch in (False, True):
+                client._api_request = mock.AsyncMock(side_effect=[
+                    {'data': [{'attributes': {'id': 3}},
+                              {'attributes': {'id': 4}}],
+                     'meta': {'pagination': {'links': {'next': 'next'}}}},
+                    {'data': [{'attributes': {'id': 5}}],
+                     'meta': {'pagination': {'links': {}}}},
+                ])
+                paginated = PaginatedResponse(client, 'endpoint', data)
+                ids = [item['id'] async for item in
+                       paginated.aiter_items(prefetch=prefetch)]
+                self.assertEqual([1, 2, 3, 4, 5], ids)
+                self.assertEqual(2, client._api_request.await_count)
+                client._api_request.assert_awaited_with(
+                    endpoint='endpoint', params={'page': 3})
+
+        asyncio.run(run_test())
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,98 @@
+import asyncio
+import unittest
+from unittest import mock
+
+import aiohttp
+
+from pydactyl.api.async_base import AsyncRetry
+from pydactyl.async_api_client import AsyncPterodactylClient
+from tests.base.stub_panel import StubPanel
+
+
+class AsyncRetryTests(unittest.TestCase):
+
+    def test_retries_throttled_requests(self):
+        async def run_test():
+            responses = [(429, {'Retry-After': '0'}),
+                         (429, {'Retry-After': '0'}), (200, {})]
+            async with StubPanel(responses) as panel:
+                async with AsyncPterodactylClient(
+                        url=panel.url, api_key='dummy',
+                        backoff_factor=0) as api:
+                    response = await api.servers.get_server_info(1)
+            self.assertEqual(3, panel.hits)
+            self.assertEqual({}, response)
+
+        asyncio.run(run_test())
+
+    def test_retries_post_requests(self):
+        async def run_test():
+            async with StubPanel([(429, {}), (200, {})]) as panel:
+                async with AsyncPterodactylClient(
+                        url=panel.url, api_key='dummy',
+                        backoff_factor=0) as api:
+                    await api.servers.suspend_server(1)
+            self.assertEqual(2, panel.hits)
+
+        asyncio.run(run_test())
+
+    def test_raises_when_retries_exhausted(self):
+        async def run_test():
+            async with StubPanel([(429, {})]) as panel:
+                async with AsyncPterodactylClient(
+                        url=panel.url, api_key='dummy', retries=2,
+                        backoff_factor=0) as api:
+                    with self.assertRaises(aiohttp.ClientResponseError):
+                        await api.servers.get_server_info(1)
+            self.assertEqual(3, panel.hits)
+
+        asyncio.run(run_test())
+
+    def test_extra_retry_codes(self):
+        async def run_test():
+            async with StubPanel([(502, {}), (200, {})]) as panel:
+                async with AsyncPterodactylClient(
+                        url=panel.url, api_key='dummy', backoff_factor=0,
+                        extra_retry_codes=[502]) as api:
+                    await api.client.servers.get_server('abc')
+            self.assertEqual(2, panel.hits)
+
+            async with StubPanel([(502, {}), (200, {})]) as panel:
+                async with AsyncPterodactylClient(
+                        url=panel.url, api_key='dummy',
+                        backoff_factor=0) as api:
+                    with self.assertRaises(aiohttp.ClientResponseError):
+                        await api.client.servers.get_server('abc')
+            self.assertEqual(1, panel.hits)
+
+        asyncio.run(run_test())
+
+    def test_retry_after_header_sets_delay(self):
+        async def run_test():
+            async with StubPanel([(429, {'Retry-After': '7'}),
+                                  (200, {})]) as panel:
+                async with AsyncPterodactylClient(
+                        url=panel.url, api_key='dummy') as api:
+                    with mock.patch('asyncio.sleep',
+                                    new_callable=mock.AsyncMock) as sleep:
+                        await api.nodes.get_node_config(1)
+            sleep.assert_called_once_with(7.0)
+
+        asyncio.run(run_test())
+
+    def test_backoff_is_exponential_with_jitter(self):
+        retry = AsyncRetry(backoff_factor=1, backoff_max=10)
+        self.assertEqual(0, retry.get_backoff(1))
+        with mock.patch('random.uniform', side_effect=lambda a, b: b):
+            self.assertEqual([2, 4, 8, 10],
+                             [retry.get_backoff(n) for n in range(2, 6)])
+        with mock.patch('random.uniform', side_effect=lambda a, b: a):
+            self.assertEqual([1, 2, 4, 5],
+                             [retry.get_backoff(n) for n in range(2, 6)])
+
+    def test_parse_retry_after(self):
+        self.assertEqual(3, AsyncRetry.parse_retry_after(' 3 '))
+        self.assertEqual(
+            0, AsyncRetry.parse_retry_after('Wed, 21 Oct 2015 07:28:00 GMT'))
+        self.assertIsNone(AsyncRetry.parse_retry_after('soon'))
+        self.assertEqual(120, AsyncRetry().get_backoff(1, '3600'))
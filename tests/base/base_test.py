@@ -186,6 +186,14 @@ class BaseTests(unittest.TestCase):
         mock_request.assert_called_with('https://dummy.com/api/inptest',
                                         **expected)
 
+    @mock.patch.object(Session, 'get')
+    def test_api_request_with_includes_does_not_modify_params(self,
+                                                               mock_request):
+        params = {'per_page': 300}
+        self.api._api_request(endpoint='inptest', includes=('users',),
+                              params=params)
+        self.assertEqual({'per_page': 300}, params)
+
     def test_api_request_raises_without_endpoint(self):
         with self.assertRaises(BadRequestError):
             self.api._api_request(endpoint=None)
@@ -0,0 +1,215 @@
+import asyncio
+import json
+import unittest
+from unittest import mock
+
+from requests import Session
+
+from pydactyl import AsyncPterodactylClient, PterodactylClient
+from pydactyl.api.cache import ResponseCache
+from tests.base.stub_panel import StubPanel
+
+
+def make_response(json_data=None, status_code=200, headers=None):
+    response = mock.Mock()
+    response.json.return_value = json_data or {}
+    response.content = json.dumps(json_data or {}).encode()
+    response.status_code = status_code
+    response.headers = headers or {}
+    return response
+
+
+EGG = {'object': 'egg', 'attributes': {'id': 3, 'docker_image': 'java'}}
+
+
+class ResponseCacheTests(unittest.TestCase):
+
+    def test_policies(self):
+        cache = ResponseCache(ttl=5, policies={'application/nests*': 3600,
+                                               'application/servers*': 0})
+        self.assertEqual(3600, cache.get_ttl('application/nests/1/eggs/3'))
+        self.assertEqual(0, cache.get_ttl('/application/servers/1'))
+        self.assertEqual(5, cache.get_ttl('application/nodes'))
+
+    def test_default_policies(self):
+        cache = ResponseCache()
+        self.assertEqual(3600, cache.get_ttl('application/nests/1/eggs/3'))
+        self.assertEqual(0, cache.get_ttl('application/nodes/1/allocations'))
+        self.assertEqual(0, cache.get_ttl('application/servers/1'))
+        self.assertEqual(0, cache.get_ttl('client/servers/abc'))
+        everything = ResponseCache(ttl=60, policies={'client/*': 60})
+        self.assertEqual(60, everything.get_ttl('client/servers/abc'))
+        for endpoint in ('resources', 'websocket'):
+            self.assertEqual(0, everything.get_ttl(
+                'client/servers/abc/' + endpoint))
+
+    def test_lru_eviction(self):
+        cache = ResponseCache(max_entries=2)
+        for url in ('a', 'b', 'c'):
+            cache.store(cache.make_key(url), {'url': url}, {}, 60)
+            if url == 'b':
+                cache.lookup(cache.make_key('a'))
+        self.assertIsNotNone(cache.lookup(cache.make_key('a')))
+        self.assertIsNone(cache.lookup(cache.make_key('b')))
+        self.assertEqual(1, cache.stats()['evictions'])
+
+    def test_make_key_ignores_param_order(self):
+        self.assertEqual(ResponseCache.make_key('u', {'a': 1, 'b': 2}),
+                         ResponseCache.make_key('u', {'b': 2, 'a': 1}))
+
+    def test_invalidate(self):
+        cache = ResponseCache()
+        urls = ['api/application/nodes', 'api/application/nodes/1',
+                'api/application/nodes/1/allocations',
+                'api/application/nodes/2']
+        for url in urls:
+            cache.store(cache.make_key(url), {'url': url}, {}, 60)
+        cache.invalidate('api/application/nodes/1')
+        self.assertEqual(1, len(cache))
+        self.assertIsNotNone(cache.lookup(
+            cache.make_key('api/application/nodes/2')))
+
+    def test_invalidate_server_scope(self):
+        cache = ResponseCache()
+        urls = ['api/client/servers', 'api/client/servers/abc',
+                'api/client/servers/abc/files/list',
+                'api/client/servers/abc/startup', 'api/client/servers/def']
+        for url in urls:
+            cache.store(cache.make_key(url), {'url': url}, {}, 60)
+        cache.invalidate('api/client/servers/abc/power')
+        self.assertEqual(1, len(cache))
+        self.assertIsNotNone(cache.lookup(
+            cache.make_key('api/client/servers/def')))
+
+
+class ClientCacheTests(unittest.TestCase):
+
+    def setUp(self):
+        self.api = PterodactylClient(url='https://dummy.com', api_key='dummy',
+                                     cache=True)
+
+    def test_cache_disabled_by_default(self):
+        api = PterodactylClient(url='dummy', api_key='dummy')
+        self.assertIsNone(api.cache)
+        self.assertIsNone(api.nests._cache)
+
+    @mock.patch.object(Session, 'get')
+    def test_fresh_hits_skip_request(self, mock_get):
+        mock_get.return_value = make_response(EGG)
+        for _ in range(3):
+            egg = self.api.nests.get_egg_info(1, 3)
+        self.assertEqual(1, mock_get.call_count)
+        self.assertEqual(EGG, egg)
+        stats = self.api.cache.stats()
+        self.assertEqual(2, stats['hits'])
+        self.assertEqual(1, stats['misses'])
+
+    @mock.patch.object(Session, 'get')
+    def test_api_key_change_misses(self, mock_get):
+        mock_get.return_value = make_response(EGG)
+        self.api.nests.get_egg_info(1, 3)
+        self.api.api_key = 'other'
+        self.api.nests.get_egg_info(1, 3)
+        self.assertEqual(2, mock_get.call_count)
+        self.assertEqual(2, self.api.cache.stats()['misses'])
+
+    @mock.patch.object(Session, 'get')
+    def test_cached_data_is_copied(self, mock_get):
+        mock_get.return_value = make_response(EGG)
+        self.api.nests.get_egg_info(1, 3)['attributes']['id'] = 99
+        self.assertEqual(3, self.api.nests.get_egg_info(1, 3)['attributes'][
+            'id'])
+
+    @mock.patch.object(Session, 'get')
+    def test_stale_entry_revalidated_with_etag(self, mock_get):
+        api = PterodactylClient(url='https://dummy.com', api_key='dummy',
+                                cache=ResponseCache(ttl=0.01))
+        mock_get.side_effect = [
+            make_response(EGG, headers={'ETag': '"v1"'}),
+            make_response(status_code=304),
+        ]
+        api.nests.get_egg_info(1, 3)
+        with mock.patch('time.monotonic', return_value=10 ** 9):
+            self.assertEqual(EGG, api.nests.get_egg_info(1, 3))
+        _, kwargs = mock_get.call_args
+        self.assertEqual('"v1"', kwargs['headers']['If-None-Match'])
+        self.assertEqual(1, api.cache.stats()['revalidations'])
+
+    @mock.patch.object(Session, 'patch')
+    @mock.patch.object(Session, 'get')
+    def test_writes_invalidate(self, mock_get, mock_patch):
+        mock_get.return_value = make_response(
+            {'object': 'location', 'attributes': {'id': 1}})
+        mock_patch.return_value = make_response(
+            {'object': 'location', 'attributes': {'id': 1}})
+        self.api.locations.get_location_info(1)
+        self.api.locations.edit_location(1, shortcode='us')
+        self.api.locations.get_location_info(1)
+        self.assertEqual(2, mock_get.call_count)
+
+    @mock.patch.object(Session, 'post')
+    @mock.patch.object(Session, 'get')
+    def test_power_action_then_utilization(self, mock_get, mock_post):
+        api = PterodactylClient(url='https://dummy.com', api_key='dummy',
+                                cache=ResponseCache(policies={'client/*': 60}))
+        mock_get.side_effect = [
+            make_response({'object': 'stats', 'attributes': {
+                'current_state': state}}) for state in ('running', 'offline')]
+        mock_post.return_value = make_response(status_code=204)
+        self.assertEqual('running', api.client.servers.get_server_utilization(
+            'abc')['current_state'])
+        api.client.servers.send_power_action('abc', 'stop')
+        self.assertEqual('offline', api.client.servers.get_server_utilization(
+            'abc')['current_state'])
+        self.assertEqual(2, mock_get.call_count)
+
+    @mock.patch.object(Session, 'post')
+    @mock.patch.object(Session, 'get')
+    def test_write_drops_cached_server(self, mock_get, mock_post):
+        api = PterodactylClient(url='https://dummy.com', api_key='dummy',
+                                cache=ResponseCache(policies={'client/*': 60}))
+        mock_get.return_value = make_response(
+            {'object': 'server', 'attributes': {'identifier': 'abc'}})
+        mock_post.return_value = make_response(status_code=204)
+        api.client.servers.get_server('abc')
+        api.client.servers.get_server('abc')
+        api.client.servers.send_power_action('abc', 'stop')
+        api.client.servers.get_server('abc')
+        self.assertEqual(2, mock_get.call_count)
+
+    @mock.patch.object(Session, 'get')
+    def test_response_objects_are_not_cached(self, mock_get):
+        mock_get.return_value = make_response(EGG)
+        self.api.servers._api_request(endpoint='anything', json=False)
+        self.api.servers._api_request(endpoint='anything', json=False)
+        self.assertEqual(2, mock_get.call_count)
+
+
+class AsyncClientCacheTests(unittest.TestCase):
+
+    def test_etag_revalidation_against_stub_server(self):
+        async def run_test():
+            responses = [(200, {'ETag': '"v1"'}), (304, {}), (200, {}),
+                         (200, {})]
+            async with StubPanel(responses) as panel:
+                cache = ResponseCache(ttl=60, policies={
+                    'application/nodes/*': 0})
+                async with AsyncPterodactylClient(
+                        url=panel.url, api_key='dummy', cache=cache) as api:
+                    first = await api.nests.get_egg_info(1, 3)
+                    second = await api.nests.get_egg_info(1, 3)
+                    self.assertEqual(1, panel.hits)
+
+                    with mock.patch('time.monotonic',
+                                    return_value=10 ** 9):
+                        third = await api.nests.get_egg_info(1, 3)
+                    self.assertEqual(2, panel.hits)
+
+                    await api.nodes.get_node_config(1)
+                    await api.nodes.get_node_config(1)
+                    self.assertEqual(4, panel.hits)
+            self.assertEqual(first, second)
+            self.assertEqual(first, third)
+            self.assertEqual(1, cache.stats()['revalidations'])
+
+        asyncio.run(run_test())
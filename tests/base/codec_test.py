@@ -0,0 +1,66 @@
+import unittest
+from unittest import mock
+
+from requests import Session
+
+from pydactyl import PterodactylClient
+from pydactyl.api import base
+from pydactyl.api.codec import JSONCodec, STDLIB_CODEC, get_codec
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+class CodecTests(unittest.TestCase):
+
+    def test_default_is_fastest_installed(self):
+        self.assertEqual(get_codec('auto').name, get_codec().name)
+        self.assertIs(STDLIB_CODEC, get_codec('json'))
+
+    def test_custom_codec(self):
+        codec = JSONCodec('custom', mock.Mock(), mock.Mock())
+        self.assertIs(codec, get_codec(codec))
+
+    def test_unknown_codec_raises(self):
+        with self.assertRaisesRegex(ValueError, 'simplejson'):
+            get_codec('simplejson')
+
+    @unittest.skipIf(orjson is None, 'orjson is not installed')
+    def test_orjson_codec(self):
+        self.assertEqual('orjson', get_codec().name)
+        codec = get_codec('orjson')
+        self.assertEqual({'a': [1]}, codec.loads(b'{"a": [1]}'))
+        self.assertEqual('{"a":[1]}', codec.dumps({'a': [1]}))
+
+    def test_auto_falls_back_to_stdlib(self):
+        with mock.patch.dict('sys.modules', {'orjson': None, 'ujson': None}):
+            self.assertIs(STDLIB_CODEC, get_codec())
+            self.assertIs(STDLIB_CODEC, get_codec('auto'))
+            with self.assertRaises(ImportError):
+                get_codec('orjson')
+
+    @mock.patch.object(Session, 'get')
+    def test_api_request_decodes_with_codec(self, mock_get):
+        loads = mock.Mock(return_value={'object': 'server'})
+        api = base.PterodactylAPI(url='https://dummy.com', api_key='key',
+                                  json_codec=JSONCodec('test', loads, None))
+        mock_get.return_value.status_code = 200
+        mock_get.return_value.content = b'{"object": "server"}'
+
+        self.assertEqual({'object': 'server'},
+                         api._api_request(endpoint='test'))
+        loads.assert_called_once_with(b'{"object": "server"}')
+        mock_get.return_value.json.assert_not_called()
+
+    def test_client_shares_codec(self):
+        codec = JSONCodec('test', mock.Mock(), mock.Mock())
+        client = PterodactylClient(url='https://dummy.com', api_key='key',
+                                   json_codec=codec)
+        self.assertIs(codec, client.servers._json_codec)
+        self.assertIs(codec, client.client.servers.files._json_codec)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,76 @@
+import requests
+
+
+def server(server_id, user, node, egg=1, updated='2024-01-01', **kwargs):
+    attributes = {'id': server_id, 'uuid': 'uuid-{}'.format(server_id),
+                  'identifier': 'ident{}'.format(server_id),
+                  'external_id': kwargs.pop('external_id', None),
+                  'user': user, 'node': node, 'egg': egg, 'nest': 1,
+                  'updated_at': updated}
+    attributes.update(kwargs)
+    return attributes
+
+
+def users(count):
+    return [{'id': i, 'username': 'user{}'.format(i),
+             'external_id': 'ext-{}'.format(i) if i % 2 else None}
+            for i in range(1, count + 1)]
+
+
+def allocations():
+    ports = [(1, '10.0.0.2', 25565, False), (2, '10.0.0.1', 25567, False),
+             (3, '10.0.0.1', 25565, True), (4, '10.0.0.1', 25566, False),
+             (5, '10.0.0.1', 30000, False)]
+    return [{'object': 'allocation',
+             'attributes': {'id': i, 'ip': ip, 'port': port,
+                            'assigned': assigned}}
+            for i, ip, port, assigned in ports]
+
+
+class FakeListing(object):
+    """Serves pages of records like the panel, honouring sort and page."""
+
+    def __init__(self, records):
+        self.records = records
+        self.pages = 0
+        self.writes = []
+
+    def __call__(self, endpoint, params=None, includes=None, mode='GET',
+                 **kwargs):
+        if mode != 'GET':
+            self.writes.append((mode, endpoint))
+            return None
+        self.pages += 1
+        params = params or {}
+        per_page = params.get('per_page', 50)
+        page = params.get('page', 1)
+        records = sorted(self.records, key=lambda r: r['id'],
+                         reverse=params.get('sort') == '-id')
+        data = records[(page - 1) * per_page:page * per_page]
+        more = page * per_page < len(records)
+        return {'object': 'list',
+                'data': [{'object': 'x', 'attributes': r} for r in data],
+                'meta': {'pagination': {
+                    'total': len(records), 'current_page': page,
+                    'total_pages': max(1, -(-len(records) // per_page)),
+                    'links': {'next': 'next' if more else ''}}}}
+
+
+class FakeExternalPanel(FakeListing):
+    """Serves listings and external_id lookups."""
+
+    def __init__(self, records):
+        super().__init__(records)
+        self.lookups = []
+
+    def __call__(self, endpoint, params=None, includes=None, mode='GET',
+                 **kwargs):
+        if '/external/' not in endpoint:
+            return super().__call__(endpoint, params, includes, mode,
+                                    **kwargs)
+        self.lookups.append(endpoint)
+        external_id = endpoint.rsplit('/', 1)[1]
+        for record in self.records:
+            if record['external_id'] == external_id:
+                return {'object': 'x', 'attributes': record}
+        raise requests.HTTPError('404 Client Error: Not Found')
@@ -0,0 +1,120 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from pydactyl import PterodactylClient
+from pydactyl.api.inventory import Inventory
+from pydactyl.api.inventory_store import SQLiteInventoryStore
+from tests.base.fake_panel import FakeListing, server
+
+
+class SQLiteInventoryStoreTests(unittest.TestCase):
+
+    def setUp(self):
+        self.store = SQLiteInventoryStore(':memory:')
+        self.addCleanup(self.store.close)
+
+    def test_save_and_query(self):
+        self.store.save('servers', [server(1, user=5, node=2),
+                                    server(2, user=6, node=2)], synced=100.0)
+        self.assertEqual(100.0, self.store.synced_at('servers'))
+        self.assertIsNone(self.store.synced_at('users'))
+        self.assertEqual(server(1, user=5, node=2),
+                         self.store.get('servers', 1))
+        self.assertIsNone(self.store.get('servers', 3))
+        self.assertEqual([1, 2], [s['id'] for s in
+                                  self.store.list('servers', node=2)])
+        self.assertEqual([2], [s['id'] for s in
+                               self.store.list('servers', user=6)])
+        self.assertEqual([1, 2], [s['id'] for s in self.store.list(
+            'servers', external_id=None)])
+        with self.assertRaises(ValueError):
+            self.store.list('servers', **{'user) OR (1': 1})
+
+    def test_apply_changes(self):
+        self.store.save('servers', [server(1, user=5, node=2),
+                                    server(2, user=6, node=2)], synced=100.0)
+        self.store.apply('servers', [server(2, user=7, node=2),
+                                     server(3, user=7, node=2)],
+                         removed=[1], synced=200.0)
+        self.assertEqual([2, 3], [s['id'] for s in
+                                  self.store.list('servers', user=7)])
+        self.assertIsNone(self.store.get('servers', 1))
+        self.assertEqual(200.0, self.store.synced_at('servers'))
+
+    def test_allocations_per_node(self):
+        self.store.save('allocations', [{'id': 1, 'port': 25565,
+                                         'assigned': False}],
+                        synced=1.0, parent=4)
+        self.store.save('allocations', [{'id': 2, 'port': 25566,
+                                         'assigned': True}],
+                        synced=2.0, parent=5)
+        self.assertEqual([4, 5], self.store.parents('allocations'))
+        self.assertEqual([2], [a['id'] for a in self.store.list(
+            'allocations', parent=5, assigned=True)])
+        self.assertEqual([], self.store.list('allocations', parent=4,
+                                             assigned=True))
+
+
+class PersistentInventoryTests(unittest.TestCase):
+
+    def setUp(self):
+        fd, self.path = tempfile.mkstemp(suffix='.sqlite3')
+        os.close(fd)
+        self.addCleanup(os.remove, self.path)
+        self.servers = FakeListing([server(1, user=5, node=2),
+                                    server(2, user=5, node=3)])
+        self.allocations = FakeListing([
+            {'id': 10, 'ip': '10.0.0.1', 'port': 25565, 'assigned': True},
+            {'id': 11, 'ip': '10.0.0.1', 'port': 25566, 'assigned': False},
+        ])
+
+    def inventory(self):
+        api = PterodactylClient(url='dummy', api_key='dummy')
+        api.servers._api_request = mock.Mock(side_effect=self.servers)
+        api.nodes._api_request = mock.Mock(side_effect=self.allocations)
+        store = SQLiteInventoryStore(self.path)
+        self.addCleanup(store.close)
+        return Inventory(api, resources=('servers',), store=store)
+
+    def test_cold_start_from_snapshot(self):
+        inventory = self.inventory()
+        inventory.refresh()
+        inventory.refresh_node_allocations([7])
+
+        self.servers.records.append(server(3, user=5, node=2))
+        self.servers.pages = 0
+        restarted = self.inventory()
+        self.assertEqual(2, len(restarted))
+        self.assertEqual(inventory.synced['servers'],
+                         restarted.synced['servers'])
+        self.assertEqual({10, 11}, set(restarted.allocations[7]))
+        self.assertEqual(0, self.servers.pages)
+
+        changes = restarted.refresh(full=False)
+        self.assertEqual([3], changes['servers']['added'])
+        self.assertEqual(1, self.servers.pages)
+        self.assertEqual([1, 3], [s['id'] for s in restarted.find(
+            'servers', node=2)])
+
+        self.servers.records.pop(0)
+        restarted.refresh()
+        self.assertEqual([2, 3], sorted(self.inventory().records['servers']))
+
+    def test_allocation_changes_are_persisted(self):
+        inventory = self.inventory()
+        self.assertEqual({7: {'added': [10, 11], 'updated': [],
+                              'removed': []}},
+                         inventory.refresh_node_allocations([7]))
+        self.allocations.records = [
+            {'id': 11, 'ip': '10.0.0.1', 'port': 25566, 'assigned': True}]
+        self.assertEqual({7: {'added': [], 'updated': [11],
+                              'removed': [10]}},
+                         inventory.refresh_node_allocations([7]))
+        self.assertEqual({11: self.allocations.records[0]},
+                         self.inventory().allocations[7])
+
+
+if __name__ == '__main__':
+    unittest.main()
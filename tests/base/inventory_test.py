@@ -0,0 +1,117 @@
+import asyncio
+import unittest
+from unittest import mock
+
+from pydactyl import AsyncPterodactylClient, PterodactylClient
+from pydactyl.api.inventory import Inventory
+from tests.base.fake_panel import FakeListing, server
+
+
+class InventoryTests(unittest.TestCase):
+
+    def setUp(self):
+        self.api = PterodactylClient(url='dummy', api_key='dummy')
+        self.servers = FakeListing([
+            server(1, user=5, node=2, external_id='whmcs-1'),
+            server(2, user=5, node=3),
+            server(3, user=6, node=2, egg=4),
+        ])
+        self.users = FakeListing([
+            {'id': 5, 'uuid': 'u5', 'username': 'alice', 'email': 'a@x',
+             'external_id': None, 'updated_at': '2024-01-01'},
+            {'id': 6, 'uuid': 'u6', 'username': 'bob', 'email': 'b@x',
+             'external_id': 'ext-6', 'updated_at': '2024-01-01'},
+        ])
+        self.api.servers._api_request = mock.Mock(side_effect=self.servers)
+        self.api.user._api_request = mock.Mock(side_effect=self.users)
+        self.inventory = Inventory(self.api, resources=('servers', 'users'),
+                                   per_page=2)
+
+    def test_refresh_and_lookups(self):
+        changes = self.inventory.refresh()
+        self.assertEqual([1, 2, 3], changes['servers']['added'])
+        self.assertEqual(5, len(self.inventory))
+        self.assertIn('servers', self.inventory.synced)
+
+        self.assertEqual(3, self.inventory.get('servers', 3)['id'])
+        self.assertEqual(3, self.inventory.get('servers', 'uuid-3',
+                                               'uuid')['id'])
+        self.assertEqual(1, self.inventory.get('servers', 'whmcs-1',
+                                               'external_id')['id'])
+        self.assertEqual(2, self.inventory.get('servers', 'ident2',
+                                               'identifier')['id'])
+        self.assertEqual('bob', self.inventory.get('users', 'ext-6',
+                                                   'external_id')['username'])
+        self.assertEqual([1], [s['id'] for s in self.inventory.find(
+            'servers', user=5, node=2)])
+        self.assertEqual([1, 3], [s['id'] for s in self.inventory.find(
+            'servers', node=2)])
+        self.assertEqual([3], [s['id'] for s in self.inventory.find(
+            'servers', egg=4)])
+        self.assertEqual([], self.inventory.find('servers', user=7))
+        self.assertIsNone(self.inventory.get('servers', 99))
+        with self.assertRaises(KeyError):
+            self.inventory.find('servers', memory=1024)
+
+    def test_full_refresh_diffs(self):
+        self.inventory.refresh()
+        self.servers.records = [
+            server(1, user=6, node=2, updated='2024-02-01'),
+            server(3, user=6, node=2, egg=4),
+            server(4, user=5, node=3),
+        ]
+        changes = self.inventory.refresh(resources=['servers'])
+        self.assertEqual({'added': [4], 'updated': [1], 'removed': [2]},
+                         changes['servers'])
+        self.assertEqual([1, 3], [s['id'] for s in self.inventory.find(
+            'servers', user=6)])
+        self.assertEqual([4], [s['id'] for s in self.inventory.find(
+            'servers', user=5)])
+        self.assertIsNone(self.inventory.get('servers', 'whmcs-1',
+                                             'external_id'))
+        self.assertIsNone(self.inventory.get('servers', 'uuid-2', 'uuid'))
+
+    def test_incremental_refresh_reads_new_records(self):
+        self.inventory.refresh()
+        self.servers.records += [server(i, user=7, node=2)
+                                 for i in range(4, 7)]
+        self.servers.pages = 0
+        changes = self.inventory.refresh(resources=['servers'], full=False)
+        self.assertEqual({'added': [6, 5, 4], 'updated': [], 'removed': []},
+                         changes['servers'])
+        # Newest first, stopping on page two at the first known server.
+        self.assertEqual(2, self.servers.pages)
+        self.assertEqual('-id',
+                         self.api.servers._api_request.call_args[1][
+                             'params']['sort'])
+        self.assertEqual(3, len(self.inventory.find('servers', user=7)))
+
+    def test_load_snapshot(self):
+        self.inventory.load('servers', [server(8, user=1, node=1)],
+                            synced=123.0)
+        self.assertEqual(8, self.inventory.get('servers', 'ident8',
+                                               'identifier')['id'])
+        self.assertEqual(123.0, self.inventory.synced['servers'])
+
+    def test_unknown_resource(self):
+        with self.assertRaises(ValueError):
+            Inventory(self.api, resources=('eggs',))
+
+    def test_refresh_async(self):
+        async def run_test():
+            api = AsyncPterodactylClient(url='dummy', api_key='dummy')
+            api.servers._api_request = mock.AsyncMock(side_effect=self.servers)
+            inventory = Inventory(api, resources=('servers',), per_page=2)
+            changes = await inventory.refresh_async()
+            self.assertEqual([1, 2, 3], changes['servers']['added'])
+            self.servers.records.append(server(4, user=5, node=2))
+            changes = await inventory.refresh_async(full=False)
+            self.assertEqual([4], changes['servers']['added'])
+            self.assertEqual([1, 4], [s['id'] for s in inventory.find(
+                'servers', user=5, node=2)])
+
+        asyncio.run(run_test())
+
+
+if __name__ == '__main__':
+    unittest.main()
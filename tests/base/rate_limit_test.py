@@ -0,0 +1,147 @@
+import asyncio
+import unittest
+from unittest import mock
+
+from requests import Session
+
+from pydactyl import AsyncPterodactylClient, PterodactylClient
+from pydactyl.api.rate_limit import RateLimiter
+
+
+class FakeClock(object):
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+    async def async_sleep(self, seconds):
+        self.now += seconds
+
+
+class RateLimiterTests(unittest.TestCase):
+
+    def setUp(self):
+        self.clock = FakeClock()
+        patches = [
+            mock.patch('time.monotonic', self.clock.monotonic),
+            mock.patch('time.sleep', self.clock.sleep),
+            mock.patch('asyncio.sleep', self.clock.async_sleep),
+        ]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+
+    def test_allows_burst_up_to_limit(self):
+        limiter = RateLimiter(limit=10, period=60)
+        for _ in range(10):
+            self.assertEqual(0, limiter.acquire())
+        self.assertEqual(6, limiter.acquire())
+
+    def test_waiting_callers_queue_in_order(self):
+        limiter = RateLimiter(limit=60, period=60)
+        limiter.update({'X-RateLimit-Remaining': '0'})
+        self.assertEqual([1, 2, 3], [limiter._reserve() for _ in range(3)])
+
+    def test_refills_over_time(self):
+        limiter = RateLimiter(limit=60, period=60)
+        for _ in range(60):
+            limiter.acquire()
+        self.clock.now += 30
+        self.assertEqual(30, limiter.available)
+
+    def test_sustained_rate_matches_limit(self):
+        limiter = RateLimiter(limit=240, period=60)
+        start = self.clock.now
+        for _ in range(240 + 480):
+            limiter.acquire()
+        self.assertAlmostEqual(120, self.clock.now - start)
+
+    def test_learns_from_headers(self):
+        limiter = RateLimiter(limit=240, period=60)
+        limiter.update({'X-RateLimit-Limit': '60',
+                        'X-RateLimit-Remaining': '2'})
+        self.assertEqual(60, limiter.limit)
+        self.assertEqual(2, limiter.available)
+        limiter.acquire()
+        limiter.acquire()
+        self.assertEqual(1, limiter.acquire())
+
+    def test_retry_after_pauses_bucket(self):
+        limiter = RateLimiter(limit=60, period=60)
+        limiter.update({'Retry-After': '5', 'X-RateLimit-Remaining': '0'})
+        self.assertEqual(6, limiter.acquire())
+
+    def test_ignores_invalid_headers(self):
+        limiter = RateLimiter(limit=60, period=60)
+        limiter.update({'X-RateLimit-Limit': 'lots', 'Retry-After': None})
+        limiter.update(mock.MagicMock())
+        self.assertEqual(60, limiter.limit)
+        self.assertEqual(60, limiter.available)
+
+    def test_acquire_async(self):
+        limiter = RateLimiter(limit=2, period=60)
+
+        async def run_test():
+            return [await limiter.acquire_async() for _ in range(3)]
+
+        self.assertEqual([0, 0, 30], asyncio.run(run_test()))
+
+
+class ClientRateLimitTests(unittest.TestCase):
+
+    def test_rate_limit_disabled_by_default(self):
+        api = PterodactylClient(url='dummy', api_key='dummy')
+        self.assertIsNone(api.servers._rate_limiter)
+
+    def test_sub_apis_share_limiter(self):
+        api = PterodactylClient(url='dummy', api_key='dummy', rate_limit=240)
+        limiter = api._rate_limiter
+        self.assertEqual(240, limiter.limit)
+        for sub_api in (api.servers, api.nodes, api.client,
+                        api.client.servers, api.client.servers.files,
+                        api.client.account):
+            self.assertIs(limiter, sub_api._rate_limiter)
+
+        async_api = AsyncPterodactylClient(url='dummy', api_key='dummy',
+                                           rate_limit=limiter)
+        self.assertIs(limiter, async_api.client.servers.files._rate_limiter)
+
+    @mock.patch.object(Session, 'get')
+    def test_requests_update_limiter(self, mock_get):
+        mock_get.return_value.headers = {'X-RateLimit-Limit': '120',
+                                         'X-RateLimit-Remaining': '0'}
+        mock_get.return_value.status_code = 200
+        api = PterodactylClient(url='dummy', api_key='dummy', rate_limit=240)
+        with mock.patch('time.sleep') as mock_sleep:
+            api.nodes.get_node_config(1)
+            mock_sleep.assert_not_called()
+            api.locations.get_location_info(1)
+            mock_sleep.assert_called_once()
+        self.assertEqual(120, api._rate_limiter.limit)
+
+    def test_async_requests_use_limiter(self):
+        async def run_test():
+            limiter = RateLimiter(limit=240)
+            limiter.acquire_async = mock.AsyncMock()
+            limiter.update = mock.Mock()
+            api = AsyncPterodactylClient(url='https://dummy.com',
+                                         api_key='dummy', rate_limit=limiter)
+            with mock.patch('aiohttp.ClientSession.get') as mock_get:
+                response = mock.Mock()
+                response.json = mock.AsyncMock(return_value={})
+                response.status = 200
+                response.headers = {'X-RateLimit-Remaining': '10'}
+                mock_get.return_value.__aenter__.return_value = response
+                async with api:
+                    await api.nodes.get_node_config(1)
+                    await api.client.servers.files.list_files('abc')
+            self.assertEqual(2, limiter.acquire_async.await_count)
+            limiter.update.assert_called_with(
+                {'X-RateLimit-Remaining': '10'})
+
+        asyncio.run(run_test())
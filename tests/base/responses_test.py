@@ -1,9 +1,11 @@
+import threading
+import time
 import unittest
 from copy import deepcopy
 from unittest import mock
 
 from pydactyl import PterodactylClient
-from pydactyl.responses import PaginatedResponse
+from pydactyl.responses import BulkResponse, PaginatedResponse
 
 TEST_META = {
     'pagination':
@@ -126,3 +128,167 @@ class PaginatedResponseTests(unittest.TestCase):
         response = PaginatedResponse(self.client, 'anyendpoint', TEST_DATA)
 
         self.assertEqual(106, len(response))
+
+    def test_paginated_response_parallel_collect_keeps_order(self):
+        lock = threading.Lock()
+        in_flight = []
+        peak = []
+
+        def api_request(endpoint, params):
+            with lock:
+                in_flight.append(params['page'])
+                peak.append(len(in_flight))
+            # Later pages return first to check the results are reordered.
+            time.sleep(0.01 * (6 - params['page']))
+            with lock:
+                in_flight.remove(params['page'])
+            return MULTIPAGE_TEST_DATA[params['page'] - 1]
+
+        self.client._api_request = mock.MagicMock(side_effect=api_request)
+        response = PaginatedResponse(self.client, 'asdf',
+                                     MULTIPAGE_TEST_DATA[0])
+        self.assertListEqual(
+            [item for data in MULTIPAGE_TEST_DATA for item in data['data']],
+            response.collect(concurrency=2))
+        self.assertEqual(4, self.client._api_request.call_count)
+        self.assertEqual(2, max(peak))
+
+    def test_paginated_response_parallel_collect_without_page_count(self):
+        meta = {'pagination': {'total': 5, 'links': {'next': ''}}}
+        self.client._api_request = mock.MagicMock()
+        response = PaginatedResponse(self.client, 'asdf',
+                                     {'data': ['a', 'b'], 'meta': meta})
+        self.assertListEqual(['a', 'b'], response.collect(concurrency=4))
+        self.client._api_request.assert_not_called()
+
+    def test_paginated_response_reuses_original_query(self):
+        pages = []
+        for number in range(1, 4):
+            meta = deepcopy(TEST_META)
+            meta['pagination'].update(
+                {'per_page': 2, 'current_page': number, 'total_pages': 3})
+            if number == 3:
+                meta['pagination']['links'] = {}
+            pages.append({'data': [number * 2 - 1, number * 2], 'meta': meta})
+
+        self.client._api_request = mock.MagicMock(side_effect=pages[1:])
+        params = {'per_page': 2, 'filter[name]': 'mc'}
+        response = PaginatedResponse(self.client, 'asdf', pages[0],
+                                     params=params, includes=('allocations',))
+
+        self.assertEqual([1, 2, 3, 4, 5, 6], response.collect())
+        self.assertEqual(2, self.client._api_request.call_count)
+        self.client._api_request.assert_called_with(
+            endpoint='asdf', includes=('allocations',),
+            params={'per_page': 2, 'filter[name]': 'mc', 'page': 3})
+        self.assertEqual({'per_page': 2, 'filter[name]': 'mc'}, params)
+
+    @mock.patch('pydactyl.api.base.PterodactylAPI._api_request')
+    def test_list_servers_pages_keep_includes_and_per_page(self, mock_api):
+        pages = []
+        for number in range(1, 4):
+            meta = deepcopy(TEST_META)
+            meta['pagination'].update(
+                {'per_page': 50, 'current_page': number, 'total_pages': 3})
+            if number == 3:
+                meta['pagination']['links'] = {}
+            pages.append({'object': 'list', 'meta': meta,
+                          'data': [{'page': number}] * 50})
+        mock_api.side_effect = pages
+
+        servers = self.client.servers.list_servers(
+            includes=('allocations',), params={'per_page': 50})
+        collected = servers.collect(concurrency=2)
+
+        self.assertEqual(150, len(collected))
+        self.assertEqual(3, mock_api.call_count)
+        for call in mock_api.call_args_list:
+            self.assertEqual(('allocations',), call.kwargs['includes'])
+            self.assertEqual(50, call.kwargs['params']['per_page'])
+
+    def _attribute_pages(self, count, per_page=2):
+        pages = []
+        for number in range(1, count + 1):
+            meta = deepcopy(TEST_META)
+            meta['pagination'].update({'current_page': number,
+                                       'total_pages': count})
+            if number == count:
+                meta['pagination']['links'] = {}
+            pages.append({'meta': meta, 'data': [
+                {'object': 'server', 'attributes': {'id': i}}
+                for i in range((number - 1) * per_page + 1,
+                               number * per_page + 1)]})
+        return pages
+
+    def test_paginated_response_iter_items_streams_pages(self):
+        pages = self._attribute_pages(3)
+        self.client._api_request = mock.MagicMock(side_effect=pages[1:])
+        response = PaginatedResponse(self.client, 'asdf', pages[0])
+
+        items = response.iter_items()
+        self.assertEqual([{'id': 1}, {'id': 2}],
+                         [next(items), next(items)])
+        self.client._api_request.assert_not_called()
+        self.assertEqual({'id': 3}, next(items))
+        self.assertEqual(1, self.client._api_request.call_count)
+        self.assertEqual([4, 5, 6], [item['id'] for item in items])
+        self.client._api_request.assert_called_with(endpoint='asdf',
+                                                    params={'page': 3})
+        self.assertEqual(pages[0]['data'], response.data)
+
+    def test_paginated_response_iter_items_prefetches_next_page(self):
+        pages = self._attribute_pages(3)
+        self.client._api_request = mock.MagicMock(side_effect=pages[1:])
+        response = PaginatedResponse(self.client, 'asdf', pages[0])
+
+        items = response.iter_items(prefetch=True)
+        self.assertEqual({'id': 1}, next(items))
+        for _ in range(100):
+            if self.client._api_request.called:
+                break
+            time.sleep(0.01)
+        self.client._api_request.assert_called_once_with(
+            endpoint='asdf', params={'page': 2})
+        self.assertEqual([2, 3, 4, 5, 6], [item['id'] for item in items])
+        self.assertEqual(2, self.client._api_request.call_count)
+
+
+class BulkResponseTests(unittest.TestCase):
+
+    def test_bulk_response(self):
+        bulk = BulkResponse(elapsed=1.5)
+        self.assertTrue(bulk.ok)
+        bulk.raise_for_errors()
+
+        bulk.results['a'] = 1
+        bulk.errors['b'] = ValueError('b failed')
+        self.assertEqual(2, len(bulk))
+        self.assertFalse(bulk.ok)
+        self.assertEqual('<BulkResponse succeeded=1 failed=1 elapsed=1.500s>',
+                         repr(bulk))
+        with self.assertRaisesRegex(ValueError, 'b failed'):
+            bulk.raise_for_errors()
+
+    def test_bulk_response_stats(self):
+        bulk = BulkResponse.from_outcomes(
+            [(i, i / 10, i != 3, i) for i in range(1, 21)], elapsed=2.5)
+        self.assertEqual(list(range(1, 21)), sorted(
+            list(bulk.results) + list(bulk.errors)))
+        self.assertEqual([3], list(bulk.errors))
+        stats = bulk.stats()
+        self.assertEqual(20, stats['total'])
+        self.assertEqual(19, stats['succeeded'])
+        self.assertEqual(1, stats['failed'])
+        self.assertEqual(2.5, stats['elapsed'])
+        self.assertAlmostEqual(1.05, stats['mean'])
+        self.assertEqual(2.0, stats['p95'])
+        self.assertEqual(2.0, stats['max'])
+        self.assertEqual(0.0, BulkResponse().stats()['max'])
+
+    def test_bulk_response_reorder(self):
+        bulk = BulkResponse.from_outcomes(
+            [('c', 0, True, 3), ('x', 0, True, 0), ('a', 0, False, None),
+             ('b', 0, True, 2)], elapsed=0)
+        bulk.reorder(['a', 'b', 'c', 'b'])
+        self.assertEqual(['b', 'c', 'x'], list(bulk.results))
+        self.assertEqual(['a', 'b', 'c', 'x'], list(bulk.durations))
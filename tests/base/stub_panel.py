@@ -0,0 +1,32 @@
+from aiohttp import web
+
+
+class StubPanel(object):
+    """Local aiohttp server replaying a scripted list of responses."""
+
+    def __init__(self, responses):
+        self.responses = list(responses)
+        self.hits = 0
+        self._runner = None
+        self.url = None
+
+    async def handler(self, request):
+        status, headers = self.responses[min(self.hits,
+                                             len(self.responses) - 1)]
+        self.hits += 1
+        return web.json_response({'object': 'server', 'attributes': {}},
+                                 status=status, headers=headers)
+
+    async def __aenter__(self):
+        app = web.Application()
+        app.router.add_route('*', '/{tail:.*}', self.handler)
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, '127.0.0.1', 0)
+        await site.start()
+        port = self._runner.addresses[0][1]
+        self.url = 'http://127.0.0.1:{}'.format(port)
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self._runner.cleanup()
@@ -6,7 +6,9 @@ from pydactyl.async_api_client import AsyncPterodactylClient
 class AsyncFilesTests(unittest.TestCase):
 
     def setUp(self):
-        self.api = AsyncPterodactylClient(url='https://dummy.com', api_key='dummy')
+        # The mocked responses only implement json().
+        self.api = AsyncPterodactylClient(url='https://dummy.com',
+                                          api_key='dummy', json_codec='json')
 
     def test_list_files(self):
         async def run_test():
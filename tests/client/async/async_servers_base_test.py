@@ -1,13 +1,18 @@
 import asyncio
 import unittest
 from unittest import mock
+
+import aiohttp
 from pydactyl.api.client.servers.async_websocket_client import AsyncWebsocketClient
 from pydactyl.async_api_client import AsyncPterodactylClient
+from pydactyl.exceptions import PterodactylApiError
 
 class AsyncServersBaseTests(unittest.TestCase):
 
     def setUp(self):
-        self.api = AsyncPterodactylClient(url='https://dummy.com', api_key='dummy')
+        # The mocked responses only implement json().
+        self.api = AsyncPterodactylClient(url='https://dummy.com',
+                                          api_key='dummy', json_codec='json')
 
     def test_list_servers(self):
         async def run_test():
@@ -93,6 +98,58 @@ class AsyncServersBaseTests(unittest.TestCase):
 
         asyncio.run(run_test())
 
+    def test_send_power_action_many(self):
+        async def run_test():
+            starts = {}
+
+            async def api_request(endpoint, **kwargs):
+                starts[endpoint] = asyncio.get_running_loop().time()
+                if endpoint == 'client/servers/b/power':
+                    raise PterodactylApiError('server is suspended')
+                return 204
+
+            with mock.patch('pydactyl.api.async_base.AsyncPterodactylAPI.'
+                            '_api_request', side_effect=api_request):
+                bulk = await self.api.client.servers.send_power_action_many(
+                    ['a', 'b', 'c'], 'restart', concurrency=3, stagger=0.02)
+
+            self.assertEqual({'a': 204, 'c': 204}, bulk.results)
+            self.assertIsInstance(bulk.errors['b'], PterodactylApiError)
+            self.assertGreaterEqual(
+                starts['client/servers/c/power']
+                - starts['client/servers/a/power'], 0.035)
+            self.assertEqual(3, bulk.stats()['total'])
+
+        asyncio.run(run_test())
+
+    def test_broadcast_console_command(self):
+        async def run_test():
+            async def api_request(endpoint, **kwargs):
+                if endpoint == 'client/servers/stopped/command':
+                    raise aiohttp.ClientResponseError(
+                        mock.Mock(), (), status=412)
+                return 204
+
+            servers = self.api.client.servers
+            ws = mock.Mock(connected=True, state='running')
+            ws.send_command = mock.AsyncMock()
+            servers.websockets['ws'] = ws
+            servers.websockets['offline'] = mock.Mock(connected=True,
+                                                      state='offline')
+
+            with mock.patch('pydactyl.api.async_base.AsyncPterodactylAPI.'
+                            '_api_request', side_effect=api_request):
+                bulk = await servers.broadcast_console_command(
+                    ['ws', 'offline', 'http', 'stopped'], 'save-all')
+
+            self.assertEqual({'ws': 'websocket', 'offline': 'skipped',
+                              'http': 'http'}, bulk.results)
+            self.assertEqual(412, bulk.errors['stopped'].status)
+            ws.send_command.assert_awaited_once_with('save-all')
+            self.assertEqual('offline', servers.get_cached_state('stopped'))
+
+        asyncio.run(run_test())
+
     def test_get_websocket(self):
         async def run_test():
             with mock.patch('aiohttp.ClientSession.get') as mock_get:
@@ -0,0 +1,182 @@
+import asyncio
+import json
+import unittest
+from unittest import mock
+
+from pydactyl.api.client.servers.async_stats_collector import (
+    AsyncStatsCollector, StatsHistory, parse_stats)
+from pydactyl.api.client.servers.async_websocket_multiplexer import (
+    AsyncWebsocketMultiplexer)
+from pydactyl.async_api_client import AsyncPterodactylClient
+
+
+def stats_event(cpu, memory=0, rx=0, state='running'):
+    payload = {'memory_bytes': memory, 'memory_limit_bytes': 1024,
+               'cpu_absolute': cpu, 'network': {'rx_bytes': rx,
+                                                'tx_bytes': 0},
+               'state': state, 'disk_bytes': 10, 'uptime': 5}
+    return {'event': 'stats', 'args': [json.dumps(payload)]}
+
+
+class StatsHistoryTests(unittest.TestCase):
+
+    def test_parse_stats(self):
+        state, values = parse_stats(stats_event(12.5, memory=300, rx=7))
+        self.assertEqual('running', state)
+        self.assertEqual((12.5, 300.0, 1024.0, 10.0, 7.0, 0.0, 5.0), values)
+
+    def test_ring_buffer(self):
+        history = StatsHistory(size=3)
+        for i in range(5):
+            history.append((i, 0, 0, 0, 0, 0, 0), timestamp=i)
+        self.assertEqual(3, len(history))
+        self.assertEqual([2.0, 3.0, 4.0], history.values('cpu_absolute'))
+        self.assertEqual([3.0, 4.0], history.values('cpu_absolute', 2))
+        self.assertEqual([2.0, 3.0, 4.0], history.timestamps())
+        self.assertEqual(4.0, history.latest()['cpu_absolute'])
+        self.assertEqual(3.0, history.average('cpu_absolute'))
+        self.assertEqual(4.0, history.percentile('cpu_absolute', 95))
+        self.assertEqual(2.0, history.percentile('cpu_absolute', 0))
+
+    def test_empty(self):
+        history = StatsHistory()
+        self.assertIsNone(history.latest())
+        self.assertIsNone(history.average('cpu_absolute'))
+        self.assertIsNone(history.rate('rx_bytes'))
+        self.assertEqual({'samples': 0, 'state': None}, history.summary())
+
+    def test_rate_ignores_counter_reset(self):
+        history = StatsHistory()
+        for t, rx in enumerate([100, 200, 300, 50, 150]):
+            history.append((0, 0, 0, 0, rx, 0, 0), timestamp=t)
+        # 100 + 100 + 0 + 100 bytes over 4 seconds.
+        self.assertEqual(75.0, history.rate('rx_bytes'))
+
+    def test_summary(self):
+        history = StatsHistory(size=10)
+        for t in range(20):
+            history.append((t, 0, 0, 0, t * 10, 0, 0), 'running', t)
+        summary = history.summary()
+        self.assertEqual(10, summary['samples'])
+        self.assertEqual('running', summary['state'])
+        self.assertEqual({'latest': 19.0, 'mean': 14.5, 'p95': 19.0,
+                          'max': 19.0}, summary['cpu_absolute'])
+        self.assertEqual(10.0, summary['rx_bytes']['rate'])
+        self.assertEqual(5, history.summary(window=5)['samples'])
+
+    def test_invalid_size(self):
+        with self.assertRaises(ValueError):
+            StatsHistory(size=0)
+
+
+class AsyncStatsCollectorTests(unittest.TestCase):
+
+    def setUp(self):
+        self.servers = mock.Mock(spec=['get_websocket_multiplexer'])
+
+    def test_record(self):
+        collector = AsyncStatsCollector(self.servers, size=2)
+        self.assertIsNone(collector.record('a', {'event': 'status',
+                                                 'args': ['running']}))
+        with self.assertLogs(
+                'pydactyl.api.client.servers.async_stats_collector'):
+            self.assertIsNone(collector.record(
+                'a', {'event': 'stats', 'args': ['not json']}))
+        for cpu in (1, 2, 3):
+            collector.record('a', stats_event(cpu))
+        self.assertEqual([2.0, 3.0],
+                         collector.history['a'].values('cpu_absolute'))
+        self.assertEqual(['a'], list(collector.summary()))
+
+    def test_collect_client(self):
+        async def run_test():
+            client = mock.Mock()
+            client.request_stats = mock.AsyncMock()
+
+            async def listen(events=()):
+                self.assertEqual(('stats',), events)
+                for cpu in (10, 20):
+                    yield stats_event(cpu)
+
+            client.listen = listen
+            collector = AsyncStatsCollector(self.servers)
+            await collector.collect(client, 'a')
+            client.request_stats.assert_awaited_once()
+            self.assertEqual(15.0,
+                             collector.history['a'].average('cpu_absolute'))
+
+        asyncio.run(run_test())
+
+    def test_collects_from_multiplexer(self):
+        async def run_test():
+            mux = mock.Mock()
+            mux.start = mock.AsyncMock()
+            mux.close = mock.AsyncMock()
+
+            async def listen():
+                yield 'a', stats_event(1)
+                yield 'b', stats_event(2, state='starting')
+                yield 'a', stats_event(3)
+
+            mux.listen = listen
+            self.servers.get_websocket_multiplexer.return_value = mux
+
+            collector = AsyncStatsCollector(self.servers, ['a', 'b'],
+                                            max_queue=10)
+            async with collector:
+                await collector._task
+            self.servers.get_websocket_multiplexer.assert_called_once_with(
+                ['a', 'b'], events=('stats',), max_queue=10,
+                request_stats=True, reconnect=True)
+            mux.close.assert_awaited_once()
+            self.assertEqual([1.0, 3.0],
+                             collector.history['a'].values('cpu_absolute'))
+            self.assertEqual('starting', collector.history['b'].state)
+
+        asyncio.run(run_test())
+
+    def test_add_after_starting_empty(self):
+        async def run_test():
+            class Client:
+                async def connect(self):
+                    pass
+
+                async def close(self):
+                    pass
+
+                async def request_stats(self):
+                    pass
+
+                async def listen(self, events=(), exclude_events=()):
+                    for cpu in (1, 2):
+                        await asyncio.sleep(0)
+                        yield stats_event(cpu)
+
+            servers = mock.Mock(spec=['get_websocket_client',
+                                      'get_websocket_multiplexer'])
+            servers.get_websocket_client = mock.AsyncMock(
+                side_effect=lambda server_id, **kwargs: Client())
+            servers.get_websocket_multiplexer.side_effect = (
+                lambda server_ids, **kwargs: AsyncWebsocketMultiplexer(
+                    servers, server_ids, **kwargs))
+
+            async with AsyncStatsCollector(servers) as collector:
+                await asyncio.sleep(0.01)
+                for server_id in ('a', 'b'):
+                    collector.add(server_id)
+                    await collector._task
+                    self.assertEqual([1.0, 2.0], collector.history[
+                        server_id].values('cpu_absolute'))
+
+        asyncio.run(asyncio.wait_for(run_test(), 5))
+
+    def test_servers_api_helper(self):
+        api = AsyncPterodactylClient(url='https://dummy.com', api_key='dummy')
+        collector = api.client.servers.get_stats_collector(['a'], size=60)
+        self.assertIsInstance(collector, AsyncStatsCollector)
+        self.assertIs(api.client.servers, collector._servers)
+        self.assertEqual(60, collector._size)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,127 @@
+import asyncio
+import unittest
+from unittest import mock
+
+import aiohttp
+from pydactyl.api.client.servers.async_utilization_poller import (
+    AsyncUtilizationPoller, utilization_changed)
+from pydactyl.async_api_client import AsyncPterodactylClient
+
+
+def utilization(state='running', cpu=10.0, memory=100 * 1024 * 1024):
+    return {'current_state': state, 'is_suspended': False,
+            'resources': {'cpu_absolute': cpu, 'memory_bytes': memory,
+                          'disk_bytes': 0, 'network_rx_bytes': 5,
+                          'uptime': 1000}}
+
+
+def too_many_requests():
+    return aiohttp.ClientResponseError(mock.Mock(), (), status=429)
+
+
+class UtilizationChangedTests(unittest.TestCase):
+
+    def test_changes(self):
+        old = utilization()
+        self.assertTrue(utilization_changed(None, old))
+        self.assertFalse(utilization_changed(old, utilization(cpu=10.5)))
+        self.assertTrue(utilization_changed(old, utilization(cpu=12)))
+        self.assertTrue(utilization_changed(old, utilization('stopping')))
+        self.assertTrue(utilization_changed(
+            old, utilization(memory=200 * 1024 * 1024)))
+        self.assertFalse(utilization_changed(
+            old, utilization(cpu=50), tolerances={'memory_bytes': 1}))
+
+
+class AsyncUtilizationPollerTests(unittest.TestCase):
+
+    def setUp(self):
+        self.api = AsyncPterodactylClient(url='https://dummy.com',
+                                          api_key='dummy')
+        self.servers = self.api.client.servers
+        self.responses = {'a': utilization(), 'b': utilization('offline', 0)}
+
+        async def get_server_utilization(server_id):
+            response = self.responses[server_id]
+            if isinstance(response, Exception):
+                raise response
+            return response
+
+        self.servers.get_server_utilization = mock.AsyncMock(
+            side_effect=get_server_utilization)
+
+    def test_poll_reports_changes(self):
+        async def run_test():
+            poller = AsyncUtilizationPoller(self.servers, ['a', 'b', 'a'])
+            self.assertEqual({'a', 'b'}, set(await poller.poll()))
+            self.assertEqual({}, await poller.poll())
+            self.responses['a'] = utilization(cpu=90)
+            self.assertEqual({'a': self.responses['a']}, await poller.poll())
+            self.assertEqual(6, self.servers.get_server_utilization.call_count)
+
+        asyncio.run(run_test())
+
+    def test_backs_off_when_rate_limited(self):
+        async def run_test():
+            poller = AsyncUtilizationPoller(self.servers, ['a', 'b'],
+                                            interval=10, max_interval=30)
+            await poller.poll()
+            self.responses['b'] = too_many_requests()
+            await poller.poll()
+            self.assertEqual(20, poller.interval)
+            await poller.poll()
+            self.assertEqual(30, poller.interval)
+            self.assertEqual(429, poller.errors['b'].status)
+            # The last good utilization is kept.
+            self.assertEqual('offline', poller.snapshot['b']['current_state'])
+
+            self.responses['b'] = utilization('offline', 0)
+            await poller.poll()
+            self.assertEqual(15, poller.interval)
+            await poller.poll()
+            self.assertEqual(10, poller.interval)
+            self.assertEqual({}, poller.errors)
+
+        asyncio.run(run_test())
+
+    def test_listen_until_stopped(self):
+        async def run_test():
+            poller = AsyncUtilizationPoller(self.servers, ['a', 'b'],
+                                            interval=0.01)
+            received = []
+            async for server_id, data in poller.listen():
+                received.append(server_id)
+                if server_id == 'b':
+                    self.responses['b'] = utilization('starting', 0)
+                if len(received) == 3:
+                    poller.stop()
+            self.assertEqual(['a', 'b', 'b'], received)
+
+        asyncio.run(asyncio.wait_for(run_test(), 5))
+
+    def test_table(self):
+        async def run_test():
+            poller = AsyncUtilizationPoller(self.servers, ['b', 'a'])
+            await poller.poll()
+            self.assertEqual(
+                [('a', 'running', 10.0), ('b', 'offline', 0)],
+                poller.table(('server_id', 'current_state', 'cpu_absolute')))
+            lines = poller.format_table(
+                ('server_id', 'current_state', 'cpu_absolute')).splitlines()
+            self.assertEqual(['server_id  current_state  cpu_absolute',
+                              'a          running        10.00',
+                              'b          offline        0'], lines)
+            poller.remove('a')
+            self.assertEqual([('b',)], poller.table(('server_id',)))
+
+        asyncio.run(run_test())
+
+    def test_servers_api_helper(self):
+        poller = self.servers.get_utilization_poller(['a'], interval=5)
+        self.assertIsInstance(poller, AsyncUtilizationPoller)
+        self.assertIs(self.servers, poller._servers)
+        self.assertEqual(5, poller.interval)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,158 @@
+import asyncio
+import unittest
+from unittest import mock
+
+from pydactyl.api.client.servers.async_websocket_multiplexer import (
+    AsyncWebsocketMultiplexer)
+from pydactyl.async_api_client import AsyncPterodactylClient
+
+
+class FakeWebsocketClient:
+    """Replays events like AsyncWebsocketClient.listen() would."""
+
+    def __init__(self, messages, fail=False):
+        self.messages = messages
+        self.fail = fail
+        self.closed = False
+        self.requested = []
+
+    async def connect(self):
+        if self.fail:
+            raise ConnectionError('wings is down')
+
+    async def close(self):
+        self.closed = True
+
+    async def request_logs(self):
+        self.requested.append('logs')
+
+    async def request_stats(self):
+        self.requested.append('stats')
+
+    async def listen(self, events=(), exclude_events=()):
+        for message in self.messages:
+            await asyncio.sleep(0)
+            if (events and message['event'] not in events or
+                    exclude_events and message['event'] in exclude_events):
+                continue
+            yield message
+
+
+def console(line):
+    return {'event': 'console output', 'args': [line]}
+
+
+class AsyncWebsocketMultiplexerTests(unittest.TestCase):
+
+    def setUp(self):
+        self.clients = {
+            'a': FakeWebsocketClient([console('a1'), {'event': 'stats'},
+                                      console('a2')]),
+            'b': FakeWebsocketClient([console('b1'), {'event': 'stats'}]),
+            'down': FakeWebsocketClient([], fail=True),
+        }
+        self.servers = mock.Mock()
+        self.servers.get_websocket_client = mock.AsyncMock(
+            side_effect=lambda server_id, **kwargs: self.clients[server_id])
+
+    def test_merges_tagged_events(self):
+        async def run_test():
+            mux = AsyncWebsocketMultiplexer(
+                self.servers, ['a', 'b', 'down'], request_logs=True,
+                exclude_events=['stats'])
+            async with mux:
+                mux.add('c', events=['stats'], exclude_events=())
+                self.clients['c'] = FakeWebsocketClient(
+                    [console('c1'), {'event': 'stats'}])
+                received = [item async for item in mux.listen()]
+
+            self.assertEqual(['a1', 'a2'], [e['args'][0] for s, e in received
+                                            if s == 'a'])
+            self.assertEqual(['b1'], [e['args'][0] for s, e in received
+                                      if s == 'b'])
+            self.assertEqual([('c', {'event': 'stats'})],
+                             [item for item in received if item[0] == 'c'])
+            self.assertEqual({'a': 'closed', 'b': 'closed', 'c': 'closed',
+                              'down': 'failed'}, mux.states)
+            self.assertIsInstance(mux.errors['down'], ConnectionError)
+            self.assertEqual(['logs'], self.clients['a'].requested)
+            self.assertTrue(all(c.closed for c in self.clients.values()))
+
+        asyncio.run(run_test())
+
+    def test_backpressure(self):
+        async def run_test():
+            self.clients['a'].messages = [console(i) for i in range(50)]
+            mux = AsyncWebsocketMultiplexer(self.servers, ['a'], max_queue=2)
+            received = []
+            async with mux:
+                async for server_id, event in mux.listen():
+                    self.assertLessEqual(mux._queue.qsize(), 2)
+                    received.append(event['args'][0])
+                    await asyncio.sleep(0)
+            self.assertEqual(list(range(50)), received)
+
+        asyncio.run(run_test())
+
+    def test_remove_stops_server(self):
+        async def run_test():
+            async def endless(events=(), exclude_events=()):
+                while True:
+                    await asyncio.sleep(0.001)
+                    yield console('spam')
+
+            self.clients['a'].listen = endless
+            mux = AsyncWebsocketMultiplexer(self.servers, ['a', 'b'])
+            async with mux:
+                seen = set()
+                async for server_id, event in mux.listen():
+                    seen.add(server_id)
+                    if seen == {'a', 'b'}:
+                        await mux.remove('a')
+                self.assertEqual('closed', mux.states['a'])
+                self.assertTrue(self.clients['a'].closed)
+
+        asyncio.run(asyncio.wait_for(run_test(), 5))
+
+    def test_first_connect_retried(self):
+        async def run_test():
+            down = self.clients['down']
+            down.messages = [console('up')]
+            attempts = []
+
+            async def connect():
+                attempts.append(len(attempts) + 1)
+                if len(attempts) < 3:
+                    raise ConnectionError('wings is down')
+
+            down.connect = connect
+            mux = AsyncWebsocketMultiplexer(
+                self.servers, ['down'], reconnect=True, backoff_factor=0.001)
+            async with mux:
+                received = [item async for item in mux.listen()]
+            self.assertEqual([('down', console('up'))], received)
+            self.assertEqual([1, 2, 3], attempts)
+            self.assertEqual({}, mux.errors)
+
+            mux = AsyncWebsocketMultiplexer(
+                self.servers, ['down'], reconnect=True, max_reconnects=1,
+                backoff_factor=0.001)
+            attempts.clear()
+            async with mux:
+                self.assertEqual([], [item async for item in mux.listen()])
+            self.assertEqual('failed', mux.states['down'])
+            self.assertEqual([1, 2], attempts)
+
+        asyncio.run(asyncio.wait_for(run_test(), 5))
+
+    def test_servers_api_helper(self):
+        api = AsyncPterodactylClient(url='https://dummy.com', api_key='dummy')
+        mux = api.client.servers.get_websocket_multiplexer(['a'],
+                                                           max_queue=5)
+        self.assertIsInstance(mux, AsyncWebsocketMultiplexer)
+        self.assertIs(api.client.servers, mux._servers)
+        self.assertEqual(5, mux._max_queue)
+
+
+if __name__ == '__main__':
+    unittest.main()
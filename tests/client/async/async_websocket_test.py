@@ -1,8 +1,10 @@
 import aiohttp
 import asyncio
+import time
 import unittest
 from unittest import mock
 from pydactyl.api.client.servers.async_websocket_client import AsyncWebsocketClient
+from tests.client.sync.websocket_test import make_token
 
 class AsyncWebsocketTests(unittest.TestCase):
 
@@ -33,7 +35,7 @@ class AsyncWebsocketTests(unittest.TestCase):
             self.ws_client._ws = mock.AsyncMock()
             await self.ws_client.send_command('help')
             
-            expected_payload = {"event": "send", "args": ['help']}
+            expected_payload = {"event": "send command", "args": ['help']}
             self.ws_client._ws.send_json.assert_called_with(expected_payload)
 
         asyncio.run(run_test())
@@ -121,5 +123,130 @@ class AsyncWebsocketTests(unittest.TestCase):
 
         asyncio.run(run_test())
 
+    def test_listen_reconnects(self):
+        async def run_test():
+            def message(data):
+                msg = mock.Mock()
+                msg.type = aiohttp.WSMsgType.TEXT
+                msg.data = data
+                return msg
+
+            refresher = mock.AsyncMock(return_value={
+                'data': {'token': 'new_token', 'socket': 'wss://other.com'}})
+            session = mock.Mock(closed=False)
+            ws_client = AsyncWebsocketClient(
+                self.url, self.token, session=session,
+                token_refresher=refresher, reconnect=True, max_reconnects=1,
+                backoff_factor=0.001)
+            first_ws = mock.AsyncMock(closed=True)
+            first_ws.__aiter__.return_value = [
+                message('{"event": "status", "args": ["running"]}')]
+            second_ws = mock.AsyncMock(closed=True)
+            second_ws.__aiter__.return_value = [
+                message('{"event": "console output", "args": ["line 2"]}')]
+            session.ws_connect = mock.AsyncMock(
+                side_effect=[second_ws, aiohttp.ClientConnectionError()])
+            ws_client._ws = first_ws
+            await ws_client.request_stats()
+
+            messages = [m async for m in ws_client.listen(
+                exclude_events=['reconnecting'])]
+
+            self.assertEqual(
+                ['status', 'disconnected', 'reconnected', 'console output',
+                 'disconnected', 'reconnect failed'],
+                [m['event'] for m in messages])
+            session.ws_connect.assert_awaited_with('wss://other.com')
+            second_ws.send_json.assert_has_awaits([
+                mock.call({'event': 'auth', 'args': ['new_token']}),
+                mock.call({'event': 'send stats', 'args': []})])
+
+        asyncio.run(run_test())
+
+    def test_close_stops_reconnect(self):
+        async def run_test():
+            ws_client = AsyncWebsocketClient(self.url, self.token,
+                                             reconnect=True)
+            ws_client._ws = mock.AsyncMock()
+            ws_client._ws.__aiter__.return_value = []
+            await ws_client.close()
+            self.assertEqual([], [m async for m in ws_client.listen()])
+
+        asyncio.run(run_test())
+
+    def test_background_token_refresh(self):
+        async def run_test():
+            token = make_token(time.time() + 90.05)
+            refresher = mock.AsyncMock(
+                return_value={'data': {'token': 'new_token'}})
+            ws_client = AsyncWebsocketClient(self.url, token,
+                                             session=mock.Mock(closed=False),
+                                             token_refresher=refresher)
+            mock_ws = mock.AsyncMock()
+            ws_client._session.ws_connect = mock.AsyncMock(
+                return_value=mock_ws)
+            await ws_client.connect()
+            await asyncio.sleep(0.3)
+            refresher.assert_awaited_once_with()
+            mock_ws.send_json.assert_awaited_with(
+                {'event': 'auth', 'args': ['new_token']})
+
+            # A "token expiring" event is handed to the refresher task.
+            msg = mock.Mock()
+            msg.type = aiohttp.WSMsgType.TEXT
+            msg.data = '{"event": "token expiring"}'
+            mock_ws.__aiter__.return_value = [msg]
+            self.assertEqual(1, len([m async for m in ws_client.listen()]))
+            await asyncio.sleep(0.05)
+            self.assertEqual(2, refresher.await_count)
+
+            await ws_client.close()
+            self.assertIsNone(ws_client._refresh_task)
+
+        asyncio.run(run_test())
+
+    def test_listen_batches(self):
+        async def run_test():
+            async def frames():
+                for i in range(5):
+                    msg = mock.Mock()
+                    msg.type = aiohttp.WSMsgType.TEXT
+                    msg.data = ('{{"event":"console output","args":["{}"]}}'
+                                .format(i))
+                    yield msg
+                    if i == 2:
+                        # A quiet period flushes the partial batch.
+                        await asyncio.sleep(0.1)
+
+            self.ws_client._ws = mock.Mock()
+            self.ws_client._ws.__aiter__ = lambda ws: frames()
+            batches = [[m['args'][0] for m in batch] async for batch in
+                       self.ws_client.listen_batches(max_count=2,
+                                                     max_latency=0.02)]
+            self.assertEqual([['0', '1'], ['2'], ['3', '4']], batches)
+
+        asyncio.run(run_test())
+
+    def test_listen_batches_stops_reader(self):
+        async def run_test():
+            async def endless():
+                while True:
+                    msg = mock.Mock()
+                    msg.type = aiohttp.WSMsgType.TEXT
+                    msg.data = '{"event":"console output","args":["x"]}'
+                    await asyncio.sleep(0)
+                    yield msg
+
+            self.ws_client._ws = mock.Mock()
+            self.ws_client._ws.__aiter__ = lambda ws: endless()
+            batches = self.ws_client.listen_batches(max_count=10)
+            self.assertEqual(10, len(await batches.__anext__()))
+            await batches.aclose()
+            tasks = [t for t in asyncio.all_tasks()
+                     if t is not asyncio.current_task()]
+            self.assertEqual([], tasks)
+
+        asyncio.run(run_test())
+
 if __name__ == '__main__':
     unittest.main()
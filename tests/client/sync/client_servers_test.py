@@ -1,8 +1,10 @@
 import unittest
 from unittest import mock
 
+import requests
+
 from pydactyl import PterodactylClient
-from pydactyl.exceptions import BadRequestError
+from pydactyl.exceptions import BadRequestError, PterodactylApiError
 
 
 class ClientServersTests(unittest.TestCase):
@@ -72,6 +74,79 @@ class ClientServersTests(unittest.TestCase):
         self.api.client.servers.send_power_action(1, 'start')
         mock_api.assert_called_with(**expected)
 
+    @mock.patch('pydactyl.api.base.PterodactylAPI._api_request')
+    def test_send_power_action_many(self, mock_api):
+        def api_request(endpoint, **kwargs):
+            if endpoint == 'client/servers/b/power':
+                raise PterodactylApiError('server is suspended')
+            return 204
+
+        mock_api.side_effect = api_request
+        bulk = self.api.client.servers.send_power_action_many(
+            ['a', 'b', 'c', 'a'], 'restart', concurrency=2)
+
+        self.assertEqual({'a': 204, 'c': 204}, bulk.results)
+        self.assertEqual(['b'], list(bulk.errors))
+        self.assertEqual(3, mock_api.call_count)
+        mock_api.assert_any_call(endpoint='client/servers/c/power',
+                                 mode='POST', data={'signal': 'restart'},
+                                 json=False)
+        stats = bulk.stats()
+        self.assertEqual((3, 2, 1), (stats['total'], stats['succeeded'],
+                                     stats['failed']))
+
+    @mock.patch('time.sleep')
+    @mock.patch('pydactyl.api.base.PterodactylAPI._api_request')
+    def test_send_power_action_many_stagger(self, mock_api, mock_sleep):
+        self.api.client.servers.send_power_action_many(
+            ['a', 'b', 'c'], 'start', stagger=5)
+        delays = [c.args[0] for c in mock_sleep.call_args_list]
+        self.assertEqual(2, len(delays))
+        self.assertAlmostEqual(5, delays[0], places=1)
+        self.assertAlmostEqual(10, delays[1], places=1)
+
+    def test_send_power_action_many_invalid_signal(self):
+        with self.assertRaises(BadRequestError):
+            self.api.client.servers.send_power_action_many([1], 'BADSIGNAL')
+
+    @mock.patch('pydactyl.api.base.PterodactylAPI._api_request')
+    def test_broadcast_console_command(self, mock_api):
+        def api_request(endpoint, **kwargs):
+            if endpoint == 'client/servers/stopped/command':
+                response = requests.Response()
+                response.status_code = 412
+                raise requests.HTTPError(response=response)
+            return 204
+
+        mock_api.side_effect = api_request
+        servers = self.api.client.servers
+        ws = mock.Mock(connected=True, state='running')
+        servers.websockets['ws'] = ws
+        servers.websockets['closed'] = mock.Mock(connected=False)
+        servers._set_cached_state('offline', 'offline')
+
+        bulk = servers.broadcast_console_command(
+            ['ws', 'closed', 'offline', 'stopped'], 'save-all')
+
+        self.assertEqual({'ws': 'websocket', 'closed': 'http',
+                          'offline': 'skipped'}, bulk.results)
+        self.assertIsInstance(bulk.errors['stopped'], requests.HTTPError)
+        ws.send_command.assert_called_once_with('save-all')
+        self.assertEqual(2, mock_api.call_count)
+        self.assertEqual('offline', servers.get_cached_state('stopped'))
+        self.assertIsNone(servers.get_cached_state('stopped', max_age=-1))
+
+        bulk = servers.broadcast_console_command(['stopped'], 'save-all')
+        self.assertEqual({'stopped': 'skipped'}, bulk.results)
+
+    @mock.patch('pydactyl.api.base.PterodactylAPI._api_request')
+    def test_get_server_utilization_caches_state(self, mock_api):
+        mock_api.return_value = {'object': 'stats',
+                                 'attributes': {'current_state': 'running'}}
+        self.api.client.servers.get_server_utilization('abc')
+        self.assertEqual('running',
+                         self.api.client.servers.get_cached_state('abc'))
+
     @mock.patch('pydactyl.api.base.PterodactylAPI._api_request')
     def test_get_websocket(self, mock_api):
         expected = {
@@ -1,6 +1,43 @@
+import base64
+import json
+import threading
+import time
+import timeit
 import unittest
 from unittest import mock
-from pydactyl.api.client.servers.websocket_client import WebsocketClient
+
+import websocket
+from pydactyl.api.client.servers.websocket_client import (WebsocketClient,
+                                                          peek_event,
+                                                          token_expiry)
+
+def make_token(exp):
+    payload = base64.urlsafe_b64encode(
+        json.dumps({'exp': exp}).encode()).decode().rstrip('=')
+    return 'header.{}.signature'.format(payload)
+
+
+def recorded_stream(count=5000):
+    """Frames in the shape Wings sends for a busy modded server."""
+    stats = json.dumps({
+        'memory_bytes': 5368709120, 'memory_limit_bytes': 8589934592,
+        'cpu_absolute': 187.3, 'network': {'rx_bytes': 1048576,
+                                           'tx_bytes': 2097152},
+        'state': 'running', 'disk_bytes': 10737418240, 'uptime': 3600000})
+    frames = []
+    for i in range(count):
+        if i % 50 == 0:
+            frames.append(json.dumps({'event': 'stats', 'args': [stats]},
+                                     separators=(',', ':')))
+        else:
+            line = ('[12:{:02d}:{:02d}] [Server thread/INFO] [minecraft/'
+                    'DedicatedServer]: Player{} moved too quickly! '
+                    '-1.39,0.0,12.5'.format(i // 60 % 60, i % 60, i))
+            frames.append(json.dumps({'event': 'console output',
+                                      'args': [line]},
+                                     separators=(',', ':')))
+    return frames
+
 
 class WebsocketTests(unittest.TestCase):
 
@@ -54,6 +91,204 @@ class WebsocketTests(unittest.TestCase):
         self.assertEqual(messages[0]['args'][0], 'line 1')
         self.assertEqual(messages[1]['args'][0], 'line 2')
 
+    def test_listen_tracks_state(self):
+        mock_ws = mock.Mock(connected=True)
+        mock_ws.recv.side_effect = [
+            '{"event": "status", "args": ["starting"]}',
+            '{"event": "console output", "args": ["line 1"]}',
+            '{"event": "status", "args": ["running"]}',
+            None
+        ]
+        self.ws_client._ws = mock_ws
+        self.assertIsNone(self.ws_client.state)
+        self.assertTrue(self.ws_client.connected)
+
+        list(self.ws_client.listen(events=['console output']))
+        self.assertEqual('running', self.ws_client.state)
+
+    @mock.patch('time.sleep')
+    def test_listen_reconnects(self, mock_sleep):
+        refresher = mock.Mock(return_value={
+            'data': {'token': 'new_token', 'socket': 'wss://other.com'}})
+        ws_client = WebsocketClient(self.url, self.token,
+                                    token_refresher=refresher, reconnect=True,
+                                    max_reconnects=2)
+        first_ws = mock.Mock()
+        first_ws.recv.side_effect = [
+            '{"event": "console output", "args": ["line 1"]}',
+            websocket.WebSocketConnectionClosedException(),
+        ]
+        second_ws = mock.Mock()
+        second_ws.recv.side_effect = [
+            '{"event": "console output", "args": ["line 2"]}',
+            None,
+        ]
+        ws_client._ws = first_ws
+        ws_client.get_logs()
+
+        with mock.patch('websocket.create_connection') as create_connection:
+            create_connection.side_effect = [
+                ConnectionRefusedError(), second_ws,
+                ConnectionRefusedError(), ConnectionRefusedError()]
+            messages = list(ws_client.listen())
+
+        self.assertEqual(
+            ['console output', 'disconnected', 'reconnecting', 'reconnecting',
+             'reconnected', 'console output', 'disconnected', 'reconnecting',
+             'reconnecting', 'reconnect failed'],
+            [m['event'] for m in messages])
+        self.assertEqual('line 2', messages[5]['args'][0])
+        self.assertEqual([2], messages[4]['args'])
+        create_connection.assert_called_with('wss://other.com')
+        second_ws.send.assert_has_calls([
+            mock.call('{"event": "auth", "args": ["new_token"]}'),
+            mock.call('{"event": "send logs", "args": []}')])
+        self.assertEqual(4, mock_sleep.call_count)
+
+    def test_listen_without_reconnect_stops(self):
+        mock_ws = mock.Mock()
+        mock_ws.recv.side_effect = websocket.WebSocketConnectionClosedException()
+        ws_client = WebsocketClient(self.url, self.token)
+        ws_client._ws = mock_ws
+        self.assertEqual([], list(ws_client.listen()))
+
+    def test_token_expiry(self):
+        self.assertEqual(1700000000, token_expiry(make_token(1700000000)))
+        self.assertIsNone(token_expiry('dummy_token'))
+        self.assertIsNone(token_expiry(None))
+
+    def test_background_token_refresh(self):
+        refreshed = threading.Event()
+        refresh_threads = []
+
+        def refresher():
+            refresh_threads.append(threading.current_thread())
+            refreshed.set()
+            return {'data': {'token': 'new_token'}}
+
+        ws_client = WebsocketClient(self.url, make_token(time.time() + 90.05),
+                                    token_refresher=refresher)
+        with mock.patch('websocket.create_connection') as create_connection:
+            ws_client.connect()
+        try:
+            self.assertTrue(refreshed.wait(2))
+            ws = create_connection.return_value
+            for _ in range(100):
+                if ws.send.call_count == 2:
+                    break
+                time.sleep(0.01)
+            ws.send.assert_called_with(
+                '{"event": "auth", "args": ["new_token"]}')
+            self.assertIsNot(threading.current_thread(), refresh_threads[0])
+        finally:
+            ws_client.close()
+        ws_client._refresh_thread.join(2)
+        self.assertFalse(ws_client._refresh_thread.is_alive())
+
+    def test_token_expiring_wakes_refresher(self):
+        refreshed = threading.Event()
+        refresher = mock.Mock(side_effect=lambda: refreshed.set() or {
+            'data': {'token': 'new_token'}})
+        ws_client = WebsocketClient(self.url, 'opaque_token',
+                                    token_refresher=refresher)
+        with mock.patch('websocket.create_connection') as create_connection:
+            ws_client.connect()
+        create_connection.return_value.recv.side_effect = [
+            '{"event": "token expiring"}', None]
+        try:
+            self.assertEqual(['token expiring'],
+                             [m['event'] for m in ws_client.listen()])
+            self.assertTrue(refreshed.wait(2))
+            refresher.assert_called_once_with()
+        finally:
+            ws_client.close()
+
+    def test_peek_event(self):
+        self.assertEqual('console output', peek_event(
+            '{"event":"console output","args":["hi"]}'))
+        self.assertEqual('stats', peek_event('{"event":"stats"}'))
+        self.assertIsNone(peek_event('{"event": "stats"}'))
+        self.assertIsNone(peek_event('{"args":[],"event":"stats"}'))
+        self.assertIsNone(peek_event('{"event":"unterminated'))
+
+    def test_listen_skips_excluded_events_before_parsing(self):
+        loads = mock.Mock(side_effect=json.loads)
+        self.ws_client._json_codec = mock.Mock(loads=loads)
+        self.ws_client._ws = mock.Mock()
+        self.ws_client._ws.recv.side_effect = [
+            '{"event":"console output","args":["line 1"]}',
+            '{"event":"status","args":["running"]}',
+            '{"event":"stats","args":["{}"]}',
+            '{"event": "console output", "args": ["spaced"]}',
+            None
+        ]
+
+        messages = list(self.ws_client.listen(events=['stats']))
+
+        self.assertEqual(['stats'], [m['event'] for m in messages])
+        self.assertEqual('running', self.ws_client.state)
+        # console output with Wings' compact encoding is never parsed.
+        self.assertEqual(3, loads.call_count)
+
+    def test_replay_benchmark(self):
+        frames = recorded_stream()
+
+        def replay(**kwargs):
+            # A plain iterator keeps mock overhead out of the timings.
+            self.ws_client._ws = mock.NonCallableMock(
+                recv=iter(frames + [None]).__next__)
+            return [m for m in self.ws_client.listen(**kwargs)
+                    if m['event'] == 'stats']
+
+        self.assertEqual(100, len(replay(exclude_events=['console output'])))
+        self.assertEqual(100, len(replay()))
+        prefiltered = min(timeit.repeat(
+            lambda: replay(exclude_events=['console output']),
+            number=3, repeat=3))
+        parsed = min(timeit.repeat(replay, number=3, repeat=3))
+        self.assertLess(prefiltered, parsed)
+
+    def test_listen_batches_by_count(self):
+        self.ws_client._ws = mock.Mock()
+        self.ws_client._ws.recv.side_effect = [
+            '{{"event":"console output","args":["{}"]}}'.format(i)
+            for i in range(7)] + ['{"event":"stats","args":[]}', None]
+
+        batches = list(self.ws_client.listen_batches(max_count=3))
+
+        self.assertEqual([['0', '1', '2'], ['3', '4', '5'], ['6']],
+                         [[m['args'][0] for m in b] for b in batches])
+        self.ws_client._ws.settimeout.assert_called_with(None)
+
+    def test_listen_batches_by_latency(self):
+        frames = iter([
+            '{"event":"console output","args":["a"]}',
+            websocket.WebSocketTimeoutException(),
+            '{"event":"console output","args":["b"]}',
+            None,
+        ])
+
+        def recv():
+            frame = next(frames)
+            if isinstance(frame, Exception):
+                time.sleep(0.02)
+                raise frame
+            return frame
+
+        self.ws_client._ws = mock.Mock()
+        self.ws_client._ws.recv.side_effect = recv
+        batches = self.ws_client.listen_batches(max_latency=0.01)
+
+        self.assertEqual(['a'], [m['args'][0] for m in next(batches)])
+        timeouts = [c.args[0] for c in
+                    self.ws_client._ws.settimeout.call_args_list]
+        # No timeout while the batch is empty, then the batch's deadline.
+        self.assertIsNone(timeouts[0])
+        self.assertLessEqual(timeouts[1], 0.01)
+        self.assertEqual(['b'], [m['args'][0] for m in next(batches)])
+        self.assertEqual([], list(batches))
+        self.ws_client._ws.settimeout.assert_called_with(None)
+
     def test_context_manager(self):
         with mock.patch('websocket.create_connection') as mock_create_connection:
             mock_ws = mock.Mock()